@@ -3,3 +3,8 @@ from backend.app.db.models.user import User
 from backend.app.db.models.interaction import UserInteraction
 from backend.app.db.models.article_stats import ArticleStats
 from backend.app.db.models.quiz import Quiz, QuizQuestion
+from backend.app.db.models.topic import Topic
+from backend.app.db.models.job import Job
+from backend.app.db.models.feed import UserFeed
+from backend.app.db.models.data_version import DataVersion
+from backend.app.db.models.membership_change import MembershipChange
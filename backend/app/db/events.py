@@ -0,0 +1,238 @@
+# backend/app/db/events.py
+"""Article change notifications.
+
+Several in-memory structures (topic catalog, caches, vector indexes) are derived
+from the articles table and need to follow it without re-reading the whole table.
+Every ORM flush through SessionLocal is inspected for Article inserts, updates and
+deletes; the collected changes are handed to the registered listeners once the
+transaction commits (and dropped on rollback).
+
+Listeners only run in the process that made the write. So that other processes
+(server workers, scripts, a restarted server) can tell something changed, every
+flush also records the change in the same transaction: it bumps the shared
+"articles" counter (db.versions) and, once the topic catalog has been built,
+adjusts topics.count and topics.version. Readers compare against those rows.
+Inserts, deletes and re-topics additionally bump the "membership" counter and log
+each article's new topic in membership_changes, so structures keyed by topic
+(centroids, feed signals) apply just those rows instead of re-reading the table
+after every summary edit (membership_since).
+
+Code that writes articles with Core statements (bulk inserts) bypasses the ORM
+events and must call notify_articles_changed() itself; that records the change
+in a transaction of its own.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import case, event, inspect, insert, select, update
+
+from backend.app.db.session import SessionLocal, engine
+from backend.app.db.models.article import Article
+from backend.app.db.models.topic import Topic
+from backend.app.db.models.membership_change import MembershipChange
+from backend.app.db import versions
+
+
+@dataclass
+class ArticleChanges:
+    added: Dict[int, Optional[int]] = field(default_factory=dict)        # article_id -> topic_id
+    deleted: Dict[int, Optional[int]] = field(default_factory=dict)      # article_id -> topic_id
+    retopiced: List[Tuple[int, Optional[int], Optional[int]]] = field(default_factory=list)  # (id, old, new)
+    updated: Set[int] = field(default_factory=set)                       # any column changed
+
+    def __bool__(self):
+        return bool(self.added or self.deleted or self.retopiced or self.updated)
+
+    def topic_deltas(self) -> Dict[Optional[int], int]:
+        """Net article count change per topic id."""
+        deltas: Dict[Optional[int], int] = {}
+        for tid in self.added.values():
+            deltas[tid] = deltas.get(tid, 0) + 1
+        for tid in self.deleted.values():
+            deltas[tid] = deltas.get(tid, 0) - 1
+        for _, old, new in self.retopiced:
+            deltas[old] = deltas.get(old, 0) - 1
+            deltas[new] = deltas.get(new, 0) + 1
+        return {k: v for k, v in deltas.items() if v}
+
+    def merge(self, other: "ArticleChanges"):
+        self.added.update(other.added)
+        self.deleted.update(other.deleted)
+        self.retopiced.extend(other.retopiced)
+        self.updated |= other.updated
+
+
+_listeners: List[Callable[[ArticleChanges], None]] = []
+
+_INFO_KEY = "article_changes"
+
+
+def on_articles_changed(fn: Callable[[ArticleChanges], None]):
+    """Register a listener; usable as a decorator."""
+    _listeners.append(fn)
+    return fn
+
+
+def notify_articles_changed(changes: ArticleChanges, recorded: bool = False):
+    """Run the listeners. recorded=False (Core writers) also records the change in the DB."""
+    if not changes:
+        return
+    if not recorded:
+        try:
+            with engine.begin() as conn:
+                record_changes(conn, changes)
+        except Exception as e:
+            print("Warning: could not record article changes:", e)
+    for fn in list(_listeners):
+        try:
+            fn(changes)
+        except Exception as e:
+            # a broken listener must never fail the write that triggered it
+            print(f"Article change listener {getattr(fn, '__name__', fn)} failed:", e)
+
+
+# -------------------------------------------------------------------
+# Shared record (data_versions / topics)
+# -------------------------------------------------------------------
+_tables_ready = False
+_IN_CHUNK = 500  # bound parameters per IN (...)
+MEMBERSHIP_KEEP = 10000  # membership versions kept in the log; readers further behind rebuild
+
+
+def _ready(conn) -> bool:
+    """True once init_db has created the tables; checked until it has."""
+    global _tables_ready
+    if not _tables_ready:
+        insp = inspect(conn)
+        _tables_ready = all(insp.has_table(t) for t in ("data_versions", "topics", "membership_changes"))
+    return _tables_ready
+
+
+def record_changes(conn, changes: ArticleChanges):
+    """Bump the "articles" version and keep topics.count/version in step, in the caller's transaction."""
+    if not changes or not _ready(conn):
+        return
+    v = versions.bump_version(conn, versions.ARTICLES)
+    maintained = versions.read_version(versions.TOPIC_COUNTS, conn) is not None
+
+    touched = set()
+    for tid, delta in changes.topic_deltas().items():
+        if tid is None or tid == -1:
+            continue
+        tid = int(tid)
+        touched.add(tid)
+        if not maintained:
+            continue
+        new = Topic.count + delta
+        res = conn.execute(update(Topic).where(Topic.id == tid)
+                           .values(count=case((new < 0, 0), else_=new), version=v))
+        if not res.rowcount:
+            # named by the catalog once the topic model knows it
+            conn.execute(insert(Topic).values(id=tid, name=f"Topic {tid}", keywords=[],
+                                              count=max(0, delta), version=v))
+
+    # edits to an article (summary, title...) change its topic's detail page
+    edited = list(set(changes.updated) | {aid for aid, _, _ in changes.retopiced})
+    for i in range(0, len(edited), _IN_CHUNK):
+        of_articles = select(Article.topic_id).where(Article.id.in_(edited[i:i + _IN_CHUNK]))
+        conn.execute(update(Topic).where(Topic.id.in_(of_articles)).values(version=v))
+    if touched:
+        conn.execute(update(Topic).where(Topic.id.in_(touched)).values(version=v))
+    _log_membership(conn, changes)
+
+
+def _log_membership(conn, changes: ArticleChanges):
+    rows = ([{"article_id": int(aid), "topic_id": tid, "deleted": 0} for aid, tid in changes.added.items()]
+            + [{"article_id": int(aid), "topic_id": None, "deleted": 1} for aid in changes.deleted]
+            + [{"article_id": int(aid), "topic_id": new, "deleted": 0} for aid, _, new in changes.retopiced])
+    if not rows:
+        return  # summary/title edits leave topic membership alone
+    m = versions.bump_version(conn, versions.MEMBERSHIP)
+    conn.execute(insert(MembershipChange), [dict(r, version=m) for r in rows])
+    if m % 256 == 0:
+        conn.execute(MembershipChange.__table__.delete().where(MembershipChange.version <= m - MEMBERSHIP_KEEP))
+
+
+def membership_since(seen: int) -> Optional[Tuple[int, List[Tuple[int, Optional[int], bool]]]]:
+    """(current membership version, [(article_id, topic_id, deleted)] in write order) past `seen`.
+
+    None when the log no longer reaches back to `seen` (pruned, or a different
+    database): the caller rebuilds from the articles table instead.
+    """
+    with engine.connect() as conn:
+        current = versions.read_version(versions.MEMBERSHIP, conn) or 0
+        if current == seen:
+            return current, []
+        if current < seen:
+            return None
+        rows = conn.execute(
+            select(MembershipChange.version, MembershipChange.article_id,
+                   MembershipChange.topic_id, MembershipChange.deleted)
+            .where(MembershipChange.version > seen, MembershipChange.version <= current)
+            .order_by(MembershipChange.version, MembershipChange.id)
+        ).all()
+    if not rows or rows[0][0] != seen + 1:
+        return None
+    return current, [(int(aid), tid, bool(gone)) for _, aid, tid, gone in rows]
+
+
+# -------------------------------------------------------------------
+# Session hooks
+# -------------------------------------------------------------------
+@event.listens_for(Article.topic_id, "set", active_history=True)
+def _keep_old_topic(target, value, oldvalue, initiator):
+    """No-op; active_history makes re-topicing an expired article (after a commit)
+    load the old topic, so _collect_changes sees the move."""
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_changes(session, flush_context):
+    flushed = ArticleChanges()
+
+    for obj in session.new:
+        if isinstance(obj, Article) and obj.id is not None:
+            flushed.added[int(obj.id)] = obj.topic_id
+
+    for obj in session.deleted:
+        if isinstance(obj, Article) and obj.id is not None:
+            hist = inspect(obj).attrs.topic_id.history
+            old = hist.deleted[0] if hist.deleted else obj.topic_id
+            flushed.deleted[int(obj.id)] = old
+
+    for obj in session.dirty:
+        if not isinstance(obj, Article) or obj.id is None:
+            continue
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        aid = int(obj.id)
+        flushed.updated.add(aid)
+        hist = inspect(obj).attrs.topic_id.history
+        if hist.added and hist.deleted and hist.added[0] != hist.deleted[0]:
+            flushed.retopiced.append((aid, hist.deleted[0], hist.added[0]))
+
+    if not flushed:
+        return
+    # part of the writing transaction: rolled back with it, visible to everyone with its commit
+    record_changes(session.connection(), flushed)
+
+    changes = session.info.setdefault(_INFO_KEY, ArticleChanges())
+    for aid, old, new in flushed.retopiced:
+        if aid in changes.added:
+            # inserted earlier in this same transaction: just record the final topic
+            changes.added[aid] = new
+        else:
+            changes.retopiced.append((aid, old, new))
+    flushed.retopiced = []
+    changes.merge(flushed)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _dispatch_changes(session):
+    changes = session.info.pop(_INFO_KEY, None)
+    if changes:
+        notify_articles_changed(changes, recorded=True)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _drop_changes(session, previous_transaction):
+    session.info.pop(_INFO_KEY, None)
@@ -1,4 +1,5 @@
 from backend.app.db.session import engine, Base
+import backend.app.db.base  # noqa: F401  registers every model (users is needed by the interactions FK)
 
 
 def _ensure_column(conn, table: str, column: str, ddl: str):
@@ -20,6 +21,18 @@ def _ensure_column(conn, table: str, column: str, ddl: str):
             raise
 
 
+def _ensure_indexes(conn):
+    """Create any index declared on the models that the database does not have yet.
+
+    create_all() only emits CREATE INDEX for tables it creates itself, so databases
+    created before an index was added to a model never get it. checkfirst makes this
+    safe to run on every start.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
 def init_db():
     print("Creating tables...")
     Base.metadata.create_all(bind=engine)
@@ -30,8 +43,24 @@ def init_db():
             _ensure_column(conn, 'articles', 'summary', "ALTER TABLE articles ADD COLUMN summary TEXT")
             # store key_points as JSON text
             _ensure_column(conn, 'articles', 'key_points', "ALTER TABLE articles ADD COLUMN key_points TEXT")
+            _ensure_column(conn, 'articles', 'summary_hash', "ALTER TABLE articles ADD COLUMN summary_hash VARCHAR(40)")
+            _ensure_column(conn, 'articles', 'source', "ALTER TABLE articles ADD COLUMN source VARCHAR(255)")
+            _ensure_column(conn, 'articles', 'url', "ALTER TABLE articles ADD COLUMN url TEXT")
+            _ensure_column(conn, 'articles', 'revision', "ALTER TABLE articles ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+            _ensure_column(conn, 'topics', 'version', "ALTER TABLE topics ADD COLUMN version INTEGER DEFAULT 0")
+            _ensure_column(conn, 'user_feeds', 'revision', "ALTER TABLE user_feeds ADD COLUMN revision INTEGER DEFAULT 0")
+            _ensure_column(conn, 'user_feeds', 'prev_item_ids', "ALTER TABLE user_feeds ADD COLUMN prev_item_ids BLOB")
+            _ensure_column(conn, 'user_feeds', 'prev_scores', "ALTER TABLE user_feeds ADD COLUMN prev_scores BLOB")
+            _ensure_column(conn, 'user_feeds', 'prev_revision', "ALTER TABLE user_feeds ADD COLUMN prev_revision INTEGER")
         except Exception as e:
             # Non-fatal: log and continue
             print("Warning: could not ensure schema columns:", e)
 
+    # Secondary indexes for the hot access paths (topic pages, listings, interactions)
+    with engine.begin() as conn:
+        try:
+            _ensure_indexes(conn)
+        except Exception as e:
+            print("Warning: could not ensure indexes:", e)
+
     print("DB initialized.")
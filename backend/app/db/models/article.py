@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from sqlalchemy.sql import func, literal_column
 from backend.app.db.session import Base
 
 class Article(Base):
@@ -10,6 +10,24 @@ class Article(Base):
     text = Column(Text)
     published_date = Column(DateTime, default=func.now())
     topic_id = Column(Integer, nullable=True)
+    source = Column(String(255), nullable=True)
+    url = Column(Text, nullable=True)
 
     summary = Column(Text, nullable=True)
     key_points = Column(JSON, nullable=True)
+    # sha1 of the text the summary was made from; stale when the text changes
+    summary_hash = Column(String(40), nullable=True)
+    # bumped by every ORM or Core UPDATE of the row; caches citing the article compare it
+    revision = Column(Integer, nullable=False, default=0, server_default="0",
+                      onupdate=literal_column("revision + 1"))
+
+    __table_args__ = (
+        # topic pages / similar_by_topic: WHERE topic_id = ? ORDER BY published_date DESC
+        Index("ix_articles_topic_published", topic_id, published_date.desc()),
+        # article listing: ORDER BY published_date DESC
+        Index("ix_articles_published_date", published_date),
+    )
+
+
+# change hooks (db.events) must be active in every process that writes articles, scripts included
+import backend.app.db.events  # noqa: E402,F401
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from backend.app.db.session import Base
+
+class DataVersion(Base):
+    """Change counters shared by every process that writes the DB (server workers, scripts)."""
+    __tablename__ = "data_versions"
+
+    name = Column(String(32), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float, LargeBinary, JSON
+from backend.app.db.session import Base
+
+class UserFeed(Base):
+    __tablename__ = "user_feeds"
+
+    user_id = Column(Integer, primary_key=True)
+    # ranked feed as packed little-endian arrays: int32 article ids, float16 scores
+    item_ids = Column(LargeBinary)
+    scores = Column(LargeBinary)
+    # topic_id -> affinity at build time, reused when new articles are merged in
+    topics = Column(JSON, nullable=True)
+
+    profile_ts = Column(Float, nullable=True)   # user profile's last event time when built
+    built_at = Column(Float)                    # epoch seconds
+    version = Column(String(100), nullable=True)  # artifact version the feed was ranked with
+
+    # bumped on every rewrite (rebuild or merge); page cursors carry it. The ranking it
+    # replaced is kept so a client paging through it when it changed can finish.
+    revision = Column(Integer, default=0)
+    prev_item_ids = Column(LargeBinary, nullable=True)
+    prev_scores = Column(LargeBinary, nullable=True)
+    prev_revision = Column(Integer, nullable=True)
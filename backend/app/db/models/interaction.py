@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from backend.app.db.session import Base
 
@@ -10,3 +10,9 @@ class UserInteraction(Base):
     article_id = Column(Integer, ForeignKey("articles.id"))
     event_type = Column(String(50))  # view, like, bookmark, quiz_attempt
     timestamp = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # per-user history and per-article activity, both read newest-first
+        Index("ix_user_interactions_user_ts", user_id, timestamp),
+        Index("ix_user_interactions_article_ts", article_id, timestamp),
+    )
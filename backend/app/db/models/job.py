@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index, text
+from sqlalchemy.sql import func
+from backend.app.db.session import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50))                   # summarize, quiz
+    dedupe_key = Column(String(255), nullable=True)
+    payload = Column(JSON, nullable=True)
+    status = Column(String(20), default="queued")   # queued, running, done, failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    worker = Column(String(100), nullable=True)
+
+    created_at = Column(DateTime, server_default=func.now())
+    run_after = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # workers claim the oldest runnable job: WHERE status = 'queued' ORDER BY id
+        Index("ix_jobs_status_id", status, id),
+        # at most one queued/running job per dedupe key
+        Index(
+            "ux_jobs_active_dedupe", dedupe_key, unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Index
+from backend.app.db.session import Base
+
+class MembershipChange(Base):
+    """Which article entered, left or changed topic at each bump of the "membership" counter."""
+    __tablename__ = "membership_changes"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)     # data_versions.membership of the write
+    article_id = Column(Integer, nullable=False)
+    topic_id = Column(Integer, nullable=True)     # topic after the change
+    deleted = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_membership_changes_version", version),
+    )
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, JSON
+from backend.app.db.session import Base
+
+class Topic(Base):
+    __tablename__ = "topics"
+
+    # BERTopic topic id (same value as Article.topic_id), not an autoincrement key
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(255))
+    keywords = Column(JSON, nullable=True)
+    count = Column(Integer, default=0)
+    # data_versions.articles at the last write touching one of the topic's articles
+    version = Column(Integer, default=0)
@@ -0,0 +1,118 @@
+# backend/app/db/pagination.py
+"""Keyset (cursor) pagination and column projection for article listings.
+
+Pages are ordered newest first on (published_date DESC, id DESC). A cursor is the
+(published_date, id) of the last row of the previous page, so every page is an
+index range seek and page 100 costs the same as page 1. Rows without a
+published_date sort last and are paged by id alone.
+
+SQLite keeps dates as text in whatever format wrote them: SQLAlchemy writes
+'2026-10-19 16:27:34.000000', the column default (CURRENT_TIMESTAMP) writes
+'2026-10-19 16:27:34'. The comparison is on those strings, so there the cursor
+carries the stored text verbatim instead of a re-rendered datetime.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import String, bindparam, func, tuple_, type_coerce
+
+from backend.app.db.models.article import Article
+
+EXCERPT_CHARS = 800
+
+# public field name -> column expression
+ARTICLE_FIELDS = {
+    "id": Article.id,
+    "title": Article.title,
+    "text": Article.text,
+    "excerpt": func.coalesce(func.substr(Article.text, 1, EXCERPT_CHARS), ""),
+    "published_date": Article.published_date,
+    "topic_id": Article.topic_id,
+    "summary": Article.summary,
+    "key_points": Article.key_points,
+}
+
+
+def encode_cursor(published: Union[datetime, str, None], article_id: int) -> str:
+    if isinstance(published, datetime):
+        published = published.isoformat()
+    raw = json.dumps([published, int(article_id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], int]:
+    """Inverse of encode_cursor: (published_date as encoded, id). Raises ValueError on anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        published, article_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if published is not None:
+            datetime.fromisoformat(published)  # validate only
+        return published, int(article_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], allowed: Dict[str, object], default: Sequence[str]) -> List[str]:
+    """Split a `fields=a,b,c` parameter, raising ValueError on unknown names."""
+    if not fields:
+        return list(default)
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in names if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return names
+
+
+def keyset_page(db, fields: Dict[str, object], filters=(), cursor: Optional[str] = None, limit: int = 50):
+    """Fetch one page of articles newest-first.
+
+    `fields` maps output names to column expressions; only those columns (plus the
+    two sort keys) are selected. Returns (rows as dicts, next_cursor or None).
+    """
+    # SQLite: the stored text (see module docstring); elsewhere a real timestamp
+    raw_dates = db.get_bind().dialect.name == "sqlite"
+    date_key = type_coerce(Article.published_date, String) if raw_dates else Article.published_date
+
+    cols = [expr.label(name) for name, expr in fields.items()]
+    cols += [date_key.label("_cursor_date"), Article.id.label("_cursor_id")]
+
+    def base():
+        q = db.query(*cols)
+        for f in filters:
+            q = q.filter(f)
+        return q
+
+    after_date, after_id = decode_cursor(cursor) if cursor else (None, None)
+    rows = []
+
+    # 1) dated rows: (published_date, id) < cursor, served by the published_date indexes
+    if cursor is None or after_date is not None:
+        q = base().filter(Article.published_date.isnot(None))
+        if cursor is not None:
+            q = q.filter(
+                tuple_(Article.published_date, Article.id)
+                < tuple_(bindparam("after_date", after_date if raw_dates else datetime.fromisoformat(after_date),
+                                   type_=String if raw_dates else Article.published_date.type),
+                         bindparam("after_id", after_id))
+            )
+        rows = q.order_by(Article.published_date.desc(), Article.id.desc()).limit(limit).all()
+
+    # 2) undated rows come last, ordered by id
+    if len(rows) < limit:
+        q = base().filter(Article.published_date.is_(None))
+        if after_date is None and after_id is not None:
+            q = q.filter(Article.id < after_id)
+        rows += q.order_by(Article.id.desc()).limit(limit - len(rows)).all()
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor(last._cursor_date, last._cursor_id)
+
+    out = []
+    for r in rows:
+        m = r._mapping
+        out.append({name: m[name] for name in fields})
+    return out, next_cursor
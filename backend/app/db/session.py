@@ -1,12 +1,18 @@
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./news.db"   # change to Postgres later
+DATABASE_URL = os.getenv("NEWSPREP_DATABASE_URL", "sqlite:///./news.db")   # change to Postgres later
 
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False}  # only for SQLite
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}  # only for SQLite
 )
 
+# Forked workers (backend/app/server.py) open their own connections; close=False
+# leaves the parent's pooled connections to the parent.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -0,0 +1,73 @@
+# backend/app/db/versions.py
+"""Named change counters kept in the `data_versions` table.
+
+In-process listeners (db.events) only see writes made by their own process.
+Structures that several processes derive from the same rows (topic catalog,
+centroids, feed signals) compare a counter from here instead: it
+is bumped in the same transaction as the write, by whichever process made it,
+and survives restarts.
+
+    ARTICLES       every article insert, update and delete (db.events)
+    MEMBERSHIP     only inserts, deletes and topic changes; each bump logs its
+                   rows in membership_changes so readers apply just those
+                   (db.events.membership_since)
+    TOPIC_COUNTS   topics.count is maintained incrementally (set by the first
+                   catalog build; absent means counts must be recomputed)
+    TOPICS         topic names/keywords rewritten from a topic model
+    delta:<ver>    rows of artifact version <ver>'s vector delta whose articles
+                   have been announced (services/ingest.py)
+"""
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import insert, select, update
+
+from backend.app.db.session import engine
+from backend.app.db.models.data_version import DataVersion
+
+ARTICLES = "articles"
+MEMBERSHIP = "membership"
+TOPIC_COUNTS = "topic_counts"
+TOPICS = "topics"
+
+
+def read_version(name: str, conn=None) -> Optional[int]:
+    """Current value, or None when the counter was never bumped."""
+    stmt = select(DataVersion.version).where(DataVersion.name == name)
+    if conn is not None:
+        return conn.execute(stmt).scalar()
+    with engine.connect() as c:
+        return c.execute(stmt).scalar()
+
+
+def read_versions(names: Iterable[str], conn=None) -> Dict[str, int]:
+    """Several counters in one query; never-bumped ones read as 0."""
+    names = list(names)
+    stmt = select(DataVersion.name, DataVersion.version).where(DataVersion.name.in_(names))
+    if conn is not None:
+        rows = conn.execute(stmt).all()
+    else:
+        with engine.connect() as c:
+            rows = c.execute(stmt).all()
+    found = {name: int(v) for name, v in rows}
+    return {name: found.get(name, 0) for name in names}
+
+
+def bump_version(conn, name: str) -> int:
+    """Increment a counter inside the caller's transaction; returns the new value."""
+    res = conn.execute(update(DataVersion).where(DataVersion.name == name)
+                       .values(version=DataVersion.version + 1))
+    if not res.rowcount:
+        conn.execute(insert(DataVersion).values(name=name, version=1))
+    return conn.execute(select(DataVersion.version).where(DataVersion.name == name)).scalar()
+
+
+def advance_version(conn, name: str, expect: int, value: int) -> bool:
+    """Set a counter to `value` if it still reads `expect` (absent reads 0); False if it moved."""
+    res = conn.execute(update(DataVersion).where(DataVersion.name == name, DataVersion.version == expect)
+                       .values(version=value))
+    if res.rowcount:
+        return True
+    if expect == 0 and read_version(name, conn) is None:
+        conn.execute(insert(DataVersion).values(name=name, version=value))
+        return True
+    return False
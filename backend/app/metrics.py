@@ -0,0 +1,213 @@
+# backend/app/metrics.py
+"""In-process metrics with a Prometheus text endpoint.
+
+    from backend.app.metrics import stage
+
+    with stage("rag.retrieve"):
+        docs = retriever.invoke(query)
+
+MetricsMiddleware records one latency observation and one status count per request,
+labelled by the route template (/api/topics/{topic_id}, not the concrete path).
+stage() / @timed feed the newsprep_stage_seconds histogram. A SQLAlchemy hook
+counts statements per request. render() writes everything in the Prometheus text
+format; main.py serves it at /metrics.
+
+Everything is plain dicts of counters behind one lock per metric: an observation
+is a bisect and two additions, cheap enough for every request.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from backend.app.db.session import engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels: Tuple[str, ...] = ()):
+        self.name, self.doc, self.labels = name, doc, labels
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_fmt_labels(self.labels, k)} {v:g}" for k, v in sorted(items)]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.doc, self.labels = name, doc, labels
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(label_values)
+            if row is None:
+                row = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[i] += 1
+            row[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        for key, row in sorted(items):
+            cumulative = 0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {cumulative}")
+            cumulative += row[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {row[-1]:.6f}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+# -------------------------------------------------------------------
+# Metrics
+# -------------------------------------------------------------------
+REQUEST_SECONDS = Histogram("newsprep_request_seconds", "HTTP request latency by route.", ("method", "route"))
+REQUESTS = Counter("newsprep_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+STAGE_SECONDS = Histogram("newsprep_stage_seconds", "Latency of internal stages (encode, score, retrieve, llm...).", ("stage",))
+STAGE_ERRORS = Counter("newsprep_stage_errors_total", "Stages that raised.", ("stage",))
+DB_QUERIES = Histogram("newsprep_db_queries_per_request", "SQL statements executed per request.", ("route",), COUNT_BUCKETS)
+DB_QUERIES_TOTAL = Counter("newsprep_db_queries_total", "SQL statements executed.")
+
+_METRICS = [REQUEST_SECONDS, REQUESTS, STAGE_SECONDS, STAGE_ERRORS, DB_QUERIES, DB_QUERIES_TOTAL]
+
+# extra gauge sources (cache counters, model memory...) rendered on scrape
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(fn: Callable[[], List[str]]):
+    """fn() returns ready-made exposition lines; called on every scrape."""
+    _collectors.append(fn)
+    return fn
+
+
+# -------------------------------------------------------------------
+# Stage timers
+# -------------------------------------------------------------------
+@contextmanager
+def stage(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(name)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - t0, name)
+
+
+def timed(name: str):
+    """Decorator form of stage()."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# -------------------------------------------------------------------
+# SQL statement counting
+# -------------------------------------------------------------------
+# one mutable cell per request; sync routes run in a copied context, so they share it
+_query_count: contextvars.ContextVar = contextvars.ContextVar("newsprep_query_count", default=None)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERIES_TOTAL.inc()
+    cell = _query_count.get()
+    if cell is not None:
+        cell[0] += 1
+
+
+def queries_this_request() -> Optional[int]:
+    cell = _query_count.get()
+    return cell[0] if cell is not None else None
+
+
+# -------------------------------------------------------------------
+# Middleware
+# -------------------------------------------------------------------
+class MetricsMiddleware:
+    def __init__(self, app, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def wrapped_send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        token = _query_count.set([0])
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            elapsed = time.perf_counter() - t0
+            queries = _query_count.get()[0]
+            _query_count.reset(token)
+
+            # FastAPI leaves the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            label = getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            REQUEST_SECONDS.observe(elapsed, method, label)
+            REQUESTS.inc(method, label, str(status[0]))
+            DB_QUERIES.observe(queries, label)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for m in _METRICS:
+        lines += m.render()
+    for fn in list(_collectors):
+        try:
+            lines += fn()
+        except Exception as e:
+            print("Metrics collector failed:", e)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,351 @@
+# backend/app/profiling.py
+"""On-demand sampling profiler for live requests.
+
+Two ways to turn it on, both admin-only:
+
+  * per request — send `X-Profile: 1` (plus X-Admin-Token when one is configured).
+    The request gets its own profile; the response carries X-Profile-Id.
+  * time window — POST /api/admin/profiles/window?seconds=30&path=/api/search
+    profiles every matching request for that long, aggregated into one profile.
+
+While at least one profile is active a single sampler thread wakes every
+NEWSPREP_PROFILE_INTERVAL_MS and reads sys._current_frames(). A profile only
+samples the threads registered to it: route handlers (instrument_routes wraps
+every route's dependant.call) and anything run through attach() on their behalf,
+such as the hybrid-search workers. Concurrent profiles therefore never see each
+other's stacks. Async handlers share the event-loop thread, so their samples can
+include other coroutines that ran while the handler was awaiting.
+
+With no active profile the cost is one ContextVar lookup per request and one header
+check in the middleware; the sampler thread is not running at all.
+
+Results are served as collapsed stacks (flamegraph.pl, speedscope import) or
+speedscope JSON.
+"""
+import contextvars
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional
+
+INTERVAL = float(os.getenv("NEWSPREP_PROFILE_INTERVAL_MS", "5")) / 1000.0
+MAX_KEPT = int(os.getenv("NEWSPREP_PROFILE_KEEP", "50"))
+MAX_WINDOW_SECONDS = 600
+
+_ids = itertools.count(1)
+
+
+class Profile:
+    def __init__(self, label: str, kind: str, until: Optional[float] = None, path_prefix: Optional[str] = None):
+        self.id = next(_ids)
+        self.label = label
+        self.kind = kind                  # "request" | "window"
+        self.path_prefix = path_prefix
+        self.started = time.time()
+        self.until = until
+        self.finished: Optional[float] = None
+        self.requests = 0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._threads: Dict[int, int] = {}   # thread id -> nesting depth
+        self._lock = threading.Lock()
+
+    # -- thread membership -------------------------------------------
+    def add_thread(self, tid: int):
+        with self._lock:
+            self._threads[tid] = self._threads.get(tid, 0) + 1
+
+    def remove_thread(self, tid: int):
+        with self._lock:
+            n = self._threads.get(tid, 0) - 1
+            if n <= 0:
+                self._threads.pop(tid, None)
+            else:
+                self._threads[tid] = n
+
+    def threads(self) -> List[int]:
+        with self._lock:
+            return list(self._threads)
+
+    # -- output --------------------------------------------------------
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def speedscope(self) -> dict:
+        frames: List[dict] = []
+        index: Dict[str, int] = {}
+        samples, weights = [], []
+        for stack, n in self.stacks.most_common():
+            row = []
+            for name in stack.split(";"):
+                if name not in index:
+                    index[name] = len(frames)
+                    frames.append({"name": name})
+                row.append(index[name])
+            samples.append(row)
+            weights.append(round(n * INTERVAL * 1000, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.label,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": self.label,
+            "exporter": "newsprep",
+        }
+
+    def as_dict(self) -> dict:
+        end = self.finished or time.time()
+        return {
+            "id": self.id,
+            "label": self.label,
+            "kind": self.kind,
+            "path_prefix": self.path_prefix,
+            "started": self.started,
+            "seconds": round(end - self.started, 3),
+            "active": self.finished is None,
+            "requests": self.requests,
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks),
+        }
+
+
+_lock = threading.Lock()
+_active: Dict[int, Profile] = {}
+_kept: "OrderedDict[int, Profile]" = OrderedDict()
+_sampler: Optional[threading.Thread] = None
+
+# profiles the current request belongs to (None = not profiled; the common case)
+_current: contextvars.ContextVar = contextvars.ContextVar("newsprep_profiles", default=None)
+
+
+# -------------------------------------------------------------------
+# Sampler
+# -------------------------------------------------------------------
+_STOP_AT = set()  # code objects of our own wrappers: stacks are cut there
+
+
+def _frame_name(code) -> str:
+    filename = code.co_filename
+    marker = os.sep + "backend" + os.sep
+    if marker in filename:
+        filename = "backend" + os.sep + filename.split(marker, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _stack(frame) -> str:
+    names = []
+    while frame is not None and frame.f_code not in _STOP_AT:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+def _sample_loop():
+    global _sampler
+    me = threading.get_ident()
+    while True:
+        time.sleep(INTERVAL)
+        now = time.time()
+        with _lock:
+            for p in [p for p in _active.values() if p.until is not None and now >= p.until]:
+                _finish_locked(p)
+            if not _active:
+                _sampler = None
+                return
+            profiles = list(_active.values())
+
+        frames = sys._current_frames()
+        for p in profiles:
+            for tid in p.threads():
+                frame = frames.get(tid)
+                if frame is None or tid == me:
+                    continue
+                stack = _stack(frame)
+                if stack:
+                    p.stacks[stack] += 1
+                    p.samples += 1
+        del frames
+
+
+def _ensure_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = threading.Thread(target=_sample_loop, name="profiler", daemon=True)
+        _sampler.start()
+
+
+def _after_fork():
+    # the sampler thread and the threads being profiled stayed in the parent
+    global _sampler, _lock
+    _sampler, _lock = None, threading.Lock()
+    _active.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _finish_locked(p: Profile):
+    if p.finished is None:
+        p.finished = time.time()
+    _active.pop(p.id, None)
+    _kept[p.id] = p
+    while len(_kept) > MAX_KEPT:
+        _kept.popitem(last=False)
+
+
+# -------------------------------------------------------------------
+# Public API
+# -------------------------------------------------------------------
+def start(label: str, kind: str = "request", seconds: Optional[float] = None,
+          path_prefix: Optional[str] = None) -> Profile:
+    until = time.time() + min(seconds, MAX_WINDOW_SECONDS) if seconds else None
+    p = Profile(label, kind, until=until, path_prefix=path_prefix)
+    with _lock:
+        _active[p.id] = p
+        _ensure_sampler()
+    return p
+
+
+def finish(p: Profile):
+    with _lock:
+        _finish_locked(p)
+
+
+def get(profile_id: int) -> Optional[Profile]:
+    with _lock:
+        return _active.get(profile_id) or _kept.get(profile_id)
+
+
+def list_profiles() -> List[dict]:
+    with _lock:
+        profiles = list(_active.values()) + list(_kept.values())
+    return [p.as_dict() for p in sorted(profiles, key=lambda p: p.id, reverse=True)]
+
+
+def _windows_for(path: str) -> List[Profile]:
+    if not _active:
+        return []
+    with _lock:
+        return [p for p in _active.values()
+                if p.kind == "window" and (not p.path_prefix or path.startswith(p.path_prefix))]
+
+
+@contextmanager
+def attach():
+    """Register the calling thread with the current request's profiles (no-op if none)."""
+    profiles = _current.get()
+    if not profiles:
+        yield
+        return
+    tid = threading.get_ident()
+    for p in profiles:
+        p.add_thread(tid)
+    try:
+        yield
+    finally:
+        for p in profiles:
+            p.remove_thread(tid)
+
+
+def _wrap_call(call):
+    import asyncio
+
+    if asyncio.iscoroutinefunction(call):
+        @wraps(call)
+        async def profiled_async(*args, **kwargs):
+            if _current.get() is None:
+                return await call(*args, **kwargs)
+            with attach():
+                return await call(*args, **kwargs)
+        _STOP_AT.add(profiled_async.__code__)
+        return profiled_async
+
+    @wraps(call)
+    def profiled(*args, **kwargs):
+        if _current.get() is None:
+            return call(*args, **kwargs)
+        with attach():
+            return call(*args, **kwargs)
+    _STOP_AT.add(profiled.__code__)
+    return profiled
+
+
+def instrument_routes(app):
+    """Wrap every API route's endpoint call so its handler thread can be sampled."""
+    from fastapi.routing import APIRoute
+
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not getattr(route.dependant.call, "_profiled", False):
+            route.dependant.call = _wrap_call(route.dependant.call)
+            route.dependant.call._profiled = True
+
+
+# -------------------------------------------------------------------
+# Middleware
+# -------------------------------------------------------------------
+def _header(scope, name: bytes) -> Optional[str]:
+    for k, v in scope.get("headers") or []:
+        if k == name:
+            return v.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    def _wants_profile(self, scope) -> bool:
+        flag = _header(scope, b"x-profile")
+        if not flag or flag.lower() in ("0", "false", "off"):
+            return False
+        from backend.app.routes.admin import is_admin
+        client = scope.get("client")
+        return is_admin(_header(scope, b"x-admin-token"), client[0] if client else "")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiles = _windows_for(scope.get("path", ""))
+        own = None
+        if self._wants_profile(scope):
+            own = start(f'{scope.get("method", "")} {scope.get("path", "")}', kind="request")
+            profiles = profiles + [own]
+        if not profiles:
+            await self.app(scope, receive, send)
+            return
+
+        for p in profiles:
+            p.requests += 1
+
+        async def wrapped_send(message):
+            if own is not None and message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((b"x-profile-id", str(own.id).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(profiles)
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            _current.reset(token)
+            if own is not None:
+                finish(own)
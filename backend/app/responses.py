@@ -0,0 +1,205 @@
+# backend/app/responses.py
+"""Shared JSON response pipeline.
+
+FastJSONResponse serializes in one pass with orjson, which already understands numpy
+scalars/arrays and writes NaN/inf as null, so routes no longer need recursive
+clean-up walks. Routes on hot paths return json_response(...) directly, which also
+skips FastAPI's jsonable_encoder pass over the payload.
+
+CompressionMiddleware compresses large JSON/text bodies (brotli when installed and
+accepted, gzip otherwise).
+"""
+import gzip
+import json
+import math
+from typing import Iterable, List, Optional
+
+from fastapi.responses import JSONResponse
+
+# Optional fast paths — fall back to the stdlib when not installed
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+# -------------------------------------------------------------------
+# Serialization
+# -------------------------------------------------------------------
+def _default(obj):
+    """Types neither orjson nor json know about."""
+    if hasattr(obj, "model_dump"):  # pydantic v2 models
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if np is not None:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    if hasattr(obj, "isoformat"):  # datetime/date (stdlib path), pandas Timestamp
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _sanitize(obj):
+    """Stdlib fallback only: json cannot map NaN/inf to null on its own."""
+    if isinstance(obj, float):
+        return None if math.isnan(obj) or math.isinf(obj) else obj
+    if isinstance(obj, dict):
+        return {k: _sanitize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(v) for v in obj]
+    if np is not None and isinstance(obj, np.generic):
+        return _sanitize(obj.item())
+    return obj
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        _sanitize(content),
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def json_response(content, status_code: int = 200, headers: Optional[dict] = None) -> FastJSONResponse:
+    return FastJSONResponse(content=content, status_code=status_code, headers=headers)
+
+
+# -------------------------------------------------------------------
+# fields= trimming
+# -------------------------------------------------------------------
+def parse_field_list(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    return names or None
+
+
+def select_fields(items: Iterable[dict], fields: Optional[List[str]]) -> List[dict]:
+    """Keep only the requested keys of each result dict (no-op when fields is None)."""
+    if not fields:
+        return list(items)
+    return [{k: it[k] for k in fields if k in it} for it in items]
+
+
+# -------------------------------------------------------------------
+# Compression
+# -------------------------------------------------------------------
+_COMPRESSIBLE = ("application/json", "text/")
+
+
+class CompressionMiddleware:
+    """Compress single-chunk JSON/text responses above `minimum_size` bytes.
+
+    Streaming bodies (SSE, file streams) are passed through untouched so they are
+    never buffered.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 5, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _pick_encoding(self, scope) -> Optional[str]:
+        accept = ""
+        for k, v in scope.get("headers") or []:
+            if k == b"accept-encoding":
+                accept = v.decode("latin-1").lower()
+                break
+        if brotli is not None and "br" in accept:
+            return "br"
+        if "gzip" in accept:
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._pick_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def wrapped_send(message):
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = dict(start_message.get("headers") or [])
+            ctype = headers.get(b"content-type", b"").decode("latin-1")
+            body = message.get("body", b"")
+
+            eligible = (
+                not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+                and b"content-encoding" not in headers
+                and ctype.startswith(_COMPRESSIBLE)
+                and "event-stream" not in ctype
+            )
+            if not eligible:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding)
+            raw_headers = [
+                (k, v) for k, v in start_message.get("headers") or []
+                if k not in (b"content-length", b"vary")
+            ]
+            vary = headers.get(b"vary")
+            raw_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", (vary + b", Accept-Encoding") if vary else b"Accept-Encoding"),
+            ]
+            await send({**start_message, "headers": raw_headers})
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, wrapped_send)
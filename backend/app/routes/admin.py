@@ -0,0 +1,140 @@
+# backend/app/routes/admin.py
+import os
+import hmac
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from backend.app import profiling
+from backend.app.services.model_registry import registry
+from backend.app.services import artifacts, feeds, jobs
+from backend.app.services.response_cache import cache
+from backend.app.services.answer_cache import get_answer_cache
+from backend.app.services.llm_gateway import get_gateway
+
+ADMIN_TOKEN = os.getenv("NEWSPREP_ADMIN_TOKEN")
+_LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost", "testclient")
+
+
+def is_admin(token: Optional[str], host: str) -> bool:
+    """Same rule as require_admin, for callers outside the dependency system (middleware)."""
+    if ADMIN_TOKEN:
+        return bool(token) and hmac.compare_digest(token, ADMIN_TOKEN)
+    return host in _LOCAL_HOSTS
+
+
+def require_admin(request: Request, x_admin_token: str | None = Header(default=None)):
+    """Admin endpoints need X-Admin-Token; without a configured token only loopback may call them."""
+    if ADMIN_TOKEN:
+        if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+            raise HTTPException(status_code=401, detail="Invalid admin token")
+        return
+    host = request.client.host if request.client else ""
+    if host not in _LOCAL_HOSTS:
+        raise HTTPException(status_code=403, detail="Admin endpoints are local-only unless NEWSPREP_ADMIN_TOKEN is set")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/models", summary="Loaded models, reference counts and memory")
+def list_models():
+    models = registry.stats()
+    return {
+        "models": models,
+        "total_bytes": sum(m["bytes"] or 0 for m in models),
+    }
+
+
+@router.get("/artifacts", summary="Live artifact version, draining versions and swap state")
+def artifact_status():
+    return artifacts.status()
+
+
+@router.post("/artifacts/reload", status_code=202, summary="Load an artifact version and hot-swap to it")
+def reload_artifacts(version: str | None = None):
+    """Load `version` (default: the one named in CURRENT) in the background, then swap."""
+    target = version or artifacts.current_version()
+    try:
+        artifacts.read_manifest(target)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not artifacts.swap_async(target):
+        raise HTTPException(status_code=409, detail="A swap is already in progress")
+    return {"accepted": True, "version": target}
+
+
+@router.get("/cache", summary="Response and answer cache counters")
+def cache_status():
+    return {**cache.stats(), "answers": get_answer_cache().stats()}
+
+
+@router.post("/cache/clear", summary="Drop every cached response and answer")
+def clear_cache():
+    cache.clear()
+    get_answer_cache().clear()
+    return {"cleared": True}
+
+
+@router.get("/profiles", summary="Active and recent request profiles")
+def list_profiles():
+    return {"profiles": profiling.list_profiles(), "interval_ms": profiling.INTERVAL * 1000}
+
+
+@router.post("/profiles/window", status_code=201, summary="Profile all matching requests for a while")
+def start_profile_window(
+    seconds: float = Query(30, gt=0, le=profiling.MAX_WINDOW_SECONDS),
+    path: Optional[str] = Query(None, description="Only requests whose path starts with this"),
+):
+    p = profiling.start(f"window {path or '*'} {seconds:g}s", kind="window", seconds=seconds, path_prefix=path)
+    return p.as_dict()
+
+
+@router.post("/profiles/{profile_id}/stop", summary="End a profiling window early")
+def stop_profile(profile_id: int):
+    p = profiling.get(profile_id)
+    if p is None:
+        raise HTTPException(status_code=404, detail="Unknown profile")
+    profiling.finish(p)
+    return p.as_dict()
+
+
+@router.get("/profiles/{profile_id}", summary="Sampled stacks: collapsed text or speedscope JSON")
+def get_profile(profile_id: int, format: str = Query("collapsed", pattern="^(collapsed|speedscope|summary)$")):
+    p = profiling.get(profile_id)
+    if p is None:
+        raise HTTPException(status_code=404, detail="Unknown profile")
+    if format == "collapsed":
+        return PlainTextResponse(p.collapsed())
+    if format == "speedscope":
+        return p.speedscope()
+    return p.as_dict()
+
+
+@router.get("/llm", summary="LLM gateway: backend, limits, cache and per-caller usage")
+def llm_status():
+    return get_gateway().stats()
+
+
+@router.post("/llm/cache/clear", summary="Drop cached LLM responses")
+def clear_llm_cache():
+    get_gateway().clear_cache()
+    return {"cleared": True}
+
+
+@router.get("/feeds", summary="Materialized feeds: count, age and ranking weights")
+def feed_status():
+    return feeds.stats()
+
+
+@router.post("/feeds/rebuild", status_code=202, summary="Queue a rebuild of active users' feeds")
+def rebuild_feeds(days: float = Query(30.0, gt=0), batch: int = Query(500, ge=1, le=10000)):
+    users = feeds.active_users(days)
+    queued = 0
+    for i in range(0, len(users), batch):
+        chunk = users[i:i + batch]
+        _, created = jobs.enqueue("feed_refresh", {"user_ids": chunk}, dedupe_key=f"feeds:{chunk[0]}-{chunk[-1]}")
+        queued += created
+    return {"users": len(users), "jobs": queued}
@@ -1,10 +1,12 @@
 # backend/app/routes/article.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from backend.app.db.session import SessionLocal
 from backend.app.db.models.article import Article
+from backend.app.db.pagination import ARTICLE_FIELDS, keyset_page, parse_fields
+from backend.app.responses import json_response
 
 router = APIRouter()
 
@@ -17,19 +19,46 @@ class ArticleOut(BaseModel):
     topic_id: int | None
     summary: str | None
     key_points: List[str] | None
+    # only present when requested through ?fields=
+    excerpt: str | None = None
 
     # Pydantic v2: use `from_attributes` to read ORM objects
     model_config = {"from_attributes": True}
 
+# full rows by default, matching ArticleOut; ?fields= narrows the SELECT
+_DEFAULT_FIELDS = ["id", "title", "text", "published_date", "topic_id", "summary", "key_points"]
+
+
 @router.get("/", response_model=List[ArticleOut])
-def list_articles(limit: int = 50):
+def list_articles(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of columns, e.g. id,title,excerpt"),
+):
+    """Newest-first article listing with keyset pagination.
+
+    The body stays a plain list; the cursor for the next page is sent in the
+    X-Next-Cursor header (absent on the last page).
+    """
+    try:
+        names = parse_fields(fields, ARTICLE_FIELDS, _DEFAULT_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     db = SessionLocal()
     try:
-        articles = db.query(Article).order_by(Article.published_date.desc()).limit(limit).all()
-        return articles
+        items, next_cursor = keyset_page(
+            db, {n: ARTICLE_FIELDS[n] for n in names}, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     finally:
         db.close()
 
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    # rows are already shaped; skip response_model re-validation
+    return json_response(items, headers=headers)
+
 @router.get("/{article_id}", response_model=ArticleOut)
 def get_article(article_id: int):
     db = SessionLocal()
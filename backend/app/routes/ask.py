@@ -1,12 +1,20 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from backend.app.services.rag_service import ask_question
+from backend.app.services.rag_service import ask_question, warmup as rag_warmup
+from backend.app.services import warmup
+from backend.app.services.llm_gateway import LLMTimeout
 
 router = APIRouter()
 
+# needs Ollama + LangChain; /api/ask builds the store on demand if this fails
+warmup.register("rag", rag_warmup, required=False)
+
 class AskRequest(BaseModel):
     query: str
 
 @router.post("/ask")
 def ask(req: AskRequest):
-    return ask_question(req.query)
+    try:
+        return ask_question(req.query)
+    except LLMTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
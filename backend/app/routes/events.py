@@ -1,18 +1,17 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
-import json
-import os
 from datetime import datetime
 
 from backend.app.db.session import SessionLocal
 from backend.app.db.models.interaction import UserInteraction
 from backend.app.db.models.article_stats import ArticleStats
+from backend.app.services.response_cache import cache
+from backend.app.services.event_log import event_ts, get_event_log
+from backend.app.services import user_profiles
 
 router = APIRouter()
 
-EVENTS_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data", "events.jsonl"))
-
 
 class EventIn(BaseModel):
     user_id: Optional[int] = None
@@ -24,14 +23,12 @@ class EventIn(BaseModel):
 
 @router.post("/", status_code=201)
 def post_event(ev: EventIn):
-    # ensure folder exists
-    os.makedirs(os.path.dirname(EVENTS_FILE), exist_ok=True)
     record = ev.dict()
-    record["ts"] = (ev.ts or datetime.utcnow()).isoformat()
-    # append JSONL for audit/backups
+    ts = ev.ts or datetime.utcnow()
+    record["ts"] = ts.isoformat()
+    # append to the segmented event log for audit/backups (scripts/replay_events.py)
     try:
-        with open(EVENTS_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        get_event_log().append(record)
     except Exception:
         # non-fatal; continue to DB persist
         pass
@@ -56,10 +53,17 @@ def post_event(ev: EventIn):
         ui = UserInteraction(user_id=ev.user_id, article_id=ev.item_id, event_type=ev.event)
         db.add(ui)
         db.commit()
+        cache.bump("stats")
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         db.close()
 
+    # fold the event into the user's "for you" profile
+    try:
+        user_profiles.record_interaction(ev.user_id, ev.item_id, ev.event, event_ts(ts))
+    except Exception as e:
+        print("Profile update failed:", e)
+
     return {"ok": True}
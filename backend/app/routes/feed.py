@@ -0,0 +1,67 @@
+# backend/app/routes/feed.py
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.app.responses import json_response
+from backend.app.services import feeds
+from backend.app.services.recommender import get_recommender
+
+router = APIRouter()
+
+
+@router.get("/{user_id}", summary="Precomputed home feed for a user")
+def get_feed(
+    user_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+):
+    """One page of the user's materialized feed.
+
+    The body is a plain list; the cursor for the next page is sent in the
+    X-Next-Cursor header (absent on the last page). Cursors are
+    "<revision>:<offset>": later pages come from the ranking the first page
+    did, even if the feed was rebuilt in between; 410 once that ranking is
+    gone (start again without a cursor). X-Feed-Stale: 1 means a rebuild was
+    queued or this page comes from the previous ranking.
+    """
+    revision = None
+    try:
+        if cursor:
+            rev, sep, off = cursor.rpartition(":")
+            offset = int(off)
+            revision = int(rev) if sep else None
+        else:
+            offset = 0
+        if offset < 0:
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    try:
+        page = feeds.get_page(user_id, offset=offset, limit=limit, revision=revision)
+    except feeds.UnknownUser as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except feeds.CursorExpired:
+        raise HTTPException(status_code=410, detail="Feed changed since this cursor was issued; start from the first page")
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    metas = {m["id"]: m for m in get_recommender().get_article_meta(page["ids"])}
+    out = []
+    for aid, score in zip(page["ids"], page["scores"]):
+        m = metas.get(aid)
+        if m is None:
+            continue  # deleted since the feed was built
+        out.append({
+            "id": m["id"],
+            "title": m.get("title"),
+            "excerpt": m.get("excerpt"),
+            "score": float(score),
+            "topic_id": m.get("topic_id"),
+        })
+
+    headers = {"X-Feed-Stale": "1" if page["stale"] else "0"}
+    if offset + limit < page["total"]:
+        headers["X-Next-Cursor"] = f"{page['revision']}:{offset + limit}"
+    return json_response(out, headers=headers)
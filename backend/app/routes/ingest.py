@@ -0,0 +1,69 @@
+# backend/app/routes/ingest.py
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+
+from backend.app.routes.admin import require_admin
+from backend.app.routes.jobs import job_links
+from backend.app.services import ingest
+
+try:
+    import orjson
+    _loads = orjson.loads
+except Exception:
+    import json
+    _loads = json.loads
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+MAX_ERRORS_REPORTED = 20
+
+
+@router.post("/articles", status_code=202, summary="Bulk-ingest articles from an NDJSON stream")
+async def ingest_articles(request: Request):
+    """One JSON object per line: title, text, published_date (ISO), optional topic_id.
+
+    Rows are inserted as the body streams in, INSERT_BATCH at a time; invalid lines
+    are skipped and reported. One indexing job (embeddings, topics, vector indexes,
+    caches) is queued for everything inserted; follow it at status_url.
+    """
+    received = 0
+    ids, errors, batch = [], [], []
+    pending = b""
+
+    async def flush():
+        nonlocal batch
+        if batch:
+            ids.extend(await run_in_threadpool(ingest.insert_articles, batch))
+            batch = []
+
+    def take(line: bytes):
+        nonlocal received
+        if not line.strip():
+            return
+        received += 1
+        try:
+            batch.append(ingest.parse_article(_loads(line)))
+        except Exception as e:
+            if len(errors) < MAX_ERRORS_REPORTED:
+                errors.append({"line": received, "error": str(e)})
+
+    async for chunk in request.stream():
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            take(line)
+        if len(batch) >= ingest.INSERT_BATCH:
+            await flush()
+    take(pending)
+    await flush()
+
+    job = await run_in_threadpool(ingest.queue_indexing, ids)
+    return {
+        "received": received,
+        "inserted": len(ids),
+        "rejected": received - len(ids),
+        "errors": errors,
+        "first_id": ids[0] if ids else None,
+        "last_id": ids[-1] if ids else None,
+        "indexing": job_links(job) if job else None,
+    }
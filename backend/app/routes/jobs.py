@@ -0,0 +1,63 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from backend.app.responses import dumps
+from backend.app.services.jobs import DONE, FAILED, get_job, list_jobs, wait_for_change
+
+router = APIRouter()
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def job_links(job: dict) -> dict:
+    """Job summary returned by the endpoints that enqueue work."""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/api/jobs/{job['id']}",
+        "events_url": f"/api/jobs/{job['id']}/events",
+    }
+
+
+@router.get("/")
+def jobs_list(status: Optional[str] = Query(None), kind: Optional[str] = Query(None),
+              limit: int = Query(50, ge=1, le=500)):
+    return {"jobs": list_jobs(status=status, kind=kind, limit=limit)}
+
+
+@router.get("/{job_id}")
+def job_status(job_id: int):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: int, request: Request):
+    """Server-sent events: one `status` event per state change, closed once the job is done or failed."""
+    job = await run_in_threadpool(get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def stream():
+        current, last = job, None
+        while True:
+            if current["status"] != last:
+                last = current["status"]
+                yield b"event: status\ndata: " + dumps(current) + b"\n\n"
+                if last in (DONE, FAILED):
+                    return
+            else:
+                yield b": keepalive\n\n"
+            if await request.is_disconnected():
+                return
+            current = await wait_for_change(job_id, last, SSE_KEEPALIVE_SECONDS)
+            if current is None:
+                return
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,18 +1,21 @@
 from fastapi import APIRouter, HTTPException
-from backend.app.services.quiz_service import generate_quiz_from_article, get_quiz
+from backend.app.responses import json_response
+from backend.app.routes.jobs import job_links
+from backend.app.services import jobs
 
 router = APIRouter()
 
-@router.post("/quiz/{article_id}")
+@router.post("/quiz/{article_id}", status_code=202)
 def create_quiz(article_id: int):
-    result = generate_quiz_from_article(article_id)
-    if "error" in result:
-        raise HTTPException(status_code=404, detail=result["error"])
-    return result
+    # LLM generation runs in a job worker; the finished job's result holds the quiz_id
+    job, created = jobs.enqueue("quiz", {"article_id": article_id}, dedupe_key=f"quiz:{article_id}")
+    return json_response({**job_links(job), "article_id": article_id, "deduplicated": not created},
+                         status_code=202)
 
 
 @router.get("/quiz/{quiz_id}")
 def fetch_quiz(quiz_id: int):
+    from backend.app.services.quiz_services import get_quiz  # LangChain, imported on first use
     data = get_quiz(quiz_id)
     if not data:
         raise HTTPException(status_code=404, detail="Quiz not found")
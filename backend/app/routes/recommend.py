@@ -1,7 +1,12 @@
 from fastapi import APIRouter, HTTPException
-from typing import List
+from typing import List, Tuple
 
+from backend.app.db.session import SessionLocal
+from backend.app.db.models.article_stats import ArticleStats
+from backend.app.db.models.interaction import UserInteraction
 from backend.app.services.recommender import get_recommender
+from backend.app.services import user_profiles, warmup
+from backend.app.services.response_cache import cached
 import os
 import json
 
@@ -32,7 +37,19 @@ def _load_pop():
 router = APIRouter()
 
 
+def _load_recommender():
+    try:
+        get_recommender().load()
+    except FileNotFoundError as e:
+        # endpoints answer 503 until embeddings are precomputed
+        raise warmup.ComponentDisabled(str(e))
+
+
+warmup.register("recommender", _load_recommender)
+
+
 @router.get("/article/{article_id}", summary="Recommend by article id")
+@cached(ttl=300, deps=("articles", "artifacts"))
 def recommend_by_article(article_id: int, n: int = 8):
     r = get_recommender()
     try:
@@ -57,6 +74,7 @@ def recommend_by_article(article_id: int, n: int = 8):
 
 
 @router.get("/topic/{topic_id}", summary="Recommend by topic id")
+@cached(ttl=300, deps=("articles", "artifacts"))
 def recommend_by_topic(topic_id: int, n: int = 8):
     r = get_recommender()
     try:
@@ -79,7 +97,10 @@ def recommend_by_topic(topic_id: int, n: int = 8):
     return out
 
 
+# collab_recs.json / popularity.json are offline exports, not live counts: no "stats" dep,
+# the TTL picks up a new export
 @router.get("/collab/article/{article_id}", summary="Collaborative recs by article id")
+@cached(ttl=60, deps=("articles",))
 def collab_by_article(article_id: int, n: int = 8):
     collab = _load_collab()
     lst = collab.get(str(article_id)) or collab.get(int(article_id)) or []
@@ -101,6 +122,7 @@ def collab_by_article(article_id: int, n: int = 8):
 
 
 @router.get("/hybrid/article/{article_id}", summary="Hybrid recs for article")
+@cached(ttl=60, deps=("articles", "artifacts"))
 def hybrid_by_article(article_id: int, n: int = 8, alpha: float = Query(0.7), beta: float = Query(0.2)):
     """Blend content-based (alpha) with collaborative (beta) and popularity (remaining)."""
     # load sources
@@ -137,3 +159,60 @@ def hybrid_by_article(article_id: int, n: int = 8, alpha: float = Query(0.7), be
             "topic_id": m.get("topic_id"),
         })
     return out
+
+
+def _seen_articles(user_id: int) -> List[int]:
+    db = SessionLocal()
+    try:
+        rows = db.query(UserInteraction.article_id).filter(UserInteraction.user_id == user_id).distinct().all()
+        return [int(r[0]) for r in rows if r[0] is not None]
+    finally:
+        db.close()
+
+
+def _most_viewed(n: int, exclude: set) -> List[Tuple[int, float]]:
+    """Cold start: the most viewed articles the user has not seen yet."""
+    db = SessionLocal()
+    try:
+        rows = (db.query(ArticleStats.article_id, ArticleStats.views)
+                .order_by(ArticleStats.views.desc())
+                .limit(n + len(exclude)).all())
+    finally:
+        db.close()
+    top = max((r[1] or 0 for r in rows), default=0) or 1
+    return [(int(aid), float(views or 0) / top) for aid, views in rows if aid not in exclude][:n]
+
+
+@router.get("/user/{user_id}", summary="Personalized recommendations for a user")
+@cached(ttl=30, deps=("articles", "stats", "artifacts"))
+def recommend_for_user(user_id: int, n: int = Query(8, ge=1, le=100)):
+    """Nearest unseen articles to the user's profile vector (popular articles without history)."""
+    r = get_recommender()
+    try:
+        r.load()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    seen = set(_seen_articles(user_id))
+    profile = user_profiles.get_user_profiles(r.embeddings.shape[1]).get(user_id)
+    if profile is not None:
+        pairs = r.similar_by_embedding(profile, top_n=n, exclude=seen)
+        source = "profile"
+    else:
+        pairs = _most_viewed(n, seen)
+        source = "popular"
+
+    ids = [pid for pid, score in pairs]
+    metas = r.get_article_meta(ids)
+    id_to_score = {pid: score for pid, score in pairs}
+    out = []
+    for m in metas:
+        out.append({
+            "id": m["id"],
+            "title": m.get("title"),
+            "excerpt": m.get("excerpt"),
+            "score": float(id_to_score.get(m["id"], 0.0)),
+            "topic_id": m.get("topic_id"),
+            "source": source,
+        })
+    return out
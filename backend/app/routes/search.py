@@ -1,54 +1,43 @@
 from fastapi import APIRouter, Query, HTTPException
-import os
-import numpy as np  # ✅ FIX: Needed for np.floating
-from backend.app.services.topic_service import get_topic_service
+from typing import Optional
+from backend.app.services import artifacts
+from backend.app.responses import json_response, parse_field_list, select_fields
+from backend.app.services import warmup
+from backend.app.services.hybrid_search import hybrid_search
+from backend.app.services.response_cache import cached
 
 router = APIRouter()
 
-_ts = None
+def _ensure_service():
+    # india_global model of the live artifact version (loaded on first use)
+    return artifacts.current().topic_service("india_global")
 
 
-def _ensure_service():
-    global _ts
-    if _ts is None:
-        topics_model_path = os.path.abspath(r"backend/app/ml/models/topics/bertopic_india_global")
-        articles_csv = os.path.abspath(r"backend/app/ml/data/topic_corpus/ag_bbc_india_with_topics.csv")
-        _ts = get_topic_service(model_path=topics_model_path, articles_csv=articles_csv)
-    return _ts
-
-
-# --- GLOBAL SANITIZER (fixes NaN crashing JSON) ------------------------------------
-import math
-
-def clean_json(obj):
-    """Recursively clean floats (nan/inf) in lists, dicts, tuples."""
-    if isinstance(obj, dict):
-        return {k: clean_json(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [clean_json(v) for v in obj]
-    if isinstance(obj, tuple):
-        return tuple(clean_json(list(obj)))
-    if isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return 0.0
-        return float(obj)
-    if isinstance(obj, (np.floating,)):
-        v = float(obj)
-        if math.isnan(v) or math.isinf(v):
-            return 0.0
-        return v
-    return obj
-# -----------------------------------------------------------------------------
+warmup.register("search_service", _ensure_service)
 
 
 @router.get("/search", summary="Keyword + semantic search")
-def search(q: str = Query(..., min_length=2), k: int = 10):
+@cached(ttl=120, deps=("articles", "artifacts"), casefold=("q",))
+def search(
+    q: str = Query(..., min_length=2),
+    k: int = 10,
+    fields: Optional[str] = Query(None, description="Comma-separated result keys to keep, e.g. id,title,score"),
+    mode: str = Query("split", pattern="^(split|rrf|weighted)$",
+                      description="split: separate keyword/semantic lists; rrf|weighted: one fused list"),
+    semantic_weight: float = Query(0.5, ge=0.0, le=1.0),
+):
     svc = _ensure_service()
+    keep = parse_field_list(fields)
+
+    if mode != "split":
+        response = hybrid_search(svc, q, top_k=k, mode=mode, semantic_weight=semantic_weight)
+        response["results"] = select_fields(response["results"], keep)
+        return json_response(response)
 
-    kw_results = svc.keyword_search(q, top_k=k)
+    kw_results = select_fields(svc.keyword_search(q, top_k=k), keep)
 
     if svc.has_embeddings():
-        sem_results = svc.semantic_search(q, top_k=k)
+        sem_results = select_fields(svc.semantic_search(q, top_k=k), keep)
 
         response = {
             "query": q,
@@ -61,7 +50,8 @@ def search(q: str = Query(..., min_length=2), k: int = 10):
             "keyword": kw_results
         }
 
-    return clean_json(response)  # ✅ sanitize before sending JSON
+    # scores are finite at the source (TopicService, hybrid_search): NaN/inf go out as 0.0
+    return json_response(response)
 
 
 @router.get("/recommend", summary="Recommend similar articles by article id")
@@ -73,7 +63,7 @@ def recommend(article_id: int, k: int = 5):
 
     results = svc.recommend_by_article(article_id, top_k=k)
 
-    return clean_json({
+    return json_response({
         "article_id": article_id,
         "results": results
     })
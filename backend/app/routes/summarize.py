@@ -1,40 +1,50 @@
-from fastapi import APIRouter, HTTPException, Body, Query
+from fastapi import APIRouter, HTTPException, Body
 from pydantic import BaseModel
-from backend.app.services.summarizer import summarize_article_and_store, summarize_text
+
+from backend.app.db.session import SessionLocal
+from backend.app.db.models.article import Article
+from backend.app.responses import json_response
+from backend.app.routes.jobs import job_links
+from backend.app.services import jobs
 
 router = APIRouter()
 
+# GET /api/summarize (summarize arbitrary text) is served by main.py.
+
 
 class SummarizeRequest(BaseModel):
     article_id: int
     use_abstractive: bool = True
 
 
-@router.post("/summarize")
+def _enqueue_summary(article_id: int, use_abstractive: bool):
+    """Queue the summarize job; the map-reduce LLM run happens in a job worker, not in this request."""
+    db = SessionLocal()
+    try:
+        exists = db.query(Article.id).filter(Article.id == article_id).first() is not None
+    finally:
+        db.close()
+    if not exists:
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    job, created = jobs.enqueue(
+        "summarize",
+        {"article_id": article_id, "use_abstractive": use_abstractive},
+        dedupe_key=f"summarize:{article_id}:{'abstractive' if use_abstractive else 'extractive'}",
+    )
+    return json_response({**job_links(job), "article_id": article_id, "deduplicated": not created},
+                         status_code=202)
+
+
+@router.post("/summarize", status_code=202)
 def summarize(req: SummarizeRequest):
-    result = summarize_article_and_store(req.article_id, use_abstractive=req.use_abstractive)
-    if result.get("error"):
-        raise HTTPException(status_code=404, detail=result["error"])
-    return result
+    return _enqueue_summary(req.article_id, req.use_abstractive)
 
 
-@router.get("/summarize")
-def summarize_text_endpoint(text: str = Query(...), type: str = Query("abstractive")):
-    try:
-        use_abstractive = type == "abstractive"
-        summary = summarize_text(text, use_abstractive=use_abstractive)
-        return {"summary": summary}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@router.post("/summarize/{article_id}")
+@router.post("/summarize/{article_id}", status_code=202)
 def summarize_by_id(article_id: int, payload: dict = Body(default=None)):
     # Accepts an optional JSON body like {"abstractive": true}
     use_abstractive = True
     if isinstance(payload, dict) and "abstractive" in payload:
         use_abstractive = bool(payload.get("abstractive"))
-
-    result = summarize_article_and_store(article_id, use_abstractive=use_abstractive)
-    if result.get("error"):
-        raise HTTPException(status_code=404, detail=result["error"])
-    return result
+    return _enqueue_summary(article_id, use_abstractive)
@@ -1,205 +1,140 @@
 # backend/app/routes/topics.py
 
-from fastapi import APIRouter, HTTPException
-import math
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Optional
 
-from sqlalchemy import func
 from backend.app.db.session import SessionLocal
 from backend.app.db.models.article import Article
-
-# Topic service (optional: only for metadata / keywords)
-try:
-    from backend.app.services.topic_service import get_topic_service
-    TS_AVAILABLE = True
-except Exception:
-    TS_AVAILABLE = False
+from backend.app.db.pagination import ARTICLE_FIELDS, keyset_page, parse_fields
+from backend.app.services.topic_catalog import get_topic_catalog
+from backend.app.services.recommender import get_recommender
+from backend.app.services import artifacts, warmup
+from backend.app.responses import json_response
+from backend.app.services.response_cache import cache, cached
 
 router = APIRouter()
 
-# Global reference to topic service
-_ts = None
 
+def _topic_service():
+    """Global-topics service of the pinned artifact version, if it has been loaded."""
+    return artifacts.current().loaded_topic_service("global")
 
-# -------------------------------------------------------------------
-# Helpers
-# -------------------------------------------------------------------
-def safe_json(obj):
-    """Convert NaN/inf to None for JSON."""
-    if isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return None
-        return obj
-    if isinstance(obj, dict):
-        return {k: safe_json(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [safe_json(v) for v in obj]
-    return obj
+
+def _apply_metadata(ts):
+    # Names come from the model when present
+    get_topic_catalog().set_metadata(
+        topic_info=ts.topic_info if ts.topic_model else None,
+        topic_keywords=getattr(ts, "topic_keywords", None),
+    )
 
 
 # -------------------------------------------------------------------
-# Startup → Load BERTopic model (optional, only if available)
+# Warmup → Load BERTopic model (optional, only if available)
 # -------------------------------------------------------------------
-@router.on_event("startup")
-def startup_topic_service():
-    global _ts
-
-    if not TS_AVAILABLE:
-        print("Topic service not available. Using DB-only topics.")
-        return
-
-    MODEL_PATH = "backend/app/ml/models/topics/bertopic_global"
-    CSV_PATH = "backend/app/ml/data/topic_corpus/ag_bbc_india_with_topics.csv"
-    KEYWORDS_PATH = "backend/app/ml/models/topics/bertopic_keywords.json"
+def load_topic_service():
+    # Catalog first: topic listing does not need the model to be loaded
+    catalog = get_topic_catalog()
+    catalog.load_or_build()
 
     try:
         print("Loading BERTopic service...")
-        _ts = get_topic_service(
-            model_path=MODEL_PATH,
-            articles_csv=CSV_PATH  # Only used for topic names — articles come from DB
-        )
-        # Load keywords for better topic names
-        import json
-        import os
-        if os.path.exists(KEYWORDS_PATH):
-            with open(KEYWORDS_PATH, 'r') as f:
-                _ts.topic_keywords = json.load(f)
+        # Corpus CSV is only used for topic names — articles come from DB
+        ts = artifacts.current().topic_service("global")
         print("Topic service loaded.")
     except Exception as e:
         print("Failed to load topic service:", e)
-        _ts = None
+        raise
+
+    _apply_metadata(ts)
+
+
+@artifacts.on_swap
+def _refresh_topic_names(gen):
+    ts = gen.loaded_topic_service("global")
+    if ts:
+        _apply_metadata(ts)
+        # the cache's own swap hook may have run first: drop pages rendered with the old names
+        cache.bump("artifacts")
+
+
+warmup.register("topic_service", load_topic_service)
 
 
 # -------------------------------------------------------------------
-# GET /api/topics  → ALL TOPICS (DB is source of truth)
+# GET /api/topics  → ALL TOPICS (served from the topic catalog)
 # -------------------------------------------------------------------
+def _not_modified(request: Request, etag: str) -> bool:
+    return etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+
+
 @router.get("/", summary="List all discovered topics")
-def list_topics():
-    db = SessionLocal()
-    try:
-        # Count articles per topic from DB
-        counts = {
-            row[0]: row[1]
-            for row in db.query(Article.topic_id, func.count(Article.id))
-                         .group_by(Article.topic_id)
-                         .all()
-        }
-    finally:
-        db.close()
+def list_topics(request: Request):
+    catalog = get_topic_catalog()
+    etag = catalog.etag()
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-    topics_list = []
-
-    # If BERTopic metadata available → enrich names/keywords
-    if _ts and _ts.topic_model:
-        topic_info = _ts.get_topic_info()
-
-        for t in topic_info:
-            tid = int(t["Topic"])
-            if tid == -1:
-                continue
-
-            # Get better topic name from keywords
-            topic_name = f"Topic {tid}"
-            keywords = t.get("Representation", [])
-            
-            if hasattr(_ts, 'topic_keywords') and str(tid) in _ts.topic_keywords:
-                kw_list = _ts.topic_keywords[str(tid)][:3]  # Top 3 keywords
-                topic_name = " | ".join(kw_list).title()
-                keywords = _ts.topic_keywords[str(tid)]
-            elif t.get("Name"):
-                topic_name = t.get("Name")
-            elif keywords:
-                topic_name = " | ".join(keywords[:3]).title()
-                
-            topics_list.append({
-                "topic_id": tid,
-                "name": topic_name,
-                "keywords": keywords,
-                "count": int(counts.get(tid, 0)),
-            })
-
-    else:
-        # Fallback: DB-only topics with keywords if available
-        for tid, cnt in counts.items():
-            if tid is None or tid == -1:
-                continue
-            
-            topic_name = f"Topic {tid}"
-            keywords = []
-            
-            if _ts and hasattr(_ts, 'topic_keywords') and str(tid) in _ts.topic_keywords:
-                kw_list = _ts.topic_keywords[str(tid)][:3]
-                topic_name = " | ".join(kw_list).title()
-                keywords = _ts.topic_keywords[str(tid)]
-                
-            topics_list.append({
-                "topic_id": int(tid),
-                "name": topic_name,
-                "keywords": keywords,
-                "count": int(cnt),
-            })
-
-    return safe_json(topics_list)
+    return json_response(catalog.list_topics(), headers={"ETag": etag})
 
 
 # -------------------------------------------------------------------
 # GET /api/topics/{topic_id}  → Topic detail + articles
 # -------------------------------------------------------------------
-@router.get("/{topic_id}", summary="Get topic metadata + top 50 articles")
-def get_topic(topic_id: int):
-
-    # Get topic metadata (if BERTopic available)
-    if _ts and _ts.topic_model:
-        try:
-            meta = _ts.get_topic_info(topic_id)
-        except Exception:
-            meta = None
-    else:
-        meta = None
-
-    # Fetch articles from DB
+# field name in the topic detail payload -> column expression
+_TOPIC_DOC_FIELDS = {
+    "id": ARTICLE_FIELDS["id"],
+    "title": ARTICLE_FIELDS["title"],
+    "text": ARTICLE_FIELDS["excerpt"],   # first 800 chars, cut in SQL
+    "summary": ARTICLE_FIELDS["summary"],
+    "key_points": ARTICLE_FIELDS["key_points"],
+    "published": ARTICLE_FIELDS["published_date"],
+}
+
+
+@router.get("/{topic_id}", summary="Get topic metadata + a page of articles")
+# "artifacts": topic names/keywords come from the topic model of the pinned generation
+@cached(ttl=300, deps=("articles", "artifacts"))
+def get_topic(
+    topic_id: int,
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    catalog = get_topic_catalog()
+    etag = catalog.etag(topic_id)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    try:
+        names = parse_fields(fields, _TOPIC_DOC_FIELDS, list(_TOPIC_DOC_FIELDS))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Fetch one page of articles from DB (only the requested columns)
     db = SessionLocal()
     try:
-        rows = (
-            db.query(Article)
-              .filter(Article.topic_id == topic_id)
-              .order_by(Article.published_date.desc())
-              .limit(50)
-              .all()
+        docs, next_cursor = keyset_page(
+            db,
+            {n: _TOPIC_DOC_FIELDS[n] for n in names},
+            filters=[Article.topic_id == topic_id],
+            cursor=cursor,
+            limit=limit,
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     finally:
         db.close()
 
-    docs = [
-        {
-            "id": r.id,
-            "title": r.title,
-            "text": (r.text or "")[:800],
-            "summary": r.summary,
-            "key_points": r.key_points,
-            "published": r.published_date.isoformat() if r.published_date else None,
-        }
-        for r in rows
-    ]
-
-    # Get better topic name
-    topic_name = f"Topic {topic_id}"
-    keywords = []
-    
-    if meta:
-        topic_name = meta.get("Name", f"Topic {topic_id}")
-        keywords = meta.get("Representation", [])
-    
-    if _ts and hasattr(_ts, 'topic_keywords') and str(topic_id) in _ts.topic_keywords:
-        kw_list = _ts.topic_keywords[str(topic_id)][:3]
-        topic_name = " | ".join(kw_list).title()
-        keywords = _ts.topic_keywords[str(topic_id)]
-    
-    return {
+    meta = catalog.get(topic_id)
+
+    return json_response({
         "topic_id": topic_id,
-        "name": topic_name,
-        "keywords": keywords,
-        "docs": docs
-    }
+        "name": meta["name"] if meta else f"Topic {topic_id}",
+        "keywords": meta["keywords"] if meta else [],
+        "docs": docs,
+        "next_cursor": next_cursor,
+    }, headers={"ETag": etag})
 
 
 # -------------------------------------------------------------------
@@ -208,11 +143,35 @@ def get_topic(topic_id: int):
 @router.get("/{topic_id}/example", summary="Representative sample docs for topic")
 def example_articles(topic_id: int, n: int = 12):
 
-    if not _ts:
+    ts = _topic_service()
+    if not ts:
         raise HTTPException(
             status_code=400,
             detail="No topic model available — cannot get representative docs."
         )
 
-    docs = _ts.get_representative_docs(topic_id, top_n=n)
-    return safe_json(docs)
+    docs = ts.get_representative_docs(topic_id, top_n=n)
+    return json_response(docs)
+
+
+# -------------------------------------------------------------------
+# GET /api/topics/{topic_id}/related → Nearest topics by centroid
+# -------------------------------------------------------------------
+@router.get("/{topic_id}/related", summary="Topics most similar to this one")
+@cached(ttl=300, deps=("articles", "artifacts"))
+def related_topics(topic_id: int, n: int = Query(5, ge=1, le=50)):
+    try:
+        pairs = get_recommender().related_topics(topic_id, top_n=n)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    catalog = get_topic_catalog()
+    out = []
+    for tid, score in pairs:
+        meta = catalog.get(tid)
+        out.append({
+            "topic_id": tid,
+            "name": meta["name"] if meta else f"Topic {tid}",
+            "score": score,
+        })
+    return json_response(out)
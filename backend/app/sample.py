@@ -1,13 +1,15 @@
 from backend.app.db.session import SessionLocal
 from backend.app.db.models.article import Article
+from backend.app.services.topic_assigner import assign_topics
 
 db = SessionLocal()
 
 sample = Article(
     title="Test Article 1",
     text="This is a test news article",
-    topic_id=0  # Assign to existing topic or use -1 for unclassified
+    topic_id=None  # nearest topic centroid, or -1 for unclassified
 )
+assign_topics([sample])
 
 db.add(sample)
 db.commit()
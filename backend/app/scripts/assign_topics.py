@@ -0,0 +1,58 @@
+"""Batch topic assignment for articles that have no topic yet.
+
+Encodes article texts in batches and assigns each to its nearest topic centroid
+(see services/topic_assigner.py); low-confidence articles get -1.
+
+    python -m backend.app.scripts.assign_topics [--batch-size 512] [--threshold 0.35] [--dry-run]
+"""
+import argparse
+import time
+
+from sqlalchemy import update
+
+from backend.app.db.session import SessionLocal
+from backend.app.db.models.article import Article
+from backend.app.db.events import ArticleChanges, notify_articles_changed
+from backend.app.services.topic_assigner import article_text, get_topic_assigner
+
+
+def assign_missing_topics(batch_size: int = 512, threshold: float = None, dry_run: bool = False):
+    assigner = get_topic_assigner()
+    if threshold is not None:
+        assigner.threshold = threshold
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Article.id, Article.title, Article.text).filter(Article.topic_id.is_(None)).all()
+        print(f"{len(rows)} articles without a topic")
+
+        t0 = time.perf_counter()
+        done = outliers = 0
+        for i in range(0, len(rows), batch_size):
+            chunk = rows[i:i + batch_size]
+            # update=False: the recorded change (membership log) folds them into the centroids after commit
+            topics, _ = assigner.assign_texts([article_text(r) for r in chunk], batch_size=batch_size, update=False)
+            if not dry_run:
+                pairs = list(zip([r.id for r in chunk], topics.tolist()))
+                # one executemany per batch instead of one ORM flush per row
+                db.execute(update(Article), [{"id": aid, "topic_id": int(t)} for aid, t in pairs])
+                db.commit()
+                # Core UPDATE bypasses the ORM hooks: tell the topic catalog & co. ourselves
+                notify_articles_changed(ArticleChanges(retopiced=[(aid, None, int(t)) for aid, t in pairs]))
+            done += len(chunk)
+            outliers += int((topics == -1).sum())
+
+        secs = time.perf_counter() - t0
+        rate = done / secs if secs else 0.0
+        print(f"Assigned {done} articles ({outliers} below threshold -> -1) in {secs:.1f}s ({rate:.0f}/s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Assign topics to articles with topic_id NULL")
+    ap.add_argument("--batch-size", type=int, default=512)
+    ap.add_argument("--threshold", type=float, default=None)
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+    assign_missing_topics(args.batch_size, args.threshold, args.dry_run)
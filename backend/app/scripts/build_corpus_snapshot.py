@@ -0,0 +1,35 @@
+"""Build the corpus snapshot (services/corpus_snapshot.py) of an artifact version.
+
+Topic services build a missing snapshot on first use and keep it current through
+an overlay; run this after publishing a version so no server builds it inline,
+or to fold a large overlay back into the snapshot.
+
+    python -m backend.app.scripts.build_corpus_snapshot [--version 2025-11-21]
+"""
+import argparse
+import os
+
+from backend.app.services import artifacts
+from backend.app.services.corpus_snapshot import CorpusSnapshot
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build the corpus snapshot of an artifact version")
+    ap.add_argument("--version", default=None, help="artifact version (default: CURRENT)")
+    args = ap.parse_args()
+
+    manifest = artifacts.read_manifest(args.version or artifacts.current_version())
+    ids_path = manifest.get("article_ids")
+    if not (ids_path and os.path.exists(ids_path)):
+        ids_path = None
+        print("No article_ids.npy for this version: snapshotting every article")
+    snap = CorpusSnapshot(manifest["version"], ids_path, build=False)
+    try:
+        snap.rebuild()
+        print(snap.stats())
+    finally:
+        snap.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Backfill user profile vectors (services/user_profiles.py) from user_interactions.
+
+The API keeps profiles current event by event; this builds them for history
+recorded before that (or rebuilds them after the embedding model changed).
+Users are processed in id ranges, each in one vectorized pass: every
+interaction's weight is its event weight decayed to the time of the run, and a
+user's profile is the weighted mean of the article vectors.
+
+    python -m backend.app.scripts.build_user_profiles [--users-per-pass 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+from sqlalchemy import func, select
+
+from backend.app.db.session import SessionLocal
+from backend.app.db.models.interaction import UserInteraction
+from backend.app.services import artifacts, user_profiles
+from backend.app.services.event_log import event_ts
+
+USERS_PER_PASS = 100_000
+
+
+def build(users_per_pass: int = USERS_PER_PASS, now: float = None) -> dict:
+    rec = artifacts.live().recommender
+    rec.load()
+    emb, id_to_idx = rec.embeddings, rec.id_to_idx
+    store = user_profiles.get_user_profiles(emb.shape[1])
+    now = time.time() if now is None else now
+    kinds = list(user_profiles.EVENT_WEIGHTS)
+
+    t0 = time.perf_counter()
+    db = SessionLocal()
+    try:
+        lo, hi = db.execute(select(func.min(UserInteraction.user_id), func.max(UserInteraction.user_id))).one()
+        if lo is None:
+            print("No interactions with a user id")
+            return {"users": 0, "interactions": 0}
+        users = interactions = 0
+        for start in range(int(lo), int(hi) + 1, users_per_pass):
+            rows = db.execute(
+                select(UserInteraction.user_id, UserInteraction.article_id, UserInteraction.event_type,
+                       UserInteraction.timestamp)
+                .where(UserInteraction.user_id >= start, UserInteraction.user_id < start + users_per_pass,
+                       UserInteraction.event_type.in_(kinds))
+            ).all()
+            rows = [r for r in rows if r[1] in id_to_idx]
+            if not rows:
+                continue
+            uids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+            rows_idx = np.fromiter((id_to_idx[r[1]] for r in rows), dtype=np.int64, count=len(rows))
+            w = np.fromiter((user_profiles.EVENT_WEIGHTS[r[2]] for r in rows), dtype=np.float64, count=len(rows))
+            ts = np.fromiter((event_ts(r[3]) or now for r in rows), dtype=np.float64, count=len(rows))
+            w *= user_profiles.decay_factor(now - ts, store.half_life_days)
+
+            uniq, inverse = np.unique(uids, return_inverse=True)
+            sums = np.zeros((len(uniq), emb.shape[1]), dtype=np.float64)
+            np.add.at(sums, inverse, emb[rows_idx] * w[:, None])
+            totals = np.bincount(inverse, weights=w, minlength=len(uniq))
+            store.set_many(uniq, (sums / totals[:, None]).astype(np.float32), totals.astype(np.float32),
+                           np.full(len(uniq), now))
+            users += len(uniq)
+            interactions += len(rows)
+    finally:
+        db.close()
+    store.flush()
+
+    secs = time.perf_counter() - t0
+    print(f"Built {users} user profiles from {interactions} interactions in {secs:.1f}s")
+    return {"users": users, "interactions": interactions, "seconds": round(secs, 2)}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Backfill user profile vectors from user_interactions")
+    ap.add_argument("--users-per-pass", type=int, default=USERS_PER_PASS)
+    args = ap.parse_args()
+    build(args.users_per_pass)
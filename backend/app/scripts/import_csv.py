@@ -2,6 +2,7 @@ import csv
 from datetime import datetime
 from backend.app.db.session import SessionLocal
 from backend.app.db.models.article import Article
+from backend.app.services.topic_assigner import assign_topics
 
 CSV_PATH = r"backend\app\ml\data\topic_corpus\ag_bbc_india_with_topics.csv"
 
@@ -24,21 +25,53 @@ def import_csv_to_db(path=CSV_PATH):
     with open(path, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
 
-        count = 0
+        arts = []
         for row in reader:
             art = Article(
                 title=row.get("title"),
                 text=row.get("text"),
                 published_date=parse_date(row.get("published")),
-                topic_id=int(row.get("bertopic_topic")) if row.get("bertopic_topic") else None
+                topic_id=int(row.get("bertopic_topic")) if row.get("bertopic_topic") else None,
+                source=row.get("source") or None,
+                url=row.get("url") or None
             )
-            db.add(art)
-            count += 1
+            arts.append(art)
 
+        # rows without a BERTopic label get their nearest topic centroid (one batched pass)
+        assigned = assign_topics(arts)
+
+        db.add_all(arts)
+        db.commit()
+        db.close()
+
+    print(f"Imported {len(arts)} rows from CSV into DB ({assigned} topics assigned online)")
+
+def backfill_links(path=CSV_PATH):
+    """Fill source/url of articles imported before the DB stored them (matched on title + text)."""
+    with open(path, "r", encoding="utf-8") as f:
+        links = {
+            (row.get("title") or "", row.get("text") or ""): (row.get("source") or None, row.get("url") or None)
+            for row in csv.DictReader(f)
+        }
+
+    db = SessionLocal()
+    filled = 0
+    try:
+        for art in db.query(Article).filter(Article.source.is_(None), Article.url.is_(None)).all():
+            source, url = links.get((art.title or "", art.text or ""), (None, None))
+            if source or url:
+                art.source, art.url = source, url
+                filled += 1
         db.commit()
+    finally:
         db.close()
 
-    print(f"Imported {count} rows from CSV into DB")
+    # the corpus snapshot picks the new values up through its overlay (or the next rebuild)
+    print(f"Filled source/url of {filled} articles from CSV")
 
 if __name__ == "__main__":
-    import_csv_to_db()
+    import sys
+    if "--backfill-links" in sys.argv:
+        backfill_links()
+    else:
+        import_csv_to_db()
@@ -0,0 +1,33 @@
+"""Standalone job worker process (see services/jobs.py).
+
+Runs job workers without the HTTP app, e.g. next to API processes started with
+NEWSPREP_JOB_WORKERS=0 so LLM generation never competes with request handling.
+
+    python -m backend.app.scripts.job_worker [--workers 2]
+"""
+import argparse
+import signal
+import threading
+
+from backend.app.db.init_db import init_db
+from backend.app.services import jobs
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run background job workers")
+    ap.add_argument("--workers", type=int, default=jobs.WORKERS or 1)
+    args = ap.parse_args()
+
+    init_db()
+    jobs.start(args.workers)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    stop.wait()
+    # jobs still running are picked up again once their lease expires
+    jobs.stop()
+
+
+if __name__ == "__main__":
+    main()
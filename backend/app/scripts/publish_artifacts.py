@@ -0,0 +1,88 @@
+"""Publish a new versioned artifact directory (and optionally make it live).
+
+Copies the given files/directories into artifacts/<version>/, writes manifest.json,
+and with --activate points artifacts/CURRENT at it. A running server picks the new
+version up through POST /api/admin/artifacts/reload or the CURRENT file watcher,
+without a restart.
+
+    python -m backend.app.scripts.publish_artifacts 2025-11-21 \\
+        --embeddings path/embeddings.npy --article-ids path/article_ids.npy \\
+        --corpus-csv path/ag_bbc_india_with_topics.csv \\
+        --topic-model global=path/bertopic_global --topic-model india_global=path/bertopic_india_global \\
+        --topic-keywords path/bertopic_keywords.json --activate
+"""
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+
+from backend.app.services.artifacts import ARTIFACTS_DIR, set_current
+
+
+def _copy_in(src, vdir):
+    if not src:
+        return None
+    name = os.path.basename(os.path.normpath(src))
+    dst = os.path.join(vdir, name)
+    if os.path.isdir(src):
+        shutil.copytree(src, dst)
+    else:
+        shutil.copy2(src, dst)
+    return name
+
+
+def publish(version, embeddings=None, article_ids=None, corpus_csv=None, topic_models=None,
+            topic_keywords=None, faiss=None, activate=False):
+    vdir = os.path.join(ARTIFACTS_DIR, version)
+    if os.path.exists(vdir):
+        raise FileExistsError(f"Artifact version already exists: {vdir}")
+
+    # build in a temp dir and rename, so a half-copied version is never visible
+    tmp = vdir + ".partial"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    manifest = {
+        "version": version,
+        "created_at": datetime.utcnow().isoformat(),
+        "embeddings": _copy_in(embeddings, tmp),
+        "article_ids": _copy_in(article_ids, tmp),
+        "corpus_csv": _copy_in(corpus_csv, tmp),
+        "topic_models": {name: _copy_in(path, tmp) for name, path in (topic_models or {}).items()},
+        "topic_keywords": _copy_in(topic_keywords, tmp),
+        "faiss": _copy_in(faiss, tmp),
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, vdir)
+    print(f"Published artifact version '{version}' to {vdir}")
+
+    if activate:
+        set_current(version)
+        print(f"CURRENT -> {version}")
+    return vdir
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Publish a versioned artifact directory")
+    ap.add_argument("version")
+    ap.add_argument("--embeddings")
+    ap.add_argument("--article-ids")
+    ap.add_argument("--corpus-csv")
+    ap.add_argument("--topic-model", action="append", default=[], help="name=path (repeatable)")
+    ap.add_argument("--topic-keywords")
+    ap.add_argument("--faiss", help="directory written by FAISS.save_local")
+    ap.add_argument("--activate", action="store_true")
+    args = ap.parse_args()
+
+    publish(
+        args.version,
+        embeddings=args.embeddings,
+        article_ids=args.article_ids,
+        corpus_csv=args.corpus_csv,
+        topic_models=dict(tm.split("=", 1) for tm in args.topic_model),
+        topic_keywords=args.topic_keywords,
+        faiss=args.faiss,
+        activate=args.activate,
+    )
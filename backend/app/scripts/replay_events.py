@@ -0,0 +1,307 @@
+"""Rebuild article_stats / user_interactions from the event log.
+
+Reads sealed segments (services/event_log.py) block by block in a process pool,
+using each segment's index to skip blocks outside --since/--until. Workers parse
+and aggregate their block (per-article view/like/bookmark counts, compact
+interaction columns) and the parent bulk-writes the results. Plain .jsonl files
+(the old data/events.jsonl, passed with --legacy, or active segments) are split
+into byte ranges and read the same way.
+
+    python -m backend.app.scripts.replay_events                      # full rebuild
+    python -m backend.app.scripts.replay_events --since 2026-01-01 --until 2026-02-01
+    python -m backend.app.scripts.replay_events --legacy backend/data/events.jsonl --target stats
+
+Without a time range the default mode is `replace`: the target tables are cleared
+and rebuilt. With a range the default is `add`: counts are added to the existing
+rows and interactions in the range are inserted. `replace` with a range only
+applies to interactions (those in the range are deleted first): article_stats
+holds all-time totals, which a window of events cannot rebuild.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, text
+
+from backend.app.db.session import engine
+from backend.app.db.models.article_stats import ArticleStats
+from backend.app.db.models.interaction import UserInteraction
+from backend.app.services import event_log
+from backend.app.services.event_log import event_ts
+
+try:
+    import orjson
+    _loads = orjson.loads
+except Exception:
+    import json
+    _loads = json.loads
+
+STAT_EVENTS = {"view": 0, "like": 1, "bookmark": 2}   # article_stats columns, in order
+RANGE_BYTES = 32 * 1024 * 1024                          # plain .jsonl split size
+INSERT_BATCH = 50_000
+
+# (path, offset, length, compressed, whole_block_in_range)
+Task = Tuple[str, int, int, bool, bool]
+
+
+# -------------------------------------------------------------------
+# Planning
+# -------------------------------------------------------------------
+def _overlaps(ts_min, ts_max, lo, hi) -> Tuple[bool, bool]:
+    """(block may hold events in [lo, hi), every event of the block is inside)."""
+    if ts_min is None or ts_max is None:
+        return True, False
+    if (lo is not None and ts_max < lo) or (hi is not None and ts_min >= hi):
+        return False, False
+    inside = (lo is None or ts_min >= lo) and (hi is None or ts_max < hi)
+    return True, inside
+
+
+def _plain_ranges(path: str) -> List[Task]:
+    size = os.path.getsize(path)
+    return [(path, start, min(RANGE_BYTES, size - start), False, False) for start in range(0, size, RANGE_BYTES)]
+
+
+def plan(directory: str, lo: Optional[float], hi: Optional[float], legacy: List[str] = ()) -> Tuple[List[Task], int]:
+    tasks: List[Task] = []
+    skipped = 0
+    for seg in event_log.list_segments(directory):
+        index = seg["index"]
+        if index is None:
+            tasks.extend(_plain_ranges(seg["path"]))
+            continue
+        for b in index["blocks"]:
+            keep, inside = _overlaps(b["ts_min"], b["ts_max"], lo, hi)
+            if keep:
+                tasks.append((seg["path"], b["offset"], b["length"], True, inside))
+            else:
+                skipped += 1
+    for path in legacy:
+        tasks.extend(_plain_ranges(path))
+    return tasks, skipped
+
+
+# -------------------------------------------------------------------
+# Worker
+# -------------------------------------------------------------------
+def _read_lines(path: str, offset: int, length: int, compressed: bool) -> List[bytes]:
+    if compressed:
+        return event_log.read_block(path, offset, length).splitlines()
+    # byte range of a plain file: the line straddling `offset` belongs to the previous range
+    with open(path, "rb") as f:
+        if offset:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                f.readline()
+        lines, end = [], offset + length
+        while f.tell() < end:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                break
+            lines.append(line)
+        return lines
+
+
+def process_task(task: Task, lo: Optional[float], hi: Optional[float], want_rows: bool) -> dict:
+    path, offset, length, compressed, inside = task
+    filter_ts = not inside and (lo is not None or hi is not None)
+
+    counts = {}
+    users, articles, kinds, stamps = [], [], [], []
+    parsed = bad = 0
+    for line in _read_lines(path, offset, length, compressed):
+        try:
+            ev = _loads(line)
+            item = int(ev["item_id"])
+        except Exception:
+            bad += 1
+            continue
+        ts = None
+        if filter_ts or want_rows:
+            ts = event_ts(ev.get("ts"))
+            if filter_ts and (ts is None or (lo is not None and ts < lo) or (hi is not None and ts >= hi)):
+                continue
+        parsed += 1
+        col = STAT_EVENTS.get(ev.get("event"))
+        if col is not None:
+            row = counts.get(item)
+            if row is None:
+                row = counts[item] = [0, 0, 0]
+            row[col] += 1
+        if want_rows:
+            uid = ev.get("user_id")
+            users.append(-1 if uid is None else int(uid))
+            articles.append(item)
+            kinds.append(str(ev.get("event")))
+            stamps.append(ts if ts is not None else np.nan)
+
+    out = {
+        "events": parsed,
+        "bad": bad,
+        "stat_ids": np.fromiter(counts.keys(), dtype=np.int64, count=len(counts)),
+        "stat_counts": np.array(list(counts.values()), dtype=np.int64).reshape(-1, 3),
+    }
+    if want_rows:
+        out["rows"] = (np.array(users, dtype=np.int64), np.array(articles, dtype=np.int64),
+                       kinds, np.array(stamps, dtype=np.float64))
+    return out
+
+
+# -------------------------------------------------------------------
+# Writing
+# -------------------------------------------------------------------
+def _insert_interactions(conn, rows) -> int:
+    users, articles, kinds, stamps = rows
+    batch = []
+    n = 0
+    for u, a, k, t in zip(users.tolist(), articles.tolist(), kinds, stamps.tolist()):
+        batch.append({"user_id": None if u < 0 else u, "article_id": a, "event_type": k,
+                      "timestamp": None if t != t else datetime.utcfromtimestamp(t)})
+        if len(batch) >= INSERT_BATCH:
+            conn.execute(UserInteraction.__table__.insert(), batch)
+            n += len(batch)
+            batch = []
+    if batch:
+        conn.execute(UserInteraction.__table__.insert(), batch)
+        n += len(batch)
+    return n
+
+
+def _write_stats(conn, ids: np.ndarray, counts: np.ndarray, mode: str) -> int:
+    table = ArticleStats.__table__
+    if mode == "replace":
+        conn.execute(delete(table))
+        existing = set()
+    else:
+        existing = {r[0] for r in conn.execute(text("SELECT article_id FROM article_stats"))}
+
+    inserts, updates = [], []
+    for aid, (v, l, b) in zip(ids.tolist(), counts.tolist()):
+        row = {"article_id": aid, "views": v, "likes": l, "bookmarks": b}
+        (updates if aid in existing else inserts).append(row)
+    for i in range(0, len(inserts), INSERT_BATCH):
+        conn.execute(table.insert(), inserts[i:i + INSERT_BATCH])
+    if updates:
+        conn.execute(
+            text("UPDATE article_stats SET views = COALESCE(views, 0) + :views, "
+                 "likes = COALESCE(likes, 0) + :likes, bookmarks = COALESCE(bookmarks, 0) + :bookmarks "
+                 "WHERE article_id = :article_id"),
+            updates,
+        )
+    return len(inserts) + len(updates)
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    return event_ts(datetime.fromisoformat(value)) if value else None
+
+
+def replay(directory: str = event_log.EVENTS_DIR, since: str = None, until: str = None, target: str = "both",
+           mode: str = None, workers: int = None, legacy: List[str] = (), dry_run: bool = False) -> dict:
+    lo, hi = _parse_time(since), _parse_time(until)
+    ranged = lo is not None or hi is not None
+    mode = mode or ("add" if ranged else "replace")
+    want_stats = target in ("stats", "both")
+    want_rows = target in ("interactions", "both")
+    if mode == "replace" and ranged and want_stats:
+        # replacing would wipe every article's totals and write back only the window's counts
+        raise ValueError("--mode replace with --since/--until cannot rebuild article_stats (all-time totals); "
+                         "use --mode add, or --target interactions")
+    workers = workers or os.cpu_count() or 1
+
+    tasks, skipped = plan(directory, lo, hi, legacy)
+    print(f"{len(tasks)} block(s) to read ({skipped} outside the time range), {workers} worker(s), mode={mode}")
+
+    t0 = time.perf_counter()
+    stat_ids, stat_counts = [], []
+    events = bad = inserted = 0
+
+    # full rebuild: load into an unindexed table and build the indexes once at the end
+    rebuild_indexes = want_rows and mode == "replace" and lo is None and hi is None and not dry_run
+    indexes = list(UserInteraction.__table__.indexes) if rebuild_indexes else []
+
+    with engine.begin() as conn:
+        if want_rows and mode == "replace" and not dry_run:
+            q = delete(UserInteraction.__table__)
+            if lo is not None:
+                q = q.where(UserInteraction.timestamp >= datetime.utcfromtimestamp(lo))
+            if hi is not None:
+                q = q.where(UserInteraction.timestamp < datetime.utcfromtimestamp(hi))
+            conn.execute(q)
+        for idx in indexes:
+            idx.drop(bind=conn, checkfirst=True)
+
+        def collect(res: dict):
+            nonlocal events, bad, inserted
+            events += res["events"]
+            bad += res["bad"]
+            stat_ids.append(res["stat_ids"])
+            stat_counts.append(res["stat_counts"])
+            if want_rows and not dry_run:
+                # interactions are written as blocks come back, never all held at once
+                inserted += _insert_interactions(conn, res["rows"])
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for task in tasks:
+                pending.add(pool.submit(process_task, task, lo, hi, want_rows))
+                if len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        collect(fut.result())
+            for fut in wait(pending).done:
+                collect(fut.result())
+
+        # merge per-block counters in one vectorized pass
+        ids = np.concatenate(stat_ids) if stat_ids else np.zeros(0, np.int64)
+        counts = np.concatenate(stat_counts) if stat_counts else np.zeros((0, 3), np.int64)
+        uniq, inverse = np.unique(ids, return_inverse=True)
+        totals = np.zeros((len(uniq), 3), dtype=np.int64)
+        np.add.at(totals, inverse, counts)
+
+        stats_rows = 0
+        if want_stats and not dry_run:
+            stats_rows = _write_stats(conn, uniq, totals, mode)
+
+        for idx in indexes:
+            idx.create(bind=conn, checkfirst=True)
+
+    if not dry_run:
+        # this process may share a disk cache tier with the API
+        from backend.app.services.response_cache import cache
+        cache.bump("stats")
+
+    secs = time.perf_counter() - t0
+    summary = {
+        "events": events,
+        "unparseable": bad,
+        "articles": int(len(uniq)),
+        "stats_rows_written": stats_rows,
+        "interactions_inserted": inserted,
+        "seconds": round(secs, 2),
+        "events_per_second": round(events / secs) if secs else None,
+    }
+    print(f"Replayed {events} events ({bad} unparseable) in {secs:.1f}s "
+          f"({summary['events_per_second']}/s): {len(uniq)} articles, {inserted} interactions")
+    return summary
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Rebuild article_stats / user_interactions from the event log")
+    ap.add_argument("--dir", default=event_log.EVENTS_DIR, help="event log directory")
+    ap.add_argument("--since", help="ISO time, inclusive (UTC if no offset)")
+    ap.add_argument("--until", help="ISO time, exclusive")
+    ap.add_argument("--target", choices=["stats", "interactions", "both"], default="both")
+    ap.add_argument("--mode", choices=["replace", "add"], default=None,
+                    help="default: replace without a time range, add with one")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--legacy", nargs="*", default=[], help="plain .jsonl files to read as well (old events.jsonl)")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+    try:
+        replay(args.dir, args.since, args.until, args.target, args.mode, args.workers, args.legacy, args.dry_run)
+    except ValueError as e:
+        ap.error(str(e))
@@ -0,0 +1,135 @@
+"""Batch extractive summaries for the whole articles table (no LLM).
+
+Runs TextRank (services/summarizer.py) over every article whose summary is
+missing or was made from a different text (Article.summary_hash), spreads the
+work over a process pool and commits the results chunk by chunk, so an
+interrupted run keeps what it finished and the next run skips it.
+
+    python -m backend.app.scripts.summarize_corpus [--workers 4] [--chunk-size 200] [--force] [--limit N]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import update
+
+from backend.app.db.session import SessionLocal
+from backend.app.db.models.article import Article
+from backend.app.db.events import ArticleChanges, notify_articles_changed
+from backend.app.services.summarizer import extractive_summary_text_rank, summary_hash
+
+SCAN_PAGE = 2000   # rows read per keyset page while looking for stale summaries
+
+Row = Tuple[int, str, str]   # (article_id, text, hash of text)
+
+
+def summarize_chunk(rows: List[Row]) -> List[dict]:
+    """Worker: TextRank for one chunk; returns the column values to write."""
+    out = []
+    for aid, text, digest in rows:
+        result = extractive_summary_text_rank(text)
+        out.append({"id": aid, "summary": result["summary"], "key_points": result["key_points"],
+                    "summary_hash": digest})
+    return out
+
+
+def iter_stale_chunks(db, chunk_size: int, force: bool = False, limit: int = None) -> Iterator[List[Row]]:
+    """Stale articles in id order, chunk_size at a time, without loading the table at once."""
+    last_id, chunk, found = 0, [], 0
+    while True:
+        page = (
+            db.query(Article.id, Article.text, Article.summary, Article.summary_hash)
+            .filter(Article.id > last_id)
+            .order_by(Article.id)
+            .limit(SCAN_PAGE)
+            .all()
+        )
+        if not page:
+            break
+        last_id = page[-1].id
+        for r in page:
+            digest = summary_hash(r.text)
+            if not force and r.summary is not None and r.summary_hash == digest:
+                continue
+            chunk.append((r.id, r.text or "", digest))
+            found += 1
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+            if limit and found >= limit:
+                if chunk:
+                    yield chunk
+                return
+    if chunk:
+        yield chunk
+
+
+def _write(db, values: List[dict]):
+    # one executemany per chunk; Core UPDATE bypasses the ORM hooks, so notify ourselves
+    db.execute(update(Article), values)
+    db.commit()
+    notify_articles_changed(ArticleChanges(updated={v["id"] for v in values}))
+
+
+def summarize_corpus(workers: int = None, chunk_size: int = 200, force: bool = False, limit: int = None,
+                     dry_run: bool = False):
+    workers = workers or os.cpu_count() or 1
+    db = SessionLocal()
+    try:
+        total = db.query(Article.id).count()
+        print(f"{total} articles, {workers} worker(s), chunks of {chunk_size}")
+
+        t0 = time.perf_counter()
+        done = 0
+
+        def report(n: int):
+            nonlocal done
+            done += n
+            secs = time.perf_counter() - t0
+            print(f"  {done} summarized ({done / secs:.0f}/s)" if secs else f"  {done} summarized")
+
+        chunks = iter_stale_chunks(db, chunk_size, force=force, limit=limit)
+        if workers == 1:
+            for chunk in chunks:
+                values = summarize_chunk(chunk)
+                if not dry_run:
+                    _write(db, values)
+                report(len(values))
+        else:
+            # keep a bounded number of chunks in flight: the scan stays a little ahead
+            # of the pool, and finished chunks are committed as they come back
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = set()
+                for chunk in chunks:
+                    pending.add(pool.submit(summarize_chunk, chunk))
+                    if len(pending) >= workers * 2:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for fut in finished:
+                            values = fut.result()
+                            if not dry_run:
+                                _write(db, values)
+                            report(len(values))
+                for fut in wait(pending).done:
+                    values = fut.result()
+                    if not dry_run:
+                        _write(db, values)
+                    report(len(values))
+
+        secs = time.perf_counter() - t0
+        rate = done / secs if secs else 0.0
+        print(f"Summarized {done} articles in {secs:.1f}s ({rate:.0f}/s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Precompute extractive summaries and key points for all articles")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: CPU count; 1 = in-process)")
+    ap.add_argument("--chunk-size", type=int, default=200, help="articles per task and per commit")
+    ap.add_argument("--force", action="store_true", help="re-summarize articles whose summary is current")
+    ap.add_argument("--limit", type=int, default=None)
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+    summarize_corpus(args.workers, args.chunk_size, args.force, args.limit, args.dry_run)
@@ -0,0 +1,218 @@
+# backend/app/server.py
+"""Production entry point: preload once, fork N uvicorn workers.
+
+    python -m backend.app.server --host 0.0.0.0 --port 8000 --workers 4
+
+Prefork is opt-in (--workers or NEWSPREP_WORKERS); the default is one plain
+uvicorn process. The trade-off:
+
+  * one process binds the port immediately and loads models in the background
+    (warmup.start): fast cold start, one set of models in memory, one core;
+  * N workers bind only after the master has loaded everything synchronously
+    (slow cold start, health checks must allow for it) and then use N cores.
+    Read-only model pages are shared, but every worker adds its own heap,
+    caches and interpreter: RSS grows with N (see backend/bench/prefork_bench.py).
+
+Size N to the CPUs the container may actually use: os.cpu_count() reports the
+host's cores, not the affinity mask or the cgroup quota (available_cpus), and
+workers beyond those only add memory.
+
+The master process binds the listening socket, imports the app and runs every
+warmup loader (topic models, embeddings, corpus snapshots, recommender, FAISS)
+before forking. Workers inherit those read-only pages copy-on-write, so N
+workers cost roughly one set of models instead of N. gc.freeze() moves the
+preloaded objects out of the collector's reach; otherwise the first
+collection in each worker would write to every object's header and copy the
+pages anyway.
+
+Anything per process is re-created in the worker through os.register_at_fork
+hooks next to the state itself: DB connection pool (db/session.py), response
+cache memory tier, event log segment, job pool, artifact watcher, profiler.
+Each worker then runs the normal FastAPI startup on the shared socket; the
+kernel hands connections to whichever worker accepts first.
+
+Only worker 0 runs background jobs (NEWSPREP_JOB_WORKERS threads); the others
+just serve. The master restarts a worker that dies and forwards SIGTERM/SIGINT
+for a graceful shutdown. --workers 1 (or a platform without fork) runs plain
+uvicorn in this process.
+
+Set NEWSPREP_CACHE_DIR so a cache bump in one worker invalidates the others;
+without it the server uses backend/data/response_cache when forking.
+
+Article change listeners (db.events) only run in the process that wrote, so
+per-worker state derived from the articles table does not rely on them alone:
+the topic catalog, topic centroids, feed signals and the response cache's
+"articles" namespace compare the shared counters in db.versions on use and
+reload when another process moved them (centroids and feed signals apply just
+the logged membership changes instead); the answer cache checks the cited
+articles' revisions.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+# a worker dying this soon after start is crash-looping: back off before the next fork
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: its affinity mask, capped by a cgroup v2 quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r", encoding="utf-8") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, max(1, -(-int(quota) // int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def default_workers() -> int:
+    """NEWSPREP_WORKERS, else 1: prefork trades a slower cold start and more RSS for cores."""
+    return int(os.getenv("NEWSPREP_WORKERS") or 1)
+
+
+def _prepare_env(workers: int):
+    """Environment the app reads at import time; must run before backend.app.main is imported."""
+    if workers > 1:
+        os.environ.setdefault("NEWSPREP_CACHE_DIR", os.path.join(DATA_DIR, "response_cache"))
+        # parallelism comes from the workers; thread pools created before fork can deadlock after it
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ.setdefault(var, "1")
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    # IPPROTO_TCP, not 0: accepted sockets copy it, and asyncio only sets TCP_NODELAY on TCP-proto sockets
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload():
+    """Load everything the workers will share. Runs in the master, before any fork."""
+    from backend.app.db.init_db import init_db
+    from backend.app.services import warmup
+
+    t0 = time.perf_counter()
+    init_db()
+    warmup.preload()
+    for name, comp in warmup.status()["components"].items():
+        print(f"  {name:<16} {comp['state']:<9} {comp['seconds']}s" + (f"  ({comp['error']})" if comp["error"] else ""))
+    # connections opened while preloading belong to the master
+    from backend.app.db.session import engine
+    engine.dispose()
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+    print(f"Preloaded in {time.perf_counter() - t0:.2f}s")
+
+
+def _run_worker(index: int, sock: socket.socket, app, log_level: str) -> int:
+    import uvicorn
+    from backend.app.services import jobs
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if index > 0:
+        jobs.WORKERS = 0  # worker 0 runs the background jobs for the host
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    return 0 if server.started else 1
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = None, log_level: str = "info"):
+    workers = default_workers() if workers is None else workers
+    cpus = available_cpus()
+    if workers > cpus:
+        print(f"Warning: {workers} workers for {cpus} usable CPU(s); the extra workers only add memory")
+    _prepare_env(workers)
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        import uvicorn
+        uvicorn.run("backend.app.main:app", host=host, port=port, log_level=log_level)
+        return
+
+    sock = _bind(host, port)
+    from backend.app.main import app
+    preload()
+
+    children = {}        # pid -> worker index
+    started_at = {}      # worker index -> time of its last fork
+    stopping = False
+
+    def spawn(index: int):
+        sys.stdout.flush()  # or the worker prints the master's buffered output again
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = _run_worker(index, sock, app, log_level)
+            except BaseException as e:
+                print(f"Worker {index} crashed:", e)
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+        children[pid] = index
+        started_at[index] = time.monotonic()
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for i in range(workers):
+        spawn(i)
+    print(f"Serving on {host}:{port} with {workers} workers (master pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        print(f"Worker {index} (pid {pid}) exited with status {status}; restarting")
+        if time.monotonic() - started_at[index] < RESPAWN_BACKOFF_SECONDS:
+            time.sleep(RESPAWN_BACKOFF_SECONDS)
+        if not stopping:
+            spawn(index)
+    sock.close()
+    print("All workers stopped.")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve the API from preloaded, forked workers")
+    ap.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    ap.add_argument("--workers", type=int, default=None, help="default: NEWSPREP_WORKERS or 1 (no prefork)")
+    ap.add_argument("--log-level", default="info")
+    args = ap.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# backend/app/services/answer_cache.py
+"""Semantic cache for /api/ask answers.
+
+A question is a hit when an earlier question's embedding is at least `threshold`
+cosine-similar AND retrieval picked the same set of source articles for it. The
+source check is what makes a loose similarity threshold safe: two differently
+worded questions that lead to the same articles get the same grounded answer,
+while the same words asked after the corpus changed retrieve different sources
+and miss.
+
+Two more things must match: the chat history that went into the prompt (hashed)
+and the revision of every cited article (articles.revision, bumped by any UPDATE
+of the row in whichever process made it). An edit from another worker, a script,
+or while the server was down therefore misses only the entries citing that
+article; writes to other articles leave them alone. Entries citing an article
+changed in this process are also dropped right away (db.events).
+
+Entries are evicted LRU once `max_entries` is reached and saved to one .npz file
+so they survive restarts. Each process writes its own temporary file and renames
+it over the shared one, so the file is always one process's complete snapshot.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from sqlalchemy import select
+
+from backend.app.db.session import engine
+from backend.app.db.models.article import Article
+from backend.app.db.events import ArticleChanges, on_articles_changed
+from backend.app.metrics import register_collector
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+CACHE_PATH = os.getenv("NEWSPREP_ANSWER_CACHE_PATH", os.path.join(DATA_DIR, "answer_cache.npz"))
+MAX_ENTRIES = int(os.getenv("NEWSPREP_ANSWER_CACHE_SIZE", "2000"))
+THRESHOLD = float(os.getenv("NEWSPREP_ANSWER_CACHE_THRESHOLD", "0.92"))
+SAVE_INTERVAL = 30.0  # seconds between background saves while entries change
+
+
+def source_key(article_ids: Iterable) -> Tuple[int, ...]:
+    return tuple(sorted({int(a) for a in article_ids if a is not None}))
+
+
+def history_key(history_text: str) -> str:
+    return hashlib.sha1((history_text or "").encode("utf-8")).hexdigest()[:16]
+
+
+def article_revisions(sources: Tuple[int, ...]) -> Tuple[Optional[int], ...]:
+    """Current revision of each source article, in order; None for a deleted one."""
+    if not sources:
+        return ()
+    with engine.connect() as conn:
+        found = dict(conn.execute(select(Article.id, Article.revision).where(Article.id.in_(sources))).all())
+    return tuple(found.get(aid) for aid in sources)
+
+
+class AnswerCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, threshold: float = THRESHOLD, path: Optional[str] = CACHE_PATH):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.path = path
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None     # (max_entries, D) slots
+        self._live = np.zeros(max_entries, dtype=bool)
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()   # slot -> entry, LRU order
+        self._by_article: Dict[int, Set[int]] = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidated": 0}
+
+    # -----------------------------------------------------------------
+    # Lookup / store
+    # -----------------------------------------------------------------
+    @staticmethod
+    def _norm(vec) -> np.ndarray:
+        v = np.asarray(vec, dtype=np.float32).ravel()
+        n = np.linalg.norm(v)
+        return v / n if n else v
+
+    def lookup(self, query_vec, sources: Tuple[int, ...], history: str,
+               revisions: Tuple[Optional[int], ...]) -> Optional[dict]:
+        """Best earlier answer for the same sources and history; `revisions` are the
+        sources' current ones (article_revisions), and entries made at others are dropped."""
+        q = self._norm(query_vec)
+        with self._lock:
+            if self._vectors is None or not self._entries or self._vectors.shape[1] != len(q):
+                self.counters["misses"] += 1
+                return None
+            sims = self._vectors @ q
+            sims[~self._live] = -1.0
+            # best-first over the (few) rows above the threshold
+            for slot in np.flatnonzero(sims >= self.threshold)[np.argsort(-sims[sims >= self.threshold])]:
+                slot = int(slot)
+                entry = self._entries.get(slot)
+                if entry is None or entry["sources"] != sources or entry.get("history") != history:
+                    continue
+                if entry.get("revisions") != revisions:
+                    # a cited article was edited or deleted since (possibly by another process)
+                    self._drop_locked(slot)
+                    self.counters["invalidated"] += 1
+                    self._dirty = True
+                    continue
+                self._entries.move_to_end(slot)
+                entry["hits"] += 1
+                self.counters["hits"] += 1
+                return {**entry["payload"], "cache": {"hit": True, "similarity": round(float(sims[slot]), 4),
+                                                      "cached_query": entry["query"]}}
+            self.counters["misses"] += 1
+            return None
+
+    def store(self, query: str, query_vec, sources: Tuple[int, ...], history: str,
+              revisions: Tuple[Optional[int], ...], payload: dict):
+        """Remember an answer; `revisions` must be read before the answer was generated."""
+        if None in revisions:
+            return  # cites an article deleted meanwhile
+        q = self._norm(query_vec)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != len(q):
+                self._reset_locked(len(q))
+            if len(self._entries) >= self.max_entries:
+                old_slot, _ = next(iter(self._entries.items()))
+                self._drop_locked(old_slot)
+                self.counters["evictions"] += 1
+            slot = int(np.flatnonzero(~self._live)[0])
+            self._vectors[slot] = q
+            self._live[slot] = True
+            self._entries[slot] = {"query": query, "sources": sources, "history": history,
+                                   "revisions": tuple(revisions), "payload": payload,
+                                   "created": time.time(), "hits": 0}
+            for aid in sources:
+                self._by_article.setdefault(aid, set()).add(slot)
+            self.counters["stores"] += 1
+            self._dirty = True
+        self._maybe_save()
+
+    def _reset_locked(self, dim: int):
+        self._vectors = np.zeros((self.max_entries, dim), dtype=np.float32)
+        self._live[:] = False
+        self._entries.clear()
+        self._by_article.clear()
+
+    def _drop_locked(self, slot: int):
+        entry = self._entries.pop(slot, None)
+        self._live[slot] = False
+        if entry:
+            for aid in entry["sources"]:
+                slots = self._by_article.get(aid)
+                if slots:
+                    slots.discard(slot)
+                    if not slots:
+                        del self._by_article[aid]
+
+    def invalidate_articles(self, article_ids: Iterable[int]) -> int:
+        n = 0
+        with self._lock:
+            for aid in article_ids:
+                for slot in list(self._by_article.get(int(aid), ())):
+                    self._drop_locked(slot)
+                    n += 1
+            if n:
+                self.counters["invalidated"] += n
+                self._dirty = True
+        return n
+
+    def clear(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._reset_locked(self._vectors.shape[1])
+            self._dirty = True
+
+    # -----------------------------------------------------------------
+    # Persistence
+    # -----------------------------------------------------------------
+    def _maybe_save(self):
+        if self.path and self._dirty and time.time() - self._last_save >= SAVE_INTERVAL:
+            self._last_save = time.time()
+            threading.Thread(target=self.save, name="answer-cache-save", daemon=True).start()
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            slots = list(self._entries)   # LRU order, oldest first
+            vectors = self._vectors[slots] if slots else np.zeros((0, 0), np.float32)
+            meta = [{**self._entries[s], "sources": list(self._entries[s]["sources"]),
+                     "revisions": list(self._entries[s]["revisions"])} for s in slots]
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # per-process temp file: concurrent savers never write into the same file
+        tmp = f"{self.path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, vectors=vectors, meta=np.array(json.dumps(meta, default=str)))
+        os.replace(tmp, self.path)
+
+    def load(self):
+        """Read the saved entries; their revisions are checked when they are looked up."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                vectors = data["vectors"]
+                meta = json.loads(str(data["meta"]))
+        except Exception as e:
+            print("Answer cache file unreadable, starting empty:", e)
+            return
+        # entries saved before they carried revisions cannot be checked
+        kept = [(vec, entry) for vec, entry in zip(vectors, meta) if "revisions" in entry]
+        with self._lock:
+            if not kept:
+                return
+            self._reset_locked(vectors.shape[1])
+            for vec, entry in kept[-self.max_entries:]:
+                slot = len(self._entries)
+                entry["sources"] = tuple(entry["sources"])
+                entry["revisions"] = tuple(entry["revisions"])
+                self._vectors[slot] = vec
+                self._live[slot] = True
+                self._entries[slot] = entry
+                for aid in entry["sources"]:
+                    self._by_article.setdefault(aid, set()).add(slot)
+        print(f"Answer cache loaded: {len(self._entries)} entries.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "entries": len(self._entries), "max_entries": self.max_entries,
+                    "threshold": self.threshold, "path": self.path}
+
+
+_cache: Optional[AnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache = AnswerCache()
+                try:
+                    cache.load()
+                except Exception as e:
+                    print("Answer cache not loaded:", e)
+                _cache = cache
+    return _cache
+
+
+def flush():
+    """Write the cache to disk now (app shutdown); no-op if it was never used."""
+    if _cache is not None and _cache._dirty:
+        _cache.save()
+
+
+@on_articles_changed
+def _invalidate_cited(changes: ArticleChanges):
+    if _cache is None:
+        return
+    touched = set(changes.updated) | set(changes.deleted) | {aid for aid, _, _ in changes.retopiced}
+    if touched:
+        _cache.invalidate_articles(touched)
+
+
+@register_collector
+def _answer_cache_metrics() -> List[str]:
+    if _cache is None:
+        return []
+    st = _cache.stats()
+    lines = ["# HELP newsprep_answer_cache_events_total Semantic answer cache events.",
+             "# TYPE newsprep_answer_cache_events_total counter"]
+    lines += [f'newsprep_answer_cache_events_total{{event="{k}"}} {st[k]}'
+              for k in ("hits", "misses", "stores", "evictions", "invalidated")]
+    lines += ["# HELP newsprep_answer_cache_entries Cached answers.",
+              "# TYPE newsprep_answer_cache_entries gauge",
+              f"newsprep_answer_cache_entries {st['entries']}"]
+    return lines
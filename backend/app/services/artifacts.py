@@ -0,0 +1,401 @@
+# backend/app/services/artifacts.py
+"""Versioned ML artifacts and zero-downtime hot swap.
+
+Layout (NEWSPREP_ARTIFACTS_DIR, default backend/app/ml/artifacts):
+
+    artifacts/
+      CURRENT                  <- name of the live version, e.g. "2025-11-21"
+      2025-11-21/
+        manifest.json
+        embeddings.npy
+        article_ids.npy
+        ag_bbc_india_with_topics.csv
+        bertopic_global/ ...
+
+manifest.json maps roles to paths relative to the version directory; every role is
+optional:
+
+    {"version": "2025-11-21",
+     "embeddings": "embeddings.npy", "article_ids": "article_ids.npy",
+     "corpus_csv": "ag_bbc_india_with_topics.csv",
+     "topic_models": {"global": "bertopic_global", "india_global": "bertopic_india_global"},
+     "topic_keywords": "bertopic_keywords.json",
+     "faiss": "faiss"}
+
+corpus_csv is the training export and is only copied along; topic services read
+article text from the version's corpus snapshot, built from the database
+(services/corpus_snapshot.py).
+
+Without an artifacts directory the pre-existing file locations under backend/app/ml
+are used as an implicit "legacy" version.
+
+A Generation owns the RecommenderService, TopicServices and FAISS store built from
+one version. Every request pins the generation that was live when it started
+(ArtifactPinMiddleware), so swap_to() can load a new version in the background,
+switch the reference atomically, and close the old generation only once the last
+request using it has finished.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from backend.app.services.recommender import RecommenderService
+from backend.app.services.topic_service import TopicService
+from backend.app.services.vector_delta import CHUNK_DIR, VectorDelta
+
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "ml"))
+ARTIFACTS_DIR = os.path.abspath(os.getenv("NEWSPREP_ARTIFACTS_DIR", os.path.join(ML_DIR, "artifacts")))
+CURRENT_FILE = os.path.join(ARTIFACTS_DIR, "CURRENT")
+
+LEGACY_VERSION = "legacy"
+
+
+def _legacy_manifest() -> dict:
+    corpus = os.path.join(ML_DIR, "data", "topic_corpus")
+    topics = os.path.join(ML_DIR, "models", "topics")
+    return {
+        "version": LEGACY_VERSION,
+        "embeddings": os.path.join(corpus, "embeddings.npy"),
+        "article_ids": os.path.join(corpus, "article_ids.npy"),
+        "corpus_csv": os.path.join(corpus, "ag_bbc_india_with_topics.csv"),
+        "topic_models": {
+            "global": os.path.join(topics, "bertopic_global"),
+            "india_global": os.path.join(topics, "bertopic_india_global"),
+        },
+        "topic_keywords": os.path.join(topics, "bertopic_keywords.json"),
+        "faiss": None,
+    }
+
+
+def current_version() -> str:
+    try:
+        with open(CURRENT_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip() or LEGACY_VERSION
+    except FileNotFoundError:
+        return LEGACY_VERSION
+
+
+def set_current(version: str):
+    """Point CURRENT at `version` atomically (a watcher or /reload picks it up)."""
+    read_manifest(version)  # refuse to point at a version that cannot be read
+    tmp = CURRENT_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+    os.replace(tmp, CURRENT_FILE)
+
+
+def read_manifest(version: str) -> dict:
+    """Manifest for a version with every path made absolute."""
+    if version == LEGACY_VERSION:
+        return _legacy_manifest()
+
+    vdir = os.path.join(ARTIFACTS_DIR, version)
+    path = os.path.join(vdir, "manifest.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No manifest for artifact version '{version}' at {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    def resolve(p):
+        return os.path.join(vdir, p) if p else None
+
+    return {
+        "version": version,  # the directory name is the identity CURRENT refers to
+        "embeddings": resolve(manifest.get("embeddings")),
+        "article_ids": resolve(manifest.get("article_ids")),
+        "corpus_csv": resolve(manifest.get("corpus_csv")),
+        "topic_models": {k: resolve(v) for k, v in (manifest.get("topic_models") or {}).items()},
+        "topic_keywords": resolve(manifest.get("topic_keywords")),
+        "faiss": resolve(manifest.get("faiss")),
+    }
+
+
+# -------------------------------------------------------------------
+# Generation
+# -------------------------------------------------------------------
+class Generation:
+    def __init__(self, manifest: dict):
+        self.version = manifest["version"]
+        self.manifest = manifest
+        self.loaded_at = time.time()
+
+        # articles ingested after this version was built; shared by its services
+        self.delta = VectorDelta(self.version)
+        self.chunk_delta = VectorDelta(self.version, CHUNK_DIR)   # their RAG chunks
+        self.recommender = RecommenderService(
+            embeddings_path=manifest.get("embeddings"),
+            ids_path=manifest.get("article_ids"),
+            delta=self.delta,
+        )
+        self._topic_services: Dict[str, TopicService] = {}
+        self._faiss = None
+        self._lock = threading.Lock()
+
+        self.inflight = 0
+        self.retired = False
+        self.closed = False
+
+    # -- lazily built members ----------------------------------------
+    def topic_service(self, name: str) -> TopicService:
+        svc = self._topic_services.get(name)
+        if svc is not None:
+            return svc
+        with self._lock:
+            svc = self._topic_services.get(name)
+            if svc is None:
+                model_path = self.manifest["topic_models"].get(name)
+                if not model_path:
+                    raise FileNotFoundError(f"Artifact version '{self.version}' has no topic model '{name}'")
+                svc = TopicService(model_path=model_path, version=self.version,
+                                   embeddings_path=self.manifest.get("embeddings"),
+                                   ids_path=self.manifest.get("article_ids"))
+                svc.delta = self.delta
+                kw_path = self.manifest.get("topic_keywords")
+                if kw_path and os.path.exists(kw_path):
+                    with open(kw_path, "r", encoding="utf-8") as f:
+                        svc.topic_keywords = json.load(f)
+                self._topic_services[name] = svc
+        return svc
+
+    def faiss_index(self):
+        """Prebuilt FAISS store from the manifest, or None (rag_service builds its own)."""
+        path = self.manifest.get("faiss")
+        if not path or not os.path.exists(path):
+            return None
+        if self._faiss is None:
+            with self._lock:
+                if self._faiss is None:
+                    from langchain_community.vectorstores import FAISS
+                    from backend.app.services.rag_service import get_embeddings
+                    self._faiss = FAISS.load_local(path, get_embeddings(), allow_dangerous_deserialization=True)
+        return self._faiss
+
+    def preload(self, topic_services: List[str], faiss: bool):
+        """Load everything a live generation had loaded, before it goes live."""
+        try:
+            self.recommender.load()
+        except FileNotFoundError:
+            pass
+        for name in topic_services:
+            svc = self.topic_service(name)
+            if svc.has_embeddings():
+                svc._ensure_embedder()
+        if faiss:
+            self.faiss_index()
+
+    def loaded_topic_service(self, name: str) -> Optional[TopicService]:
+        """The topic service if it is already loaded, without triggering a load."""
+        return self._topic_services.get(name)
+
+    def loaded_topic_services(self) -> List[str]:
+        return list(self._topic_services)
+
+    # -- lifecycle ---------------------------------------------------
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.recommender.close()
+        for svc in self._topic_services.values():
+            svc.close()
+        self._topic_services = {}
+        self._faiss = None
+        print(f"Artifact generation '{self.version}' released.")
+
+    def as_dict(self):
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "inflight": self.inflight,
+            "retired": self.retired,
+            "topic_services": self.loaded_topic_services(),
+            "delta": self.delta.stats(),
+            "chunk_delta": self.chunk_delta.stats(),
+            "corpus": next((svc.corpus.stats() for svc in self._topic_services.values()
+                            if svc.corpus is not None), None),
+        }
+
+
+_lock = threading.Lock()
+_current: Optional[Generation] = None
+_draining: List[Generation] = []
+_swap_state = {"state": "idle", "target": None, "error": None, "seconds": None}
+_swap_listeners: List[Callable[[Generation], None]] = []
+
+_pinned: contextvars.ContextVar = contextvars.ContextVar("artifact_generation", default=None)
+
+
+def current() -> Generation:
+    """Generation pinned for this request, else the live one (created on first use)."""
+    gen = _pinned.get()
+    if gen is not None:
+        return gen
+    return _live()
+
+
+def live() -> Generation:
+    """The live generation, ignoring any request pin (for background updates)."""
+    return _live()
+
+
+def _live() -> Generation:
+    global _current
+    if _current is None:
+        with _lock:
+            if _current is None:
+                _current = Generation(read_manifest(current_version()))
+    return _current
+
+
+def on_swap(fn: Callable[[Generation], None]):
+    """Register a callback run after a new generation goes live; usable as a decorator."""
+    _swap_listeners.append(fn)
+    return fn
+
+
+def _release(gen: Generation):
+    with _lock:
+        gen.inflight -= 1
+        drained = gen.retired and gen.inflight <= 0
+        if drained and gen in _draining:
+            _draining.remove(gen)
+    if drained:
+        gen.close()
+
+
+def swap_to(version: Optional[str] = None):
+    """Load `version` (default: CURRENT) and make it live. Blocking; see swap_async()."""
+    global _current
+    version = version or current_version()
+    t0 = time.perf_counter()
+    _swap_state.update(state="loading", target=version, error=None, seconds=None)
+    new = None
+    try:
+        old = _live()
+        new = Generation(read_manifest(version))
+        new.preload(old.loaded_topic_services(), faiss=old._faiss is not None)
+
+        with _lock:
+            old, _current = _current, new
+            old.retired = True
+            if old.inflight > 0:
+                _draining.append(old)
+                old = None  # last request out closes it
+        if old is not None:
+            old.close()
+
+        for fn in list(_swap_listeners):
+            try:
+                fn(new)
+            except Exception as e:
+                print("Artifact swap listener failed:", e)
+
+        _swap_state.update(state="idle", seconds=round(time.perf_counter() - t0, 3))
+        print(f"Artifact version '{new.version}' is live.")
+    except Exception as e:
+        if new is not None and new is not _current:
+            new.close()  # give back whatever the half-loaded version acquired
+        _swap_state.update(state="failed", error=str(e), seconds=round(time.perf_counter() - t0, 3))
+        print(f"Artifact swap to '{version}' failed:", e)
+        raise
+
+
+def swap_async(version: Optional[str] = None) -> bool:
+    """Start swap_to() in a background thread; False if a swap is already running."""
+    if _swap_state["state"] == "loading":
+        return False
+    _swap_state["state"] = "loading"
+
+    def run():
+        try:
+            swap_to(version)
+        except Exception:
+            pass  # recorded in _swap_state
+
+    threading.Thread(target=run, name="artifact-swap", daemon=True).start()
+    return True
+
+
+def status() -> dict:
+    live = _live()
+    return {
+        "current": live.as_dict(),
+        "configured_version": current_version(),
+        "draining": [g.as_dict() for g in _draining],
+        "swap": dict(_swap_state),
+    }
+
+
+# -------------------------------------------------------------------
+# Request pinning
+# -------------------------------------------------------------------
+class ArtifactPinMiddleware:
+    """Pin the live generation for the whole request so a swap never changes it midway."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with _lock:
+            gen = _current
+            if gen is not None:
+                gen.inflight += 1
+        if gen is None:
+            # nothing loaded yet: the first current() call creates the generation
+            await self.app(scope, receive, send)
+            return
+
+        token = _pinned.set(gen)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _pinned.reset(token)
+            _release(gen)
+
+
+# -------------------------------------------------------------------
+# File watch
+# -------------------------------------------------------------------
+_watcher: Optional[threading.Thread] = None
+
+
+def start_watcher(interval: Optional[float] = None):
+    """Poll CURRENT and swap when it names a new version (NEWSPREP_ARTIFACT_WATCH_SECONDS)."""
+    global _watcher
+    interval = interval if interval is not None else float(os.getenv("NEWSPREP_ARTIFACT_WATCH_SECONDS", "0"))
+    if interval <= 0 or _watcher is not None:
+        return
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                version = current_version()
+                if _current is not None and version != _current.version and _swap_state["state"] != "loading":
+                    print(f"Artifact CURRENT changed to '{version}', swapping...")
+                    swap_async(version)
+            except Exception as e:
+                print("Artifact watcher error:", e)
+
+    _watcher = threading.Thread(target=loop, name="artifact-watch", daemon=True)
+    _watcher.start()
+
+
+def _after_fork():
+    # threads do not survive fork: a worker starts its own watcher; a swap cut short by fork is over
+    global _watcher, _lock
+    _watcher = None
+    _lock = threading.Lock()
+    if _swap_state["state"] == "loading":
+        _swap_state.update(state="idle", target=None)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
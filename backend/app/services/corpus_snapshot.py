@@ -0,0 +1,668 @@
+# backend/app/services/corpus_snapshot.py
+"""Columnar, memory-mapped snapshot of the articles table for TopicService.
+
+Replaces parsing the artifact's corpus CSV (which drifted from the DB) on every
+start. One snapshot per artifact version, row-aligned with its article_ids.npy,
+so embedding row i and snapshot row i are the same article:
+
+    NEWSPREP_CORPUS_DIR/<version>/
+      CURRENT                       name of the live snapshot directory
+      snap-<stamp>/
+        meta.json                   rows, articles present, checksum of the ids
+        ids.npy                     (N,) int64, a copy of article_ids.npy
+        topic.npy                   (N,) int64, -1 = none
+        published.npy               (N,) float64 epoch seconds, NaN = none
+        scan_of_row.npy             (N,) int64 position in the string columns, -1 = not in the DB
+        row_of_scan.npy             (P,) int64 the reverse, in article id order
+        title.bytes / title.offsets.npy      UTF-8 strings in scan order, (P+1,) offsets
+        text.bytes / text.offsets.npy
+        source.* / url.*
+        title_lc.* / text_lc.*      lowercased copies for keyword search
+        overlay.ndjson              articles changed since the snapshot was built
+
+Everything is opened with np.load(mmap_mode="r") / mmap: loading takes
+milliseconds, strings are sliced straight out of the page cache, and every
+worker process shares the same pages. Keyword search runs bytes.find over the
+lowercased columns.
+
+Article changes (db.events) are appended to the snapshot's overlay.ndjson, one
+line per changed article and only where a column really differs from the
+snapshot, so bulk summary updates cost nothing. The log is append-only: a
+writer adds just its new lines and every process reads just the lines it has
+not seen, within REFRESH_SECONDS. Once the log exceeds COMPACT_ROWS lines a
+"corpus_snapshot" job rebuilds the snapshot from the DB and swaps CURRENT; the
+new snapshot starts a new log.
+"""
+import json
+import math
+import mmap
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from backend.app.db.session import SessionLocal
+from backend.app.db.models.article import Article
+from backend.app.db.events import ArticleChanges, on_articles_changed
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev servers only
+    fcntl = None
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+CORPUS_DIR = os.path.abspath(os.getenv("NEWSPREP_CORPUS_DIR", os.path.join(DATA_DIR, "corpus")))
+REFRESH_SECONDS = 1.0
+COMPACT_ROWS = int(os.getenv("NEWSPREP_CORPUS_COMPACT_ROWS", "5000"))
+SCAN_PAGE = 5000
+
+STRING_COLUMNS = ("title", "text", "source", "url", "title_lc", "text_lc")
+FORMAT = 2  # bumped when the file set changes; older snapshots are rebuilt
+OVERLAY = "overlay.ndjson"
+
+
+def _ts(value) -> float:
+    if value is None:
+        return math.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _ids_checksum(ids: np.ndarray) -> str:
+    import hashlib
+    return hashlib.sha1(np.ascontiguousarray(ids, dtype="<i8").tobytes()).hexdigest()
+
+
+# -------------------------------------------------------------------
+# Building
+# -------------------------------------------------------------------
+def _db_ids() -> np.ndarray:
+    db = SessionLocal()
+    try:
+        return np.asarray(db.execute(select(Article.id).order_by(Article.id)).scalars().all(), dtype=np.int64)
+    finally:
+        db.close()
+
+
+def build_snapshot(path: str, ids: np.ndarray, ids_from_db: bool = False) -> dict:
+    """Write a snapshot of the articles table at `path`, rows in the order of `ids`."""
+    t0 = time.perf_counter()
+    ids = np.asarray(ids, dtype=np.int64)
+    n = len(ids)
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+
+    topic = np.full(n, -1, dtype=np.int64)
+    published = np.full(n, math.nan, dtype=np.float64)
+    scan_of_row = np.full(n, -1, dtype=np.int64)
+    row_of_scan: List[int] = []
+    offsets = {c: [0] for c in STRING_COLUMNS}
+
+    os.makedirs(path, exist_ok=True)
+    files = {c: open(os.path.join(path, f"{c}.bytes"), "wb") for c in STRING_COLUMNS}
+    db = SessionLocal()
+    try:
+        last_id = None
+        while True:
+            q = select(Article.id, Article.title, Article.text, Article.topic_id, Article.published_date,
+                       Article.source, Article.url)
+            if last_id is not None:
+                q = q.where(Article.id > last_id)
+            page = db.execute(q.order_by(Article.id).limit(SCAN_PAGE)).all()
+            if not page:
+                break
+            last_id = page[-1][0]
+            for aid, title, text, tid, pub, source, url in page:
+                j = int(np.searchsorted(sorted_ids, aid))
+                if j >= n or sorted_ids[j] != aid:
+                    continue  # not embedded in this version: served from the vector delta
+                row = int(order[j])
+                scan_of_row[row] = len(row_of_scan)
+                row_of_scan.append(row)
+                topic[row] = -1 if tid is None else tid
+                published[row] = _ts(pub)
+                title, text = title or "", text or ""
+                for col, value in (("title", title), ("text", text), ("source", source or ""), ("url", url or ""),
+                                   ("title_lc", title.lower()), ("text_lc", text.lower())):
+                    data = value.encode("utf-8")
+                    files[col].write(data)
+                    offsets[col].append(offsets[col][-1] + len(data))
+    finally:
+        db.close()
+        for f in files.values():
+            f.close()
+
+    np.save(os.path.join(path, "ids.npy"), ids)
+    np.save(os.path.join(path, "topic.npy"), topic)
+    np.save(os.path.join(path, "published.npy"), published)
+    np.save(os.path.join(path, "scan_of_row.npy"), scan_of_row)
+    np.save(os.path.join(path, "row_of_scan.npy"), np.asarray(row_of_scan, dtype=np.int64))
+    for col in STRING_COLUMNS:
+        np.save(os.path.join(path, f"{col}.offsets.npy"), np.asarray(offsets[col], dtype=np.int64))
+    meta = {"format": FORMAT, "rows": n, "present": len(row_of_scan), "ids_sha1": _ids_checksum(ids),
+            "ids_from_db": ids_from_db, "built_at": time.time(), "seconds": round(time.perf_counter() - t0, 3)}
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+
+# -------------------------------------------------------------------
+# Reading
+# -------------------------------------------------------------------
+def _parse_lines(data: bytes) -> List[dict]:
+    out = []
+    for line in data.splitlines():
+        try:
+            out.append(json.loads(line))
+        except ValueError:
+            continue  # blank, or torn by a crashed writer
+    return out
+
+
+class _Mapped:
+    """One built snapshot directory, memory-mapped."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        def arr(name):
+            return np.load(os.path.join(path, name), mmap_mode="r")
+
+        self.ids = arr("ids.npy")
+        self.topic = arr("topic.npy")
+        self.published = arr("published.npy")
+        self.scan_of_row = arr("scan_of_row.npy")
+        self.row_of_scan = arr("row_of_scan.npy")
+        self.offsets = {c: arr(f"{c}.offsets.npy") for c in STRING_COLUMNS}
+        self.blobs = {}
+        for c in STRING_COLUMNS:
+            with open(os.path.join(path, f"{c}.bytes"), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                self.blobs[c] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._order = None  # argsort of ids, built on first row_of_id()
+
+    def row_of_id(self, aid: int) -> Optional[int]:
+        """Row of an article id in this snapshot (None if the version never embedded it)."""
+        if self._order is None:
+            self._order = np.argsort(self.ids, kind="stable")
+            self._sorted = np.asarray(self.ids[self._order])
+        j = int(np.searchsorted(self._sorted, aid))
+        if j < len(self._sorted) and self._sorted[j] == aid:
+            return int(self._order[j])
+        return None
+
+    def string(self, col: str, row: int) -> Optional[str]:
+        s = int(self.scan_of_row[row])
+        if s < 0:
+            return None
+        off = self.offsets[col]
+        return self.blobs[col][int(off[s]):int(off[s + 1])].decode("utf-8")
+
+    def find(self, col: str, needle: bytes, limit: Optional[int] = None, skip: frozenset = frozenset()) -> List[int]:
+        """Scan positions whose `col` contains needle, in article id order."""
+        blob, off = self.blobs[col], self.offsets[col]
+        out: List[int] = []
+        if not needle or not len(blob):
+            return out
+        pos = blob.find(needle)
+        while pos != -1:
+            s = int(np.searchsorted(off, pos, side="right")) - 1
+            end = int(off[s + 1])
+            if pos + len(needle) <= end:
+                if s not in skip:
+                    out.append(s)
+                    if limit is not None and len(out) >= limit:
+                        break
+                pos = blob.find(needle, end)      # next row
+            else:
+                pos = blob.find(needle, pos + 1)  # straddled a row boundary
+        return out
+
+    def close(self):
+        for b in self.blobs.values():
+            if isinstance(b, mmap.mmap):
+                b.close()
+
+
+class CorpusSnapshot:
+    """The live snapshot of one artifact version plus its overlay of later changes."""
+
+    def __init__(self, version: str, ids_path: Optional[str], directory: str = CORPUS_DIR, build: bool = True):
+        """ids_path: the version's article_ids.npy; None (no embeddings) snapshots every article."""
+        self.version = version
+        self.ids_path = ids_path
+        self.root = os.path.join(directory, version)
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._overlay_pos = 0                    # bytes of the base's overlay log applied
+        self._overlay_lines = 0
+        self.base: Optional[_Mapped] = None
+        self.overlay: Dict[int, dict] = {}      # article id -> entry (see _diff)
+        self._overlay_rows: Dict[int, int] = {}  # article id -> row, for entries in the base
+        self._open(build)
+
+    # -----------------------------------------------------------------
+    # Opening / refreshing
+    # -----------------------------------------------------------------
+    def _current_name(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, "CURRENT"), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _open(self, build: bool):
+        name = self._current_name()
+        if name and os.path.exists(os.path.join(self.root, name, "meta.json")):
+            with open(os.path.join(self.root, name, "meta.json"), "r", encoding="utf-8") as f:
+                ok = json.load(f).get("format") == FORMAT
+            if ok:
+                base = _Mapped(os.path.join(self.root, name))
+                if self.ids_path is None:
+                    ok = base.meta.get("ids_from_db", False)
+                else:
+                    ids = np.load(self.ids_path, mmap_mode="r")
+                    ok = base.meta["rows"] == len(ids) and base.meta["ids_sha1"] == _ids_checksum(ids)
+                if ok:
+                    self._set_base(base)
+                    self._load_overlay()
+                    return
+                base.close()
+            print(f"Corpus snapshot {name} does not match {self.ids_path or 'the database'}; rebuilding")
+        if build:
+            self.rebuild()
+
+    def _set_base(self, base: "_Mapped"):
+        with self._lock:
+            self.base = base
+            self.overlay, self._overlay_rows = {}, {}
+            self._overlay_pos = self._overlay_lines = 0
+
+    def refresh(self, force: bool = False):
+        """Follow a rebuild or overlay change made by another process (cheap between changes)."""
+        now = time.monotonic()
+        if not force and now - self._checked < REFRESH_SECONDS:
+            return
+        self._checked = now
+        name = self._current_name()
+        if name and (self.base is None or name != self.base.name):
+            with self._lock:
+                swap = self.base is None or name != self.base.name
+            if swap:
+                self._set_base(_Mapped(os.path.join(self.root, name)))
+        self._load_overlay()
+
+    def _overlay_path(self, base_name: Optional[str] = None) -> str:
+        return os.path.join(self.root, base_name or self.base.name, OVERLAY)
+
+    @staticmethod
+    def _apply(records: List[dict], entries: Dict[int, dict], rows: Dict[int, int]):
+        for rec in records:
+            aid = int(rec["id"])
+            if rec.get("same"):
+                entries.pop(aid, None)
+                rows.pop(aid, None)
+            else:
+                entries[aid] = rec
+                rows[aid] = rec["row"]
+
+    def _load_overlay(self):
+        """Apply the overlay lines appended since the last call."""
+        if self.base is None:
+            return
+        path = self._overlay_path()
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return
+        if size <= self._overlay_pos:
+            return
+        with self._lock:
+            start = self._overlay_pos
+            if size <= start:
+                return
+            with open(path, "rb") as f:
+                f.seek(start)
+                chunk = f.read(size - start)
+            whole = chunk.rfind(b"\n") + 1  # a line still being written waits for the next call
+            if not whole:
+                return
+            records = _parse_lines(chunk[:whole])
+            # copy on write: searches iterate the current dicts without the lock
+            entries, rows = dict(self.overlay), dict(self._overlay_rows)
+            self._apply(records, entries, rows)
+            self.overlay, self._overlay_rows = entries, rows
+            self._overlay_pos = start + whole
+            self._overlay_lines += len(records)
+
+    # -----------------------------------------------------------------
+    # Row access (overlay first)
+    # -----------------------------------------------------------------
+    def __len__(self):
+        return self.base.meta["rows"] if self.base else 0
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self.base.ids
+
+    def _override(self, row: int) -> Optional[dict]:
+        if not self.overlay:
+            return None
+        e = self.overlay.get(int(self.base.ids[row]))
+        return e if e is not None and e.get("row") == row else None
+
+    def present(self, row: int) -> bool:
+        e = self._override(row)
+        if e is not None:
+            return not e["deleted"]
+        return int(self.base.scan_of_row[row]) >= 0
+
+    def row(self, row: int) -> Optional[dict]:
+        """{"id", "title", "text", "topic", "published", "source", "url"} of a row, None if the article is gone."""
+        e = self._override(row)
+        if e is not None:
+            if e["deleted"]:
+                return None
+            return {"id": int(self.base.ids[row]), "title": e["title"], "text": e["text"],
+                    "topic": e["topic"], "published": e["published"],
+                    "source": e.get("source"), "url": e.get("url")}
+        if int(self.base.scan_of_row[row]) < 0:
+            return None
+        pub = float(self.base.published[row])
+        return {
+            "id": int(self.base.ids[row]),
+            "title": self.base.string("title", row),
+            "text": self.base.string("text", row),
+            "topic": int(self.base.topic[row]),
+            "published": None if math.isnan(pub) else datetime.fromtimestamp(pub, timezone.utc).isoformat(),
+            "source": self.base.string("source", row) or None,
+            "url": self.base.string("url", row) or None,
+        }
+
+    def text(self, row: int) -> str:
+        r = self.row(row)
+        return (r and r["text"]) or ""
+
+    def topics(self) -> np.ndarray:
+        """Topic per row with the overlay applied (-1 = none or deleted)."""
+        if not self._overlay_rows:
+            return self.base.topic
+        topic = np.array(self.base.topic)
+        for aid, row in self._overlay_rows.items():
+            e = self.overlay[aid]
+            topic[row] = -1 if e["deleted"] or e["topic"] is None else e["topic"]
+        return topic
+
+    def topic_counts(self) -> Dict[int, int]:
+        t = self.topics()
+        present = np.asarray(self.base.scan_of_row) >= 0
+        for row in self._overlay_rows.values():
+            present[row] = self.present(row)
+        uniq, counts = np.unique(t[present & (t >= 0)], return_counts=True)
+        return {int(k): int(v) for k, v in zip(uniq, counts)}
+
+    def rows_of_topic(self, topic_id: int, limit: int) -> List[int]:
+        out = []
+        for r in np.flatnonzero(self.topics() == int(topic_id)).tolist():
+            if len(out) >= limit:
+                break
+            if self.present(r):
+                out.append(r)
+        return out
+
+    def keyword_search(self, q: str, top_k: int) -> List[Tuple[int, int]]:
+        """(row, score) best first: title match 2 + text match 1, ties in article id order."""
+        needle = str(q).lower().encode("utf-8")
+        base = self.base
+        skip = frozenset(int(base.scan_of_row[r]) for r in self._overlay_rows.values()
+                         if int(base.scan_of_row[r]) >= 0)
+
+        scored: List[Tuple[int, int, int]] = []   # (-score, article id, row)
+        for s in base.find("title_lc", needle, skip=skip):
+            row = int(base.row_of_scan[s])
+            off = base.offsets["text_lc"]
+            in_text = needle in base.blobs["text_lc"][int(off[s]):int(off[s + 1])]
+            scored.append((-(2 + in_text), int(base.ids[row]), row))
+        if len(scored) < top_k:
+            # text-only matches rank last: stop scanning once enough are found
+            titled = frozenset(int(base.scan_of_row[r]) for _, _, r in scored)
+            for s in base.find("text_lc", needle, limit=top_k - len(scored), skip=skip | titled):
+                row = int(base.row_of_scan[s])
+                scored.append((-1, int(base.ids[row]), row))
+
+        for aid, row in self._overlay_rows.items():
+            e = self.overlay[aid]
+            if e["deleted"]:
+                continue
+            score = 2 * (needle.decode("utf-8") in (e["title"] or "").lower()) + \
+                (needle.decode("utf-8") in (e["text"] or "").lower())
+            if score:
+                scored.append((-score, aid, row))
+        scored.sort()
+        return [(row, -neg) for neg, _, row in scored[:top_k]]
+
+    # -----------------------------------------------------------------
+    # Maintenance
+    # -----------------------------------------------------------------
+    def _locked(self):
+        os.makedirs(self.root, exist_ok=True)
+        f = open(os.path.join(self.root, ".lock"), "w")
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        return f
+
+    @staticmethod
+    def _unlock(f):
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_UN)
+        f.close()
+
+    def _append_overlay(self, base_name: str, records: List[dict]):
+        """Append records to a snapshot's overlay log (caller holds the lock file)."""
+        if not records:
+            return
+        data = b"".join(json.dumps(r).encode("utf-8") + b"\n" for r in records)
+        with open(self._overlay_path(base_name), "ab+") as f:
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data  # end a torn line from a crashed writer; readers skip it
+            f.write(data)
+
+    def rebuild(self) -> dict:
+        """Export the articles table into a new snapshot, make it CURRENT, keep later overlay entries."""
+        started = time.time()
+        ids = np.load(self.ids_path) if self.ids_path else _db_ids()
+        name = f"snap-{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}"
+        path = os.path.join(self.root, name)
+        meta = build_snapshot(path + ".partial", ids, ids_from_db=self.ids_path is None)
+        os.replace(path + ".partial", path)
+
+        lock = self._locked()
+        try:
+            new = _Mapped(path)
+            old_name = self._current_name()
+            # changes committed while the export ran may be missing from it: re-apply them
+            late = []
+            if old_name:
+                old: Dict[int, dict] = {}
+                self._apply(self._read_log(self._overlay_path(old_name)), old, {})
+                late = [aid for aid, e in old.items() if e.get("changed_at", 0) >= started]
+            self._append_overlay(name, self._diff(new, late, {}))
+            tmp = os.path.join(self.root, "CURRENT.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(name + "\n")
+            os.replace(tmp, os.path.join(self.root, "CURRENT"))
+        finally:
+            self._unlock(lock)
+
+        self._set_base(new)
+        self._load_overlay()
+        if old_name and old_name != name:
+            # readers still holding the old mapping keep their pages (unlinked files stay mapped)
+            import shutil
+            shutil.rmtree(os.path.join(self.root, old_name), ignore_errors=True)
+        print(f"Corpus snapshot {self.version}/{name}: {meta['present']} of {meta['rows']} rows "
+              f"in {meta['seconds']}s")
+        return meta
+
+    @staticmethod
+    def _read_log(path: str) -> List[dict]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        return _parse_lines(data[:data.rfind(b"\n") + 1])
+
+    def _diff(self, base: _Mapped, article_ids: Iterable[int], entries: Dict[int, dict]) -> List[dict]:
+        """Overlay records for `article_ids` against the DB, given the current `entries`.
+
+        An article that differs from the snapshot gets its new values; one in
+        `entries` that is back to the snapshot's gets a {"same": true} record.
+        """
+        ids = sorted({int(a) for a in article_ids})
+        now = time.time()
+        records: List[dict] = []
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            db = SessionLocal()
+            try:
+                found = {r[0]: r for r in db.execute(
+                    select(Article.id, Article.title, Article.text, Article.topic_id, Article.published_date,
+                           Article.source, Article.url)
+                    .where(Article.id.in_(chunk))
+                ).all()}
+            finally:
+                db.close()
+            for aid in chunk:
+                row = base.row_of_id(aid)
+                if row is None:
+                    continue  # ingested after this version: served from the vector delta instead
+                r = found.get(aid)
+                if r is None:
+                    if int(base.scan_of_row[row]) >= 0:
+                        records.append({"id": aid, "row": row, "deleted": True, "title": None, "text": None,
+                                        "topic": None, "published": None, "source": None, "url": None,
+                                        "changed_at": now})
+                    elif aid in entries:
+                        records.append({"id": aid, "row": row, "same": True})  # was already absent
+                    continue
+                _, title, text, tid, pub, source, url = r
+                pub_ts = _ts(pub)
+                base_pub = float(base.published[row])
+                same = (
+                    int(base.scan_of_row[row]) >= 0
+                    and base.string("title", row) == (title or "")
+                    and base.string("text", row) == (text or "")
+                    and base.string("source", row) == (source or "")
+                    and base.string("url", row) == (url or "")
+                    and int(base.topic[row]) == (-1 if tid is None else tid)
+                    and (pub_ts == base_pub or (math.isnan(pub_ts) and math.isnan(base_pub)))
+                )
+                if same:
+                    if aid in entries:
+                        records.append({"id": aid, "row": row, "same": True})
+                else:
+                    records.append({"id": aid, "row": row, "deleted": False, "title": title, "text": text,
+                                    "topic": tid, "published": None if math.isnan(pub_ts)
+                                    else datetime.fromtimestamp(pub_ts, timezone.utc).isoformat(),
+                                    "source": source, "url": url, "changed_at": now})
+        return records
+
+    def apply_changes(self, article_ids: Iterable[int]) -> int:
+        """Append changed articles to the overlay log; returns its length in lines
+        (compaction is the caller's call)."""
+        if self.base is None:
+            return 0
+        lock = self._locked()
+        try:
+            base_name = self._current_name()
+            if base_name != self.base.name:
+                self.refresh(force=True)
+                if self.base is None or base_name != self.base.name:
+                    return 0
+            self._load_overlay()
+            self._append_overlay(base_name, self._diff(self.base, article_ids, self.overlay))
+        finally:
+            self._unlock(lock)
+        self._load_overlay()
+        return self._overlay_lines
+
+    def stats(self) -> dict:
+        if self.base is None:
+            return {"version": self.version, "snapshot": None}
+        return {"version": self.version, "snapshot": self.base.name, "rows": self.base.meta["rows"],
+                "present": self.base.meta["present"], "built_at": self.base.meta["built_at"],
+                "overlay": len(self.overlay), "overlay_lines": self._overlay_lines}
+
+    def close(self):
+        if self.base is not None:
+            self.base.close()
+            self.base = None
+
+
+# -------------------------------------------------------------------
+# Shared instances and change tracking
+# -------------------------------------------------------------------
+def get_corpus_snapshot(version: str, ids_path: Optional[str]) -> CorpusSnapshot:
+    """The version's snapshot, built from the DB on first use; shared through the model registry."""
+    from backend.app.services.model_registry import registry
+    return registry.acquire("corpus", version, lambda: CorpusSnapshot(version, ids_path))
+
+
+def release_corpus_snapshot(version: str):
+    from backend.app.services.model_registry import registry
+    registry.release("corpus", version)
+
+
+# (version, ids_path) -> snapshot this process appends changes through; it keeps its
+# place in the overlay log, so a change costs the new lines, not a re-read of the log
+_writers: Dict[Tuple[str, Optional[str]], CorpusSnapshot] = {}
+_writers_lock = threading.Lock()
+
+
+def record_changes(version: str, ids_path: Optional[str], article_ids: Iterable[int]):
+    """Overlay changed articles onto the version's snapshot; queue a rebuild when it grew too big."""
+    with _writers_lock:
+        snap = _writers.get((version, ids_path))
+        if snap is None or snap.base is None:
+            snap = CorpusSnapshot(version, ids_path, build=False)
+            if snap.base is None:
+                return  # not built yet: the first build reads the DB as it is then
+            _writers[(version, ids_path)] = snap
+    size = snap.apply_changes(article_ids)
+    if size > COMPACT_ROWS:
+        from backend.app.services import jobs
+        jobs.enqueue("corpus_snapshot", {"version": version, "ids_path": ids_path},
+                     dedupe_key=f"corpus_snapshot:{version}")
+
+
+def _after_fork():
+    global _writers_lock
+    _writers_lock = threading.Lock()
+    for snap in _writers.values():
+        snap._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+@on_articles_changed
+def _track_changes(changes: ArticleChanges):
+    ids = set(changes.updated) | set(changes.deleted) | set(changes.added) | {m[0] for m in changes.retopiced}
+    if not ids:
+        return
+    from backend.app.services import artifacts
+    gen = artifacts.live()
+    ids_path = gen.manifest.get("article_ids")
+    record_changes(gen.version, ids_path if ids_path and os.path.exists(ids_path) else None, ids)
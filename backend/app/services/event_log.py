@@ -0,0 +1,327 @@
+# backend/app/services/event_log.py
+"""Append-only event log in rotated, compressed, indexed segments.
+
+Replaces the single ever-growing data/events.jsonl. Each process appends JSON
+lines to its own active segment (no cross-process locking):
+
+    events-20260101T120000-4242-000001.jsonl            active, plain text
+
+When it reaches NEWSPREP_EVENTS_SEGMENT_BYTES or NEWSPREP_EVENTS_SEGMENT_SECONDS
+(and at shutdown), the segment is sealed in a background thread:
+
+    events-20260101T120000-4242-000001.jsonl.gz         blocks of BLOCK_EVENTS lines,
+                                                        each its own gzip member
+    events-20260101T120000-4242-000001.jsonl.gz.idx     JSON: event count, time range,
+                                                        and per block: byte offset,
+                                                        length, count, time range
+
+`gunzip` / `zcat` read a sealed segment like any .gz file. The index lets the
+replay tool (scripts/replay_events.py) skip blocks outside a time range and
+decompress blocks in parallel. An active segment left behind by a crashed
+process is sealed the next time a log opens on the same directory; every forked
+worker does that at start, so the sealer holds an exclusive flock on the orphan
+and the others skip it.
+"""
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev servers only
+    fcntl = None
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+EVENTS_DIR = os.path.abspath(os.getenv("NEWSPREP_EVENTS_DIR", os.path.join(DATA_DIR, "events")))
+SEGMENT_BYTES = int(os.getenv("NEWSPREP_EVENTS_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+SEGMENT_SECONDS = float(os.getenv("NEWSPREP_EVENTS_SEGMENT_SECONDS", "3600"))
+BLOCK_EVENTS = 8192          # lines per gzip member (the unit of parallel / ranged reads)
+GZIP_LEVEL = 6
+
+ACTIVE_SUFFIX = ".jsonl"
+SEALED_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".jsonl.gz.idx"
+
+
+def event_ts(value) -> Optional[float]:
+    """Epoch seconds for an event's ts (ISO string or datetime; naive means UTC)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class _Block:
+    __slots__ = ("offset", "length", "events", "ts_min", "ts_max")
+
+    def __init__(self, offset: int):
+        self.offset, self.length, self.events = offset, 0, 0
+        self.ts_min = self.ts_max = None
+
+    def add(self, nbytes: int, ts: Optional[float]):
+        self.length += nbytes
+        self.events += 1
+        if ts is not None:
+            self.ts_min = ts if self.ts_min is None else min(self.ts_min, ts)
+            self.ts_max = ts if self.ts_max is None else max(self.ts_max, ts)
+
+
+# -------------------------------------------------------------------
+# Sealing (plain segment -> gzip members + index)
+# -------------------------------------------------------------------
+def _scan_blocks(path: str) -> List[_Block]:
+    """Block layout of a plain segment whose in-memory layout was lost (crash)."""
+    blocks, offset = [], 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # torn last write
+            if not blocks or blocks[-1].events >= BLOCK_EVENTS:
+                blocks.append(_Block(offset))
+            try:
+                ts = event_ts(json.loads(line).get("ts"))
+            except Exception:
+                ts = None
+            blocks[-1].add(len(line), ts)
+            offset += len(line)
+    return blocks
+
+
+def seal_segment(path: str, blocks: Optional[List[_Block]] = None) -> Optional[str]:
+    """Compress a plain segment block by block, write its index, remove the plain file."""
+    if blocks is None:
+        blocks = _scan_blocks(path)
+    blocks = [b for b in blocks if b.events]
+    if not blocks:
+        os.remove(path)
+        return None
+
+    gz_path = path + ".gz"
+    # per-process temp names: two sealers never write into each other's files
+    tmp = f"{gz_path}.{os.getpid()}.tmp"
+    idx_tmp = f"{gz_path}.idx.{os.getpid()}.tmp"
+    index_blocks = []
+    with open(path, "rb") as src, open(tmp, "wb") as dst:
+        for b in blocks:
+            src.seek(b.offset)
+            member = gzip.compress(src.read(b.length), compresslevel=GZIP_LEVEL)
+            index_blocks.append({"offset": dst.tell(), "length": len(member), "events": b.events,
+                                 "ts_min": b.ts_min, "ts_max": b.ts_max})
+            dst.write(member)
+    tss = [b.ts_min for b in blocks if b.ts_min is not None] + [b.ts_max for b in blocks if b.ts_max is not None]
+    index = {
+        "segment": os.path.basename(gz_path),
+        "events": sum(b.events for b in blocks),
+        "ts_min": min(tss) if tss else None,
+        "ts_max": max(tss) if tss else None,
+        "raw_bytes": sum(b.length for b in blocks),
+        "bytes": os.path.getsize(tmp),
+        "blocks": index_blocks,
+    }
+    with open(idx_tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    # data first, then the index: a segment with an index is always complete
+    os.replace(tmp, gz_path)
+    os.replace(idx_tmp, gz_path + ".idx")
+    os.remove(path)
+    return gz_path
+
+
+# -------------------------------------------------------------------
+# Writer
+# -------------------------------------------------------------------
+class EventLog:
+    def __init__(self, directory: str = EVENTS_DIR, max_bytes: int = SEGMENT_BYTES,
+                 max_seconds: float = SEGMENT_SECONDS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+        self._file = None
+        self._path: Optional[str] = None
+        self._blocks: List[_Block] = []
+        self._size = 0
+        self._opened_at = 0.0
+        self._seq = 0
+        self._sealing: List[threading.Thread] = []
+        os.makedirs(directory, exist_ok=True)
+        self._seal_orphans()
+
+    def _seal_orphans(self):
+        """Seal active segments of processes that are gone (crash, kill -9)."""
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith("events-") and name.endswith(ACTIVE_SUFFIX)):
+                continue
+            try:
+                pid = int(name.split("-")[2])
+            except (IndexError, ValueError):
+                continue
+            if pid != os.getpid() and _pid_alive(pid):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if _seal_exclusive(path):
+                    print(f"Event log: sealed orphaned segment {name}")
+            except Exception as e:
+                print(f"Event log: could not seal {name}:", e)
+
+    def _open(self):
+        self._seq += 1
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        self._path = os.path.join(self.directory, f"events-{stamp}-{os.getpid()}-{self._seq:06d}{ACTIVE_SUFFIX}")
+        self._file = open(self._path, "ab")
+        self._blocks, self._size, self._opened_at = [], 0, time.time()
+
+    def append(self, record: dict, ts: Optional[float] = None):
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        ts = event_ts(record.get("ts")) if ts is None else ts
+        with self._lock:
+            if self._file is not None and (self._size >= self.max_bytes
+                                           or time.time() - self._opened_at >= self.max_seconds):
+                self._rotate_locked()
+            if self._file is None:
+                self._open()
+            self._file.write(line)
+            self._file.flush()
+            if not self._blocks or self._blocks[-1].events >= BLOCK_EVENTS:
+                self._blocks.append(_Block(self._size))
+            self._blocks[-1].add(len(line), ts)
+            self._size += len(line)
+
+    def _rotate_locked(self, background: bool = True):
+        path, blocks = self._path, self._blocks
+        self._file.close()
+        self._file, self._path, self._blocks = None, None, []
+        if background:
+            t = threading.Thread(target=self._seal, args=(path, blocks), name="event-log-seal", daemon=True)
+            t.start()
+            self._sealing = [s for s in self._sealing if s.is_alive()] + [t]
+        else:
+            self._seal(path, blocks)
+
+    @staticmethod
+    def _seal(path: str, blocks: List[_Block]):
+        try:
+            seal_segment(path, blocks)
+        except Exception as e:
+            print(f"Event log: sealing {os.path.basename(path)} failed (sealed on next start):", e)
+
+    def rotate(self):
+        with self._lock:
+            if self._file is not None:
+                self._rotate_locked()
+
+    def close(self):
+        """Seal the active segment and wait for background sealing (app shutdown)."""
+        with self._lock:
+            if self._file is not None:
+                self._rotate_locked(background=False)
+            pending = list(self._sealing)
+        for t in pending:
+            t.join()
+
+
+def _seal_exclusive(path: str) -> bool:
+    """Seal an orphaned segment unless another process is sealing (or has sealed) it."""
+    try:
+        lock = open(path, "rb")
+    except FileNotFoundError:
+        return False  # sealed by another process meanwhile
+    try:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return False  # another worker holds it
+        # the lock may have been won after the holder finished and removed the file
+        if not os.path.exists(path):
+            return False
+        seal_segment(path)
+        return True
+    finally:
+        lock.close()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_log: Optional[EventLog] = None
+_log_lock = threading.Lock()
+
+
+def get_event_log() -> EventLog:
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = EventLog()
+    return _log
+
+
+def close():
+    if _log is not None:
+        _log.close()
+
+
+def _after_fork():
+    # a forked worker writes its own segment (named by its pid), never the parent's open file
+    global _log, _log_lock
+    _log, _log_lock = None, threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+# -------------------------------------------------------------------
+# Reading
+# -------------------------------------------------------------------
+def list_segments(directory: str = EVENTS_DIR) -> List[dict]:
+    """Sealed segments (with their index) in name order; legacy/active .jsonl files without one."""
+    out = []
+    for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        path = os.path.join(directory, name)
+        if name.endswith(INDEX_SUFFIX):
+            continue
+        if name.endswith(SEALED_SUFFIX):
+            idx_path = path + ".idx"
+            if not os.path.exists(idx_path):
+                continue  # still being sealed
+            with open(idx_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            out.append({"path": path, "index": index})
+        elif name.endswith(ACTIVE_SUFFIX):
+            out.append({"path": path, "index": None})
+    return out
+
+
+def read_block(path: str, offset: int, length: int) -> bytes:
+    """Decompressed lines of one gzip member of a sealed segment."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return gzip.decompress(f.read(length))
+
+
+def iter_lines(path: str) -> Iterator[bytes]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n"):
+                yield line
@@ -0,0 +1,500 @@
+# backend/app/services/feeds.py
+"""Materialized per-user home feeds.
+
+A feed is the user's top FEED_SIZE unseen articles, ranked once by a blend of
+
+    personal   cosine similarity to the user's profile vector (services/user_profiles.py)
+    trending   weighted interactions per article over the last TRENDING_HOURS
+    topics     the user's decayed engagement with each topic (implicit topic follows)
+
+and stored in user_feeds as packed int32 ids / float16 scores, so a page read is
+one row lookup and a byte slice, whatever ranking costs.
+
+Feeds are refreshed only when something they depend on changed:
+
+  * the user's profile moved on (a new event)  -> rebuilt by a "feed_refresh" job
+    the next time the feed is read (the stored page is served meanwhile),
+  * the artifact version changed, or the feed is older than MAX_AGE (trending
+    drifts)                                    -> same,
+  * articles were added or deleted             -> a "feed_merge" job scores just
+    the new articles for every stored feed and merges them in, and drops the
+    deleted ones.
+
+Every rewrite bumps the row's revision and keeps the ranking it replaced. Page
+cursors name the revision they belong to, so a client paging while the feed is
+re-ranked finishes on the ranking it started with instead of seeing articles
+twice or not at all; a cursor older than that is rejected (CursorExpired).
+"""
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, func, select
+
+from backend.app.db.session import SessionLocal
+from backend.app.db.models.article import Article
+from backend.app.db.models.feed import UserFeed
+from backend.app.db.models.interaction import UserInteraction
+from backend.app.db.models.user import User
+from backend.app.db.events import ArticleChanges, membership_since, on_articles_changed
+from backend.app.db import versions
+from backend.app.services import user_profiles
+from backend.app.services.event_log import event_ts
+
+FEED_SIZE = int(os.getenv("NEWSPREP_FEED_SIZE", "300"))
+MAX_AGE = float(os.getenv("NEWSPREP_FEED_MAX_AGE_SECONDS", str(6 * 3600)))
+TRENDING_HOURS = float(os.getenv("NEWSPREP_FEED_TRENDING_HOURS", "48"))
+SIGNALS_TTL = 300.0          # corpus-wide signals are shared by builds for this long
+BUILD_BATCH = 32             # users ranked per matrix product (BUILD_BATCH x N scores)
+MERGE_PAGE = 500             # feed rows rewritten per transaction by a merge
+
+W_PERSONAL = 0.6
+W_TRENDING = 0.25
+W_TOPICS = 0.15
+
+ID_DTYPE = np.dtype("<i4")
+SCORE_DTYPE = np.dtype("<f2")
+
+
+class CursorExpired(Exception):
+    """The cursor's revision of the feed has been replaced twice since it was issued."""
+
+
+class UnknownUser(LookupError):
+    """No such user: nothing to build a feed for."""
+
+
+def pack(ids: np.ndarray, scores: np.ndarray) -> Tuple[bytes, bytes]:
+    return ids.astype(ID_DTYPE).tobytes(), scores.astype(SCORE_DTYPE).tobytes()
+
+
+def unpack(id_bytes: bytes, score_bytes: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    return np.frombuffer(id_bytes or b"", dtype=ID_DTYPE), np.frombuffer(score_bytes or b"", dtype=SCORE_DTYPE)
+
+
+# -------------------------------------------------------------------
+# Signals
+# -------------------------------------------------------------------
+class Signals:
+    """Corpus-wide ranking inputs, aligned with the recommender's embedding rows."""
+
+    def __init__(self, generation):
+        rec = generation.recommender
+        rec.load()
+        self.version = generation.version
+        # read before the scan: rows applied again afterwards are no-ops (apply)
+        self.membership = versions.read_version(versions.MEMBERSHIP) or 0
+        self.ids = rec.ids
+        self.embeddings = rec.embeddings
+        self.id_to_idx = rec.id_to_idx
+        self.built_at = time.time()
+
+        db = SessionLocal()
+        try:
+            topic_of = dict(db.execute(select(Article.id, Article.topic_id)).all())
+            since = datetime.utcnow() - timedelta(hours=TRENDING_HOURS)
+            activity = db.execute(
+                select(UserInteraction.article_id, UserInteraction.event_type, func.count())
+                .where(UserInteraction.timestamp >= since)
+                .group_by(UserInteraction.article_id, UserInteraction.event_type)
+            ).all()
+        finally:
+            db.close()
+
+        # -1 = no topic (and rows whose article is gone from the table)
+        tids = (topic_of.get(int(a)) for a in self.ids)
+        self.topics = np.fromiter((-1 if t is None else t for t in tids), dtype=np.int64, count=len(self.ids))
+        raw = np.zeros(len(self.ids), dtype=np.float32)
+        for aid, kind, n in activity:
+            idx = self.id_to_idx.get(aid)
+            if idx is not None:
+                raw[idx] += user_profiles.EVENT_WEIGHTS.get(kind, 0.0) * n
+        peak = float(raw.max()) if len(raw) else 0.0
+        # log-damped so a viral article does not flatten everything else to zero
+        self.trending = np.log1p(raw) / math.log1p(peak) if peak > 0 else raw
+        # articles no longer in the table never enter a feed
+        self.missing = np.fromiter((int(a) not in topic_of for a in self.ids), dtype=bool, count=len(self.ids))
+
+    def apply(self, version: int, rows):
+        """Take in logged inserts, deletes and re-topics (db.events.membership_since).
+
+        Copies rather than writes in place: a build may be ranking with the old arrays.
+        Rows ingested after this build join at the next one (SIGNALS_TTL); merge_articles
+        places them in stored feeds meanwhile.
+        """
+        topics, missing = self.topics.copy(), self.missing.copy()
+        for aid, tid, deleted in rows:
+            idx = self.id_to_idx.get(aid)
+            if idx is None or idx >= len(topics):
+                continue
+            missing[idx] = deleted
+            topics[idx] = -1 if deleted or tid is None else int(tid)
+        self.topics, self.missing = topics, missing
+        self.membership = version
+
+
+_signals: Optional[Signals] = None
+_signals_lock = threading.Lock()
+
+
+def get_signals() -> Signals:
+    global _signals
+    from backend.app.services import artifacts
+    gen = artifacts.live()
+    # inserts, deletes and re-topics by any process; summary edits leave it alone
+    membership = versions.read_version(versions.MEMBERSHIP) or 0
+    with _signals_lock:
+        if (_signals is None or _signals.version != gen.version
+                or time.time() - _signals.built_at > SIGNALS_TTL):
+            _signals = Signals(gen)
+        elif _signals.membership != membership:
+            delta = membership_since(_signals.membership)
+            if delta is None:
+                _signals = Signals(gen)  # the log was pruned past what these signals saw
+            else:
+                _signals.apply(*delta)
+        return _signals
+
+
+# -------------------------------------------------------------------
+# Per-user inputs
+# -------------------------------------------------------------------
+def _user_history(db, user_ids: List[int], now: float) -> Dict[int, Tuple[set, Dict[int, float]]]:
+    """user_id -> (seen article ids, topic_id -> affinity normalized to max 1)."""
+    out = {uid: (set(), {}) for uid in user_ids}
+    rows = db.execute(
+        select(UserInteraction.user_id, UserInteraction.article_id, UserInteraction.event_type,
+               UserInteraction.timestamp, Article.topic_id)
+        .join(Article, Article.id == UserInteraction.article_id, isouter=True)
+        .where(UserInteraction.user_id.in_(user_ids))
+    ).all()
+    for uid, aid, kind, ts, tid in rows:
+        seen, topics = out[uid]
+        seen.add(int(aid))
+        w = user_profiles.EVENT_WEIGHTS.get(kind)
+        if w and tid is not None:
+            age = now - (event_ts(ts) or now)
+            topics[int(tid)] = topics.get(int(tid), 0.0) + w * float(user_profiles.decay_factor(age))
+    for uid, (seen, topics) in out.items():
+        peak = max(topics.values(), default=0.0)
+        if peak > 0:
+            out[uid] = (seen, {t: v / peak for t, v in topics.items()})
+    return out
+
+
+def _topic_scores(affinity: Dict[int, float], topics: np.ndarray) -> np.ndarray:
+    if not affinity:
+        return np.zeros(len(topics), dtype=np.float32)
+    keys = np.fromiter(affinity.keys(), dtype=np.int64, count=len(affinity))
+    vals = np.fromiter(affinity.values(), dtype=np.float32, count=len(affinity))
+    order = np.argsort(keys)
+    keys, vals = keys[order], vals[order]
+    pos = np.clip(np.searchsorted(keys, topics), 0, len(keys) - 1)
+    return np.where(keys[pos] == topics, vals[pos], 0.0).astype(np.float32)
+
+
+# -------------------------------------------------------------------
+# Building
+# -------------------------------------------------------------------
+_t = UserFeed.__table__
+# SET clauses of every rewrite: SQL reads the old row on the right-hand side, so the
+# ranking being replaced moves to prev_* and the revision goes up by one
+_ROTATE = {
+    "prev_item_ids": _t.c.item_ids,
+    "prev_scores": _t.c.scores,
+    "prev_revision": _t.c.revision,
+    "revision": func.coalesce(_t.c.revision, 0) + 1,
+}
+
+
+def build_feeds(user_ids: Iterable[int], signals: Optional[Signals] = None) -> int:
+    """Rank and store the feeds of `user_ids`; returns how many were written."""
+    user_ids = sorted({int(u) for u in user_ids})
+    if not user_ids:
+        return 0
+    signals = signals or get_signals()
+    profiles = user_profiles.get_user_profiles(signals.embeddings.shape[1])
+    base = W_TRENDING * signals.trending
+    base = np.where(signals.missing, -np.inf, base).astype(np.float32)
+    k = min(FEED_SIZE, len(signals.ids))
+    now = time.time()
+
+    written = 0
+    for start in range(0, len(user_ids), BUILD_BATCH):
+        batch = user_ids[start:start + BUILD_BATCH]
+        db = SessionLocal()
+        try:
+            history = _user_history(db, batch, now)
+            vecs = [profiles.get(uid) for uid in batch]
+            has_profile = [v is not None for v in vecs]
+            # read before ranking: an event landing meanwhile leaves the feed stale, not wrongly fresh
+            stamps = [float(profiles.updated[uid]) if ok else None for uid, ok in zip(batch, has_profile)]
+            personal = None
+            if any(has_profile):
+                mat = np.stack([v if v is not None else np.zeros(signals.embeddings.shape[1], np.float32)
+                                for v in vecs])
+                norms = np.linalg.norm(mat, axis=1, keepdims=True)
+                mat = mat / np.where(norms > 0, norms, 1.0)
+                personal = np.maximum(mat @ signals.embeddings.T, 0.0)
+
+            rows = []
+            for i, uid in enumerate(batch):
+                seen, affinity = history[uid]
+                scores = base + W_TOPICS * _topic_scores(affinity, signals.topics)
+                if personal is not None and has_profile[i]:
+                    scores = scores + W_PERSONAL * personal[i]
+                seen_rows = [signals.id_to_idx[a] for a in seen if a in signals.id_to_idx]
+                scores[seen_rows] = -np.inf
+                if k:
+                    top = np.argpartition(-scores, k - 1)[:k]
+                    top = top[np.argsort(-scores[top])]
+                    top = top[np.isfinite(scores[top])]
+                else:
+                    top = np.zeros(0, dtype=np.int64)
+                id_bytes, score_bytes = pack(signals.ids[top], scores[top])
+                rows.append({"user_id": uid, "item_ids": id_bytes, "scores": score_bytes,
+                             "topics": {str(t): round(v, 4) for t, v in affinity.items()},
+                             "profile_ts": stamps[i], "built_at": now, "version": signals.version})
+
+            existing = set(db.execute(select(UserFeed.user_id).where(UserFeed.user_id.in_(batch))).scalars())
+            inserts = [dict(r, revision=1) for r in rows if r["user_id"] not in existing]
+            updates = [dict(r, uid=r["user_id"]) for r in rows if r["user_id"] in existing]
+            if inserts:
+                db.execute(UserFeed.__table__.insert(), inserts)
+            if updates:
+                t = UserFeed.__table__
+                db.execute(
+                    t.update().where(t.c.user_id == bindparam("uid")).values(
+                        item_ids=bindparam("item_ids"), scores=bindparam("scores"), topics=bindparam("topics"),
+                        profile_ts=bindparam("profile_ts"), built_at=bindparam("built_at"), version=bindparam("version"),
+                        **_ROTATE),
+                    [{k2: v for k2, v in r.items() if k2 != "user_id"} for r in updates],
+                )
+            db.commit()
+            written += len(rows)
+        finally:
+            db.close()
+    return written
+
+
+def is_stale(feed: dict, now: Optional[float] = None) -> bool:
+    from backend.app.services import artifacts
+    now = time.time() if now is None else now
+    if feed["version"] != artifacts.live().version or now - (feed["built_at"] or 0) > MAX_AGE:
+        return True
+    try:
+        dim = artifacts.live().recommender.embeddings.shape[1]
+    except AttributeError:
+        return False
+    store = user_profiles.get_user_profiles(dim)
+    uid = feed["user_id"]
+    p_ts = float(store.updated[uid]) if uid < store.capacity and store.weights[uid] > 0 else None
+    return p_ts != feed["profile_ts"]
+
+
+def request_refresh(user_id: int):
+    from backend.app.services import jobs
+    jobs.enqueue("feed_refresh", {"user_ids": [int(user_id)]}, dedupe_key=f"feed:{int(user_id)}")
+
+
+# -------------------------------------------------------------------
+# Reading
+# -------------------------------------------------------------------
+def read_page(user_id: int, offset: int, limit: int, revision: Optional[int] = None) -> Optional[dict]:
+    """One page of a stored feed (only the page's bytes leave the database), or None.
+
+    With `revision`, the page comes from that ranking: the current one or the one it
+    replaced. CursorExpired if it is neither.
+    """
+    t = UserFeed.__table__
+    id_size, score_size = ID_DTYPE.itemsize, SCORE_DTYPE.itemsize
+
+    def page_of(ids_col, scores_col):
+        return (func.substr(ids_col, offset * id_size + 1, limit * id_size),
+                func.substr(scores_col, offset * score_size + 1, limit * score_size),
+                func.length(ids_col))
+
+    db = SessionLocal()
+    try:
+        row = db.execute(
+            select(t.c.revision, t.c.prev_revision, t.c.profile_ts, t.c.built_at, t.c.version)
+            .where(t.c.user_id == int(user_id))
+        ).first()
+        if row is None:
+            return None
+        current, previous = row[0] or 0, row[1]
+        if revision is None or revision == current:
+            cols, served = page_of(t.c.item_ids, t.c.scores), current
+        elif revision == previous:
+            cols, served = page_of(t.c.prev_item_ids, t.c.prev_scores), previous
+        else:
+            raise CursorExpired(f"feed revision {revision} is gone (now {current})")
+        id_bytes, score_bytes, length = db.execute(select(*cols).where(t.c.user_id == int(user_id))).one()
+    finally:
+        db.close()
+    ids, scores = unpack(id_bytes, score_bytes)
+    return {
+        "user_id": int(user_id),
+        "ids": ids.tolist(),
+        "scores": scores.astype(np.float32).tolist(),
+        "total": (length or 0) // id_size,
+        "revision": served,
+        "current": served == current,
+        "profile_ts": row[2],
+        "built_at": row[3],
+        "version": row[4],
+    }
+
+
+def user_exists(user_id: int) -> bool:
+    """A user is anyone in the users table or with recorded interactions."""
+    db = SessionLocal()
+    try:
+        if db.execute(select(User.id).where(User.id == int(user_id))).first():
+            return True
+        return db.execute(
+            select(UserInteraction.id).where(UserInteraction.user_id == int(user_id)).limit(1)
+        ).first() is not None
+    finally:
+        db.close()
+
+
+def get_page(user_id: int, offset: int = 0, limit: int = 20, revision: Optional[int] = None) -> dict:
+    """Feed page; builds a missing feed inline and queues a rebuild of a stale one.
+
+    UnknownUser for ids with no user behind them (nothing is written for those).
+    """
+    page = read_page(user_id, offset, limit, revision)
+    if page is None:
+        if revision is not None:
+            raise CursorExpired(f"no feed for user {user_id}")
+        if not user_exists(user_id):
+            raise UnknownUser(f"User {user_id} not found")
+        build_feeds([user_id])
+        page = read_page(user_id, offset, limit)
+        page["stale"] = False
+        return page
+    refresh = is_stale(page)
+    # a page of the replaced ranking is stale by definition; refreshing again would expire its cursor
+    page["stale"] = refresh or not page["current"]
+    if refresh:
+        try:
+            request_refresh(user_id)
+        except Exception as e:
+            print(f"Feed refresh for user {user_id} not queued:", e)
+    return page
+
+
+# -------------------------------------------------------------------
+# Incremental merge of article changes
+# -------------------------------------------------------------------
+def merge_articles(added: Dict[int, Optional[int]], deleted: Iterable[int] = ()) -> dict:
+    """Score new articles for every stored feed and merge them in; drop deleted ones."""
+    from backend.app.services import artifacts
+    rec = artifacts.live().recommender
+    new_ids, new_vecs, new_topics = [], [], []
+    for aid, tid in added.items():
+        vec = rec.embedding_of(int(aid))
+        if vec is None:
+            continue  # not embedded yet: enters feeds with the next rebuild
+        new_ids.append(int(aid))
+        new_vecs.append(vec)
+        new_topics.append(-1 if tid is None else int(tid))
+    deleted = np.asarray(sorted({int(a) for a in deleted}), dtype=np.int64)
+    if not new_ids and not len(deleted):
+        return {"feeds": 0, "merged": 0}
+
+    new_ids_arr = np.asarray(new_ids, dtype=np.int64)
+    new_mat = np.stack(new_vecs) if new_vecs else None
+    new_topics_arr = np.asarray(new_topics, dtype=np.int64)
+    profiles = user_profiles.get_user_profiles(rec.embeddings.shape[1])
+    t = UserFeed.__table__
+
+    feeds = merged = 0
+    last_uid = -1
+    while True:
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(t.c.user_id, t.c.item_ids, t.c.scores, t.c.topics)
+                .where(t.c.user_id > last_uid).order_by(t.c.user_id).limit(MERGE_PAGE)
+            ).all()
+            if not rows:
+                break
+            last_uid = rows[-1][0]
+            updates = []
+            for uid, id_bytes, score_bytes, topics in rows:
+                ids, scores = unpack(id_bytes, score_bytes)
+                ids, scores = ids.astype(np.int64), scores.astype(np.float32)
+                keep = ~np.isin(ids, deleted) if len(deleted) else np.ones(len(ids), dtype=bool)
+                if new_mat is not None:
+                    keep &= ~np.isin(ids, new_ids_arr)
+                    affinity = {int(k): float(v) for k, v in (topics or {}).items()}
+                    cand = W_TOPICS * _topic_scores(affinity, new_topics_arr)
+                    vec = profiles.get(uid)
+                    if vec is not None:
+                        norm = float(np.linalg.norm(vec))
+                        if norm > 0:
+                            cand = cand + W_PERSONAL * np.maximum(new_mat @ (vec / norm), 0.0)
+                    ids = np.concatenate([ids[keep], new_ids_arr])
+                    scores = np.concatenate([scores[keep], cand.astype(np.float32)])
+                    order = np.argsort(-scores, kind="stable")[:FEED_SIZE]
+                    ids, scores = ids[order], scores[order]
+                    merged += 1
+                elif keep.all():
+                    continue
+                else:
+                    ids, scores = ids[keep], scores[keep]
+                id_b, score_b = pack(ids, scores)
+                updates.append({"uid": uid, "item_ids": id_b, "scores": score_b})
+            if updates:
+                db.execute(t.update().where(t.c.user_id == bindparam("uid"))
+                           .values(item_ids=bindparam("item_ids"), scores=bindparam("scores"), **_ROTATE), updates)
+                db.commit()
+            feeds += len(updates)
+        finally:
+            db.close()
+    return {"feeds": feeds, "merged": merged, "articles": len(new_ids), "deleted": int(len(deleted))}
+
+
+@on_articles_changed
+def _queue_merge(changes: ArticleChanges):
+    if not (changes.added or changes.deleted):
+        return
+    from backend.app.services import jobs
+    jobs.enqueue("feed_merge", {"added": {str(k): v for k, v in changes.added.items()},
+                                "deleted": sorted(changes.deleted)})
+
+
+# -------------------------------------------------------------------
+# Sweeps
+# -------------------------------------------------------------------
+def active_users(days: float = 30.0) -> List[int]:
+    since = datetime.utcnow() - timedelta(days=days)
+    db = SessionLocal()
+    try:
+        return [int(u) for u in db.execute(
+            select(UserInteraction.user_id).where(UserInteraction.user_id.isnot(None),
+                                                  UserInteraction.timestamp >= since).distinct()
+        ).scalars()]
+    finally:
+        db.close()
+
+
+def stats() -> dict:
+    db = SessionLocal()
+    try:
+        n, oldest = db.execute(select(func.count(), func.min(UserFeed.built_at))).one()
+    finally:
+        db.close()
+    return {
+        "feeds": n,
+        "oldest_built_at": oldest,
+        "feed_size": FEED_SIZE,
+        "max_age_seconds": MAX_AGE,
+        "weights": {"personal": W_PERSONAL, "trending": W_TRENDING, "topics": W_TOPICS},
+    }
@@ -0,0 +1,173 @@
+# backend/app/services/hybrid_search.py
+"""Fused keyword + semantic search.
+
+Both retrievers run at the same time, each on its own thread pool and with its
+own deadline measured from the start of the request, so total latency is roughly
+the slower of the two instead of their sum. A stage that misses its deadline
+(cold or overloaded encoder) is dropped from the fusion and the response says so;
+its work keeps running in the background and simply lands in the registry /
+caches. Separate pools keep those leftover semantic tasks from queueing the
+keyword stage, which is the fallback when the encoder is slow.
+
+Fusion:
+  rrf      — reciprocal-rank fusion, sum of w / (rrf_k + rank); ignores raw scores
+  weighted — min-max normalize each list's scores, then weighted sum
+
+Every score in the response is a finite float: missing, NaN and inf scores from
+a retriever count as 0.0, as they always have on the wire.
+"""
+import contextvars
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional
+
+from backend.app import profiling
+from backend.app.metrics import Counter, register_collector
+
+KEYWORD_TIMEOUT = float(os.getenv("NEWSPREP_SEARCH_KEYWORD_TIMEOUT", "2.0"))
+SEMANTIC_TIMEOUT = float(os.getenv("NEWSPREP_SEARCH_SEMANTIC_TIMEOUT", "0.75"))
+RRF_K = 60
+
+STAGE_OUTCOMES = Counter("newsprep_search_stage_total", "Hybrid search stage outcomes.", ("stage", "status"))
+register_collector(STAGE_OUTCOMES.render)
+
+_pools = {
+    stage: ThreadPoolExecutor(max_workers=int(os.getenv("NEWSPREP_SEARCH_WORKERS", "8")),
+                              thread_name_prefix=f"search-{stage}")
+    for stage in ("keyword", "semantic")
+}
+
+
+# -------------------------------------------------------------------
+# Fusion
+# -------------------------------------------------------------------
+def _finite(v) -> float:
+    v = float(v or 0.0)
+    return v if math.isfinite(v) else 0.0
+
+
+def _dedupe(results: List[dict]) -> List[dict]:
+    seen = set()
+    out = []
+    for r in results:
+        if r["id"] not in seen:
+            seen.add(r["id"])
+            out.append(r)
+    return out
+
+
+def rrf_fuse(lists: Dict[str, List[dict]], weights: Dict[str, float], k: int = RRF_K) -> Dict[int, float]:
+    scores: Dict[int, float] = {}
+    for name, results in lists.items():
+        w = weights.get(name, 1.0)
+        for rank, r in enumerate(results, start=1):
+            scores[r["id"]] = scores.get(r["id"], 0.0) + w / (k + rank)
+    return scores
+
+
+def weighted_fuse(lists: Dict[str, List[dict]], weights: Dict[str, float]) -> Dict[int, float]:
+    scores: Dict[int, float] = {}
+    for name, results in lists.items():
+        if not results:
+            continue
+        w = weights.get(name, 1.0)
+        raw = [_finite(r.get("score")) for r in results]
+        lo, hi = min(raw), max(raw)
+        span = (hi - lo) or 1.0
+        for r, s in zip(results, raw):
+            # a single hit (or all ties) normalizes to 1.0
+            norm = (s - lo) / span if hi > lo else 1.0
+            scores[r["id"]] = scores.get(r["id"], 0.0) + w * norm
+    return scores
+
+
+# -------------------------------------------------------------------
+# Stages
+# -------------------------------------------------------------------
+def _keyword(svc, q: str, n: int) -> List[dict]:
+    results = svc.keyword_search(q, top_k=n)
+    # keyword_search has no score field; its order is the ranking
+    for rank, r in enumerate(results):
+        r["score"] = float(n - rank) / n
+    return results
+
+
+def _semantic(svc, q: str, n: int) -> List[dict]:
+    return svc.semantic_search(q, top_k=n)
+
+
+def _attached(fn, *args):
+    with profiling.attach():  # sampled with the request when it is being profiled
+        return fn(*args)
+
+
+def _submit(stage: str, fn, *args):
+    # carry contextvars (pinned artifact generation, profile etc.) into the worker thread
+    ctx = contextvars.copy_context()
+    return _pools[stage].submit(ctx.run, _attached, fn, *args)
+
+
+def hybrid_search(
+    svc,
+    q: str,
+    top_k: int = 10,
+    mode: str = "rrf",
+    semantic_weight: float = 0.5,
+    keyword_timeout: Optional[float] = None,
+    semantic_timeout: Optional[float] = None,
+) -> dict:
+    """One ranked, de-duplicated list from both retrievers."""
+    n = min(max(top_k * 3, 30), 200)  # over-fetch so fusion has something to re-rank
+    deadlines = {
+        "keyword": KEYWORD_TIMEOUT if keyword_timeout is None else keyword_timeout,
+        "semantic": SEMANTIC_TIMEOUT if semantic_timeout is None else semantic_timeout,
+    }
+
+    t0 = time.perf_counter()
+    futures = {"keyword": _submit("keyword", _keyword, svc, q, n)}
+    if svc.has_embeddings():
+        futures["semantic"] = _submit("semantic", _semantic, svc, q, n)
+
+    lists: Dict[str, List[dict]] = {}
+    stages: Dict[str, dict] = {}
+    for name, fut in futures.items():
+        remaining = max(0.0, deadlines[name] - (time.perf_counter() - t0))
+        try:
+            lists[name] = _dedupe(fut.result(timeout=remaining))
+            stages[name] = {"status": "ok", "hits": len(lists[name])}
+        except FutureTimeout:
+            stages[name] = {"status": "timeout"}
+        except Exception as e:
+            stages[name] = {"status": "error", "error": str(e)}
+        stages[name]["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        STAGE_OUTCOMES.inc(name, stages[name]["status"])
+    if "semantic" not in futures:
+        stages["semantic"] = {"status": "unavailable"}
+
+    weights = {"keyword": 1.0 - semantic_weight, "semantic": semantic_weight}
+    if mode == "weighted":
+        fused = weighted_fuse(lists, weights)
+    else:
+        fused = rrf_fuse(lists, weights)
+
+    # per-result provenance; first list seen provides the document fields
+    docs: Dict[int, dict] = {}
+    for name, results in lists.items():
+        for rank, r in enumerate(results, start=1):
+            doc = docs.setdefault(r["id"], {k: v for k, v in r.items() if k != "score"})
+            doc[f"{name}_rank"] = rank
+            doc[f"{name}_score"] = _finite(r.get("score"))
+
+    ranked = sorted(fused.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+    results = [{**docs[aid], "score": score} for aid, score in ranked]
+
+    return {
+        "query": q,
+        "mode": mode,
+        "results": results,
+        # lexical-only (or empty) when the semantic stage missed its deadline or failed
+        "degraded": stages.get("semantic", {}).get("status") != "ok",
+        "stages": stages,
+    }
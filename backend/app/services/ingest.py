@@ -0,0 +1,215 @@
+# backend/app/services/ingest.py
+"""Bulk article ingestion and the incremental indexing pipeline behind it.
+
+POST /api/ingest/articles streams NDJSON into insert_articles() (Core bulk
+inserts, INSERT_BATCH rows per statement) and queues one "index_articles" job
+for the new ids. The job runs index_articles():
+
+  1. embed the new rows, EMBED_BATCH texts per encoder call,
+  2. assign a topic from the nearest topic centroid where none was given,
+  3. append the vectors to the artifact version's vector delta; every process's
+     recommender and semantic/keyword search pick them up from there,
+  4. embed their text chunks into the RAG chunk delta, which every process's
+     RAG store adds without running the encoder itself,
+  5. announce the articles (db.events), which updates topic counts and
+     centroids, bumps the response cache and merges them into materialized feeds.
+
+Nothing is rebuilt; an ingested article is visible everywhere once its batch is
+through. Step 5 happens only after steps 3 and 4, so listeners see articles
+that are fully indexed. Every delta row is announced exactly once: the count of
+announced rows is a db.versions counter advanced in the same transaction that
+records the change, so a retry after a partial run announces the batches the
+failed attempt appended, and re-running the job for the same ids is a no-op.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import insert, select, update
+
+from backend.app.db.session import SessionLocal, engine
+from backend.app.db.models.article import Article
+from backend.app.db.events import ArticleChanges, notify_articles_changed, record_changes
+from backend.app.db import versions
+from backend.app.metrics import Counter, register_collector
+
+INSERT_BATCH = 1000
+EMBED_BATCH = 256
+MAX_TITLE = 255
+
+INGESTED = Counter("newsprep_ingest_articles_total", "Articles through the ingest pipeline, by step.", ("step",))
+register_collector(INGESTED.render)
+
+_index_lock = threading.Lock()
+
+
+# -------------------------------------------------------------------
+# Parsing and inserting
+# -------------------------------------------------------------------
+def _parse_date(value) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.utcfromtimestamp(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"unreadable published_date {value!r}")
+
+
+def parse_article(obj) -> dict:
+    """Column values for one NDJSON object; raises ValueError when it is not an article."""
+    if not isinstance(obj, dict):
+        raise ValueError("expected a JSON object")
+    title = obj.get("title")
+    text = obj.get("text")
+    if not (isinstance(title, str) and title.strip()) and not (isinstance(text, str) and text.strip()):
+        raise ValueError("title or text is required")
+    topic_id = obj.get("topic_id")
+    if topic_id is not None and not isinstance(topic_id, int):
+        raise ValueError("topic_id must be an integer")
+    published = _parse_date(obj.get("published_date", obj.get("published")))
+    for key in ("source", "url"):
+        if obj.get(key) is not None and not isinstance(obj[key], str):
+            raise ValueError(f"{key} must be a string")
+    return {
+        "title": (title or "")[:MAX_TITLE] or None,
+        "text": text,
+        "published_date": published or datetime.utcnow(),
+        "topic_id": topic_id,
+        "source": (obj.get("source") or "")[:MAX_TITLE] or None,
+        "url": obj.get("url") or None,
+    }
+
+
+def insert_articles(rows: List[dict]) -> List[int]:
+    """Bulk insert parsed rows; returns their new ids in input order."""
+    ids: List[int] = []
+    db = SessionLocal()
+    try:
+        for i in range(0, len(rows), INSERT_BATCH):
+            result = db.execute(
+                insert(Article).returning(Article.id, sort_by_parameter_order=True),
+                rows[i:i + INSERT_BATCH],
+            )
+            ids.extend(result.scalars().all())
+        db.commit()
+    finally:
+        db.close()
+    INGESTED.inc("inserted", amount=len(ids))
+    return ids
+
+
+def id_ranges(ids: Iterable[int]) -> List[Tuple[int, int]]:
+    """Compact [lo, hi] runs for a job payload (bulk inserts give consecutive ids)."""
+    out: List[Tuple[int, int]] = []
+    for a in sorted(ids):
+        if out and a == out[-1][1] + 1:
+            out[-1] = (out[-1][0], a)
+        else:
+            out.append((a, a))
+    return out
+
+
+def expand_ranges(ranges: Sequence[Sequence[int]]) -> List[int]:
+    return [a for lo, hi in ranges for a in range(int(lo), int(hi) + 1)]
+
+
+def queue_indexing(ids: Sequence[int]) -> Optional[dict]:
+    if not ids:
+        return None
+    from backend.app.services import jobs
+    job, _ = jobs.enqueue("index_articles", {"ranges": id_ranges(ids)})
+    return job
+
+
+# -------------------------------------------------------------------
+# Indexing pipeline
+# -------------------------------------------------------------------
+def _announce(gen) -> int:
+    """Announce delta rows no run has announced yet; returns how many."""
+    name = f"delta:{gen.version}"[:32]
+    delta = gen.delta
+    delta.sync(force=True)
+    while True:
+        with engine.begin() as conn:
+            done = versions.read_version(name, conn) or 0
+            ids, topics, _ = delta.since(done)
+            if not len(ids):
+                return 0
+            changes = ArticleChanges(added=dict(zip(ids.tolist(), topics.tolist())))
+            if not versions.advance_version(conn, name, done, done + len(ids)):
+                continue  # another process announced them first
+            record_changes(conn, changes)
+        notify_articles_changed(changes, recorded=True)
+        return len(ids)
+
+
+def index_articles(article_ids: Sequence[int], batch_size: int = EMBED_BATCH) -> dict:
+    from backend.app.services import artifacts, rag_service
+    from backend.app.services.topic_assigner import article_text, get_topic_assigner
+
+    t0 = time.perf_counter()
+    gen = artifacts.live()
+    rec = gen.recommender
+    assigner = get_topic_assigner()   # raises FileNotFoundError without embeddings: the job retries
+    embedded, assigned, chunks, announced = 0, 0, 0, 0
+    rag = True   # without LangChain there is no RAG store to feed
+
+    with _index_lock:
+        rec.load()
+        gen.chunk_delta.sync(force=True)
+        chunked = set(gen.chunk_delta.ids.tolist())
+        requested = sorted({int(a) for a in article_ids})
+        # an earlier attempt may have stopped between the two deltas
+        todo = [a for a in requested if a not in rec.id_to_idx or a not in chunked]
+        for start in range(0, len(todo), batch_size):
+            db = SessionLocal()
+            try:
+                arts = db.execute(
+                    select(Article.id, Article.title, Article.text, Article.topic_id,
+                           Article.published_date)
+                    .where(Article.id.in_(todo[start:start + batch_size]))
+                    .order_by(Article.id)
+                ).all()
+                new = [a for a in arts if a.id not in rec.id_to_idx]
+                if new:
+                    vecs = np.asarray(assigner.encode([article_text(a) for a in new], batch_size=batch_size),
+                                      dtype=np.float32)
+                    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+                    vecs = vecs / np.where(norms > 0, norms, 1.0)
+
+                    topics = [a.topic_id for a in new]
+                    need = [i for i, t in enumerate(topics) if t is None]
+                    if need:
+                        # centroids pick these up from the membership log the announcement writes
+                        found, _ = assigner.assign_embeddings(vecs[need], update=False)
+                        for i, tid in zip(need, found.tolist()):
+                            topics[i] = int(tid)
+                        db.execute(update(Article), [{"id": new[i].id, "topic_id": topics[i]} for i in need])
+                        db.commit()
+                        assigned += len(need)
+
+                    gen.delta.append([a.id for a in new], topics, vecs)
+                    embedded += len(new)
+                if rag:
+                    try:
+                        chunks += rag_service.index_chunks(arts, gen.chunk_delta)
+                    except ImportError as e:
+                        print("RAG chunks not embedded:", e)
+                        rag = False
+            finally:
+                db.close()
+            rec.load()  # take in our own rows now, not at the next sync tick
+            announced += _announce(gen)
+        announced += _announce(gen)
+
+    INGESTED.inc("embedded", amount=embedded)
+    INGESTED.inc("topic_assigned", amount=assigned)
+    secs = time.perf_counter() - t0
+    print(f"Indexed {embedded} ingested article(s) in {secs:.2f}s "
+          f"({assigned} topics assigned, {chunks} RAG chunks, {announced} announced)")
+    return {"indexed": embedded, "topics_assigned": assigned, "chunks": chunks, "announced": announced,
+            "skipped": len(article_ids) - embedded, "seconds": round(secs, 3), "version": gen.version}
@@ -0,0 +1,432 @@
+# backend/app/services/jobs.py
+"""Persistent background jobs for slow generation (LLM summaries, quizzes).
+
+Jobs live in the `jobs` table, so they survive restarts and can be picked up by
+any process. enqueue() returns at once; worker threads claim queued jobs with a
+compare-and-set UPDATE (safe with several workers and several processes), run
+the registered handler and store its result or error.
+
+    queued -> running -> done
+                      -> queued again (handler raised; retried with backoff)
+                      -> failed (JobFailed, or max_attempts used up)
+
+Crash recovery: a running job's heartbeat_at is refreshed while its worker is
+alive. A job whose heartbeat is older than the lease (worker process killed,
+machine restarted) goes back to the queue, or fails once its attempts are used.
+
+Dedupe: jobs may carry a dedupe_key ("summarize:42:abstractive"). While one job
+with that key is queued or running, enqueue() returns it instead of adding a
+second one (also enforced by a partial unique index).
+
+NEWSPREP_JOB_WORKERS sets the worker threads per process (0 = this process only
+enqueues; run scripts/job_worker.py elsewhere).
+"""
+import asyncio
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from backend.app.db.session import SessionLocal
+from backend.app.db.models.job import Job
+from backend.app.metrics import Counter, register_collector, stage
+
+WORKERS = int(os.getenv("NEWSPREP_JOB_WORKERS", "2"))
+LEASE_SECONDS = float(os.getenv("NEWSPREP_JOB_LEASE_SECONDS", "120"))
+POLL_SECONDS = 1.0          # idle workers re-check the table this often
+RETRY_BACKOFF = 5.0         # seconds before the 2nd attempt, doubled after each failure
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+JOB_OUTCOMES = Counter("newsprep_jobs_total", "Background jobs finished, by kind and outcome.", ("kind", "outcome"))
+register_collector(JOB_OUTCOMES.render)
+
+
+class JobFailed(Exception):
+    """Raised by a handler for errors a retry cannot fix (e.g. article not found)."""
+
+
+_handlers: Dict[str, Callable[[dict], dict]] = {}
+
+
+def handler(kind: str):
+    """Register the function that runs jobs of `kind`; it gets the payload and returns the result."""
+    def decorate(fn):
+        _handlers[kind] = fn
+        return fn
+    return decorate
+
+
+def _to_dict(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "payload": job.payload,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+# -------------------------------------------------------------------
+# Status changes (wakes idle workers and SSE waiters in this process)
+# -------------------------------------------------------------------
+_wake = threading.Event()
+_waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()   # SSE streams in wait_for_change
+
+
+def _notify():
+    for loop, event in list(_waiters):
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass  # loop already closed
+
+
+# -------------------------------------------------------------------
+# Producer side
+# -------------------------------------------------------------------
+def _active_by_key(db, dedupe_key: str) -> Optional[Job]:
+    return (
+        db.query(Job)
+        .filter(Job.dedupe_key == dedupe_key, Job.status.in_(ACTIVE))
+        .order_by(Job.id)
+        .first()
+    )
+
+
+def enqueue(kind: str, payload: dict, dedupe_key: str = None, max_attempts: int = 3) -> Tuple[dict, bool]:
+    """Queue a job; returns (job, created). created is False when an identical job was pending."""
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    db = SessionLocal()
+    try:
+        if dedupe_key:
+            existing = _active_by_key(db, dedupe_key)
+            if existing:
+                return _to_dict(existing), False
+        job = Job(kind=kind, payload=payload, dedupe_key=dedupe_key, status=QUEUED,
+                  max_attempts=max_attempts, run_after=datetime.utcnow())
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # lost the race against a concurrent enqueue of the same key
+            db.rollback()
+            existing = _active_by_key(db, dedupe_key)
+            if existing:
+                return _to_dict(existing), False
+            raise
+        db.refresh(job)
+        created = _to_dict(job)
+    finally:
+        db.close()
+    _wake.set()
+    _notify()
+    return created, True
+
+
+def get_job(job_id: int) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        job = db.query(Job).get(job_id)
+        return _to_dict(job) if job else None
+    finally:
+        db.close()
+
+
+def list_jobs(status: str = None, kind: str = None, limit: int = 50) -> List[dict]:
+    db = SessionLocal()
+    try:
+        q = db.query(Job)
+        if status:
+            q = q.filter(Job.status == status)
+        if kind:
+            q = q.filter(Job.kind == kind)
+        return [_to_dict(j) for j in q.order_by(Job.id.desc()).limit(limit).all()]
+    finally:
+        db.close()
+
+
+async def wait_for_change(job_id: int, last_status: Optional[str], timeout: float) -> Optional[dict]:
+    """Wait until the job's status differs from last_status (or timeout); returns the job.
+
+    Runs on the event loop and holds no thread while it waits, so SSE subscribers
+    do not use up the threadpool that sync endpoints run on. Changes made in this
+    process wake the waiter at once; changes made by other processes are seen by
+    re-reading the row every POLL_SECONDS.
+    """
+    import anyio
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        event = asyncio.Event()
+        waiter = (loop, event)
+        _waiters.add(waiter)   # before the read: a change right after it still wakes us
+        try:
+            job = await anyio.to_thread.run_sync(get_job, job_id)
+            if job is None or job["status"] != last_status:
+                return job
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return job
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            _waiters.discard(waiter)
+
+
+# -------------------------------------------------------------------
+# Worker side
+# -------------------------------------------------------------------
+def _claim(worker: str) -> Optional[dict]:
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        candidates = (
+            db.query(Job.id)
+            .filter(Job.status == QUEUED, Job.run_after <= now)
+            .order_by(Job.id)
+            .limit(5)
+            .all()
+        )
+        for (job_id,) in candidates:
+            res = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == QUEUED)
+                .values(status=RUNNING, attempts=Job.attempts + 1, worker=worker,
+                        started_at=now, heartbeat_at=now, error=None)
+            )
+            db.commit()
+            if res.rowcount == 1:
+                return _to_dict(db.query(Job).get(job_id))
+        return None
+    finally:
+        db.close()
+
+
+def _finish(job_id: int, worker: str, **values):
+    db = SessionLocal()
+    try:
+        # only the worker holding the job may finish it (a lease may have expired meanwhile)
+        db.execute(update(Job).where(Job.id == job_id, Job.status == RUNNING, Job.worker == worker).values(**values))
+        db.commit()
+    finally:
+        db.close()
+    _notify()
+
+
+def requeue_expired(lease_seconds: float = None) -> int:
+    """Put running jobs whose worker stopped heartbeating back in the queue (or fail them)."""
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=lease_seconds or LEASE_SECONDS)
+    expired = (Job.status == RUNNING) & (Job.heartbeat_at < cutoff)
+    db = SessionLocal()
+    try:
+        # conditional UPDATEs: a job that finishes or heartbeats meanwhile is left alone
+        failed = db.execute(
+            update(Job).where(expired, Job.attempts >= Job.max_attempts)
+            .values(status=FAILED, finished_at=now, error="worker stopped responding; no attempts left")
+        ).rowcount
+        requeued = db.execute(
+            update(Job).where(expired, Job.attempts < Job.max_attempts)
+            .values(status=QUEUED, run_after=now, error="worker stopped responding; retrying")
+        ).rowcount
+        db.commit()
+    finally:
+        db.close()
+    if failed or requeued:
+        print(f"Jobs: {requeued} job(s) requeued, {failed} failed after a lost worker")
+        _wake.set()
+        _notify()
+    return failed + requeued
+
+
+class WorkerPool:
+    def __init__(self, workers: int = WORKERS, lease_seconds: float = LEASE_SECONDS):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._running: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self._threads or self.workers <= 0:
+            return
+        requeue_expired(self.lease_seconds)
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, args=(f"{self.name}/{i}",), name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+        print(f"Jobs: {self.workers} worker thread(s) started")
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        _wake.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _loop(self, worker: str):
+        while not self._stop.is_set():
+            try:
+                job = _claim(worker)
+            except Exception as e:
+                print("Jobs: claim failed:", e)
+                job = None
+            if job is None:
+                _wake.wait(POLL_SECONDS)
+                _wake.clear()
+                continue
+            _notify()
+            self._run(job, worker)
+
+    def _run(self, job: dict, worker: str):
+        kind, job_id = job["kind"], job["id"]
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            fn = _handlers.get(kind)
+            if fn is None:
+                raise JobFailed(f"no handler for job kind '{kind}'")
+            with stage(f"job.{kind}"):
+                result = fn(job["payload"] or {})
+            _finish(job_id, worker, status=DONE, result=result, finished_at=datetime.utcnow())
+            JOB_OUTCOMES.inc(kind, DONE)
+        except JobFailed as e:
+            _finish(job_id, worker, status=FAILED, error=str(e), finished_at=datetime.utcnow())
+            JOB_OUTCOMES.inc(kind, FAILED)
+        except Exception as e:
+            if job["attempts"] < job["max_attempts"]:
+                delay = RETRY_BACKOFF * 2 ** (job["attempts"] - 1)
+                _finish(job_id, worker, status=QUEUED, error=f"{type(e).__name__}: {e}",
+                        run_after=datetime.utcnow() + timedelta(seconds=delay))
+                JOB_OUTCOMES.inc(kind, "retried")
+            else:
+                _finish(job_id, worker, status=FAILED, error=f"{type(e).__name__}: {e}",
+                        finished_at=datetime.utcnow())
+                JOB_OUTCOMES.inc(kind, FAILED)
+            print(f"Job {job_id} ({kind}) attempt {job['attempts']} failed:", e)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def _heartbeat_loop(self):
+        interval = max(1.0, self.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            try:
+                with self._lock:
+                    running = list(self._running)
+                if running:
+                    db = SessionLocal()
+                    try:
+                        db.execute(update(Job).where(Job.id.in_(running), Job.status == RUNNING)
+                                   .values(heartbeat_at=datetime.utcnow()))
+                        db.commit()
+                    finally:
+                        db.close()
+                requeue_expired(self.lease_seconds)
+            except Exception as e:
+                print("Jobs: heartbeat failed:", e)
+
+
+_pool: Optional[WorkerPool] = None
+
+
+def start(workers: int = None):
+    global _pool
+    if _pool is None:
+        _pool = WorkerPool(WORKERS if workers is None else workers)
+        _pool.start()
+    return _pool
+
+
+def stop():
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
+
+
+def _after_fork():
+    # the parent's worker threads and event loops do not exist in a forked child; start() builds a new pool
+    global _pool
+    _pool = None
+    _waiters.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+# -------------------------------------------------------------------
+# Handlers
+# -------------------------------------------------------------------
+@handler("summarize")
+def _summarize_job(payload: dict) -> dict:
+    from backend.app.services.summarizer import summarize_article_and_store
+    result = summarize_article_and_store(int(payload["article_id"]),
+                                         use_abstractive=bool(payload.get("use_abstractive", True)))
+    if result.get("error"):
+        raise JobFailed(result["error"])
+    return result
+
+
+@handler("quiz")
+def _quiz_job(payload: dict) -> dict:
+    from backend.app.services.quiz_services import generate_quiz_from_article
+    result = generate_quiz_from_article(int(payload["article_id"]))
+    if "error" in result:
+        raise JobFailed(result["error"])
+    return result
+
+
+@handler("feed_refresh")
+def _feed_refresh_job(payload: dict) -> dict:
+    from backend.app.services import feeds
+    return {"feeds": feeds.build_feeds(payload["user_ids"])}
+
+
+@handler("feed_merge")
+def _feed_merge_job(payload: dict) -> dict:
+    from backend.app.services import feeds
+    added = {int(k): v for k, v in (payload.get("added") or {}).items()}
+    return feeds.merge_articles(added, payload.get("deleted") or ())
+
+
+@handler("index_articles")
+def _index_articles_job(payload: dict) -> dict:
+    from backend.app.services import ingest
+    return ingest.index_articles(ingest.expand_ranges(payload["ranges"]))
+
+
+@handler("corpus_snapshot")
+def _corpus_snapshot_job(payload: dict) -> dict:
+    from backend.app.services.corpus_snapshot import CorpusSnapshot
+    snap = CorpusSnapshot(payload["version"], payload.get("ids_path"), build=False)
+    try:
+        return snap.rebuild()
+    finally:
+        snap.close()
@@ -0,0 +1,285 @@
+# backend/app/services/llm_gateway.py
+"""One door to the LLM for every caller (summarizer, quiz, RAG).
+
+generate(prompt, caller=...) adds, in this order:
+
+  1. response cache — content-addressed (sha256 of model + prompt), LRU-bounded;
+     the Ollama client runs at temperature 0 (model_registry.get_llm), so the
+     same prompt gives the same answer and a repeat costs nothing,
+  2. coalescing — while a prompt is being generated, identical calls wait for
+     that result instead of starting their own, each up to its own timeout,
+  3. a global concurrency limit sized to the backend (a local Ollama serves one
+     or two generations at a time; more only queue inside Ollama),
+  4. a per-call timeout covering both the wait for a slot and the generation.
+     A timed-out generation keeps its slot until the backend returns, so the cap
+     holds even when callers give up.
+
+Per-caller calls, cache hits, coalesced waits, timeouts, errors, estimated
+tokens and latency are kept for /api/admin/llm and /metrics.
+
+Backends (NEWSPREP_LLM_BACKEND):
+    ollama  the shared Ollama client from the model registry (default)
+    fake    deterministic canned answers, no network; for tests and load tuning
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, Optional
+
+from backend.app.metrics import Counter, Histogram, register_collector
+from backend.app.services import model_registry
+
+BACKEND = os.getenv("NEWSPREP_LLM_BACKEND", "ollama").lower()
+MODEL = os.getenv("NEWSPREP_LLM_MODEL", model_registry.DEFAULT_LLM)
+CONCURRENCY = int(os.getenv("NEWSPREP_LLM_CONCURRENCY", "2"))
+TIMEOUT = float(os.getenv("NEWSPREP_LLM_TIMEOUT", "120"))
+CACHE_SIZE = int(os.getenv("NEWSPREP_LLM_CACHE_SIZE", "512"))
+FAKE_LATENCY_MS = float(os.getenv("NEWSPREP_LLM_FAKE_LATENCY_MS", "0"))
+
+LLM_SECONDS = Histogram("newsprep_llm_seconds", "LLM generation latency by caller (backend calls only).", ("caller",))
+LLM_CALLS = Counter("newsprep_llm_calls_total", "LLM gateway calls by caller and outcome.", ("caller", "outcome"))
+LLM_TOKENS = Counter("newsprep_llm_tokens_total", "Estimated LLM tokens by caller.", ("caller", "direction"))
+for _m in (LLM_SECONDS, LLM_CALLS, LLM_TOKENS):
+    register_collector(_m.render)
+
+
+class LLMTimeout(TimeoutError):
+    """No answer within the call's timeout (waiting for a slot included)."""
+
+
+class _Abandoned(Exception):
+    """The leader of a coalesced prompt gave up before starting it; followers try themselves."""
+
+
+def estimate_tokens(text: str) -> int:
+    # same rule of thumb as rag_context: ~4 characters per token
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+# -------------------------------------------------------------------
+# Backends
+# -------------------------------------------------------------------
+class FakeLLM:
+    """Deterministic stand-in: JSON prompts get schema-shaped JSON, others a short echo."""
+
+    def __init__(self, latency_ms: float = FAKE_LATENCY_MS):
+        self.latency_ms = latency_ms
+
+    def invoke(self, prompt: str) -> str:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        if "summary_paragraph" in prompt:
+            return json.dumps({"summary_paragraph": f"Fake summary {digest}.",
+                               "key_points": [f"Fake point {i} ({digest})" for i in range(1, 4)]})
+        if "questions" in prompt and "JSON" in prompt:
+            return json.dumps({"title": f"Fake quiz {digest}", "questions": [
+                {"question": f"Fake question {i}?", "options": ["A", "B", "C", "D"], "answer": "A"}
+                for i in range(1, 4)
+            ]})
+        return f"Fake answer {digest}."
+
+
+def _load_backend(name: str):
+    if name == "fake":
+        return model_registry.registry.acquire("llm", f"fake:{MODEL}", FakeLLM)
+    return model_registry.get_llm(MODEL)
+
+
+# -------------------------------------------------------------------
+# Gateway
+# -------------------------------------------------------------------
+class _CallerStats:
+    __slots__ = ("calls", "cache_hits", "coalesced", "generated", "timeouts", "errors",
+                 "prompt_tokens", "completion_tokens", "seconds", "max_seconds")
+
+    def __init__(self):
+        for k in self.__slots__:
+            setattr(self, k, 0)
+
+    def as_dict(self):
+        d = {k: getattr(self, k) for k in self.__slots__}
+        d["seconds"] = round(self.seconds, 3)
+        d["max_seconds"] = round(self.max_seconds, 3)
+        d["mean_seconds"] = round(self.seconds / self.generated, 3) if self.generated else None
+        return d
+
+
+class LLMGateway:
+    def __init__(self, backend: str = BACKEND, concurrency: int = CONCURRENCY, timeout: float = TIMEOUT,
+                 cache_size: int = CACHE_SIZE):
+        self.backend_name = backend
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(concurrency)
+        # runs the blocking backend call so the caller can stop waiting at its timeout
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._stats: Dict[str, _CallerStats] = {}
+
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = _load_backend(self.backend_name)
+        return self._client
+
+    def key(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self.backend_name}:{MODEL}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _caller(self, caller: str) -> _CallerStats:
+        st = self._stats.get(caller)
+        if st is None:
+            st = self._stats[caller] = _CallerStats()
+        return st
+
+    def generate(self, prompt: str, caller: str = "default", timeout: Optional[float] = None,
+                 cache: bool = True) -> str:
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        key = self.key(prompt)
+
+        with self._lock:
+            st = self._caller(caller)
+            st.calls += 1
+            st.prompt_tokens += estimate_tokens(prompt)
+
+        while True:
+            with self._lock:
+                if cache and key in self._cache:
+                    self._cache.move_to_end(key)
+                    text = self._cache[key]
+                    st = self._caller(caller)
+                    st.cache_hits += 1
+                    st.completion_tokens += estimate_tokens(text)
+                    LLM_CALLS.inc(caller, "cache_hit")
+                    return text
+                fut = self._inflight.get(key)
+                leader = fut is None
+                if leader:
+                    fut = self._inflight[key] = Future()
+                else:
+                    self._caller(caller).coalesced += 1
+
+            if leader:
+                try:
+                    self._start(prompt, caller, key, fut, deadline, timeout, cache)
+                except BaseException as e:
+                    # never reached the backend: waiting followers retry on their own deadline
+                    with self._lock:
+                        self._inflight.pop(key, None)
+                    fut.set_exception(_Abandoned())
+                    raise
+
+            # everyone, leader included, waits for the one backend call with their own deadline;
+            # a waiter giving up does not cancel it for the others
+            try:
+                text = fut.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                self._count(caller, "timeouts", "timeout")
+                raise LLMTimeout(f"LLM call from {caller} timed out after {timeout:g}s") from None
+            except _Abandoned:
+                continue
+            except Exception:
+                self._count(caller, "errors", "error")
+                raise
+
+            if not leader:
+                LLM_CALLS.inc(caller, "coalesced")
+            with self._lock:
+                self._caller(caller).completion_tokens += estimate_tokens(text)
+            return text
+
+    def _start(self, prompt: str, caller: str, key: str, fut: Future, deadline: float, timeout: float,
+               cache: bool):
+        """Run the backend call for `fut` once a slot is free; LLMTimeout if none frees up by the deadline."""
+        client = self.client()
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            self._count(caller, "timeouts", "timeout")
+            raise LLMTimeout(f"LLM call from {caller} waited {timeout:g}s for a free slot")
+
+        def call():
+            t0 = time.perf_counter()
+            try:
+                text = str(client.invoke(prompt)).strip()
+            except BaseException as e:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                fut.set_exception(e)
+                return
+            finally:
+                self._slots.release()   # only when the backend is really done
+
+            secs = time.perf_counter() - t0
+            LLM_SECONDS.observe(secs, caller)
+            LLM_CALLS.inc(caller, "generated")
+            LLM_TOKENS.inc(caller, "prompt", amount=estimate_tokens(prompt))
+            LLM_TOKENS.inc(caller, "completion", amount=estimate_tokens(text))
+            with self._lock:
+                st = self._caller(caller)
+                st.generated += 1
+                st.seconds += secs
+                st.max_seconds = max(st.max_seconds, secs)
+                self._inflight.pop(key, None)
+                if cache and self.cache_size > 0:
+                    self._cache[key] = text
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            fut.set_result(text)
+
+        try:
+            self._executor.submit(call)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _count(self, caller: str, field: str, outcome: str):
+        with self._lock:
+            st = self._caller(caller)
+            setattr(st, field, getattr(st, field) + 1)
+        LLM_CALLS.inc(caller, outcome)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            callers = {name: st.as_dict() for name, st in sorted(self._stats.items())}
+            return {
+                "backend": self.backend_name,
+                "model": MODEL,
+                "concurrency": self.concurrency,
+                "timeout_seconds": self.timeout,
+                "cache_entries": len(self._cache),
+                "cache_size": self.cache_size,
+                "inflight": len(self._inflight),
+                "callers": callers,
+            }
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
+
+
+def generate(prompt: str, caller: str = "default", timeout: Optional[float] = None, cache: bool = True) -> str:
+    return get_gateway().generate(prompt, caller=caller, timeout=timeout, cache=cache)
@@ -0,0 +1,220 @@
+# backend/app/services/model_registry.py
+"""Process-wide registry of loaded models.
+
+Every encoder, topic model, LLM client and large array is loaded through here,
+keyed by (kind, name-or-path). Callers acquire() a shared instance and release()
+it when they are done; the instance is dropped once the last reference goes.
+Loading is lazy and thread-safe: concurrent callers asking for the same key wait
+on one load instead of loading their own copy.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_ENCODER = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_LLM = "llama3.1"
+
+
+def _rss_bytes() -> int:
+    """Resident set size of this process (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+def _estimate_bytes(obj) -> Optional[int]:
+    """Best-effort size of a loaded model; None when the type is unknown."""
+    nbytes = getattr(obj, "nbytes", None)  # numpy arrays
+    if isinstance(nbytes, int):
+        return nbytes
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):  # pandas DataFrame
+        try:
+            return int(obj.memory_usage(deep=True).sum())
+        except Exception:
+            return None
+    if hasattr(obj, "parameters"):  # torch modules (SentenceTransformer)
+        try:
+            total = sum(p.numel() * p.element_size() for p in obj.parameters())
+            total += sum(b.numel() * b.element_size() for b in obj.buffers())
+            return int(total)
+        except Exception:
+            return None
+    return None
+
+
+class _Entry:
+    def __init__(self, kind: str, key: str):
+        self.kind = kind
+        self.key = key
+        self.obj: Any = None
+        self.loaded = False
+        self.refs = 0
+        self.lock = threading.Lock()
+        self.bytes: Optional[int] = None
+        self.rss_delta: Optional[int] = None
+        self.load_seconds: Optional[float] = None
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "key": self.key,
+            "refs": self.refs,
+            "loaded": self.loaded,
+            "bytes": self.bytes,
+            # RSS growth while loading; includes anything other threads allocated meanwhile
+            "rss_delta_bytes": self.rss_delta,
+            "load_seconds": self.load_seconds,
+        }
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+
+    def acquire(self, kind: str, key: str, loader: Callable[[], Any]):
+        """Return the shared instance for (kind, key), loading it on first use."""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None:
+                entry = self._entries[(kind, key)] = _Entry(kind, key)
+            entry.refs += 1
+
+        if not entry.loaded:
+            with entry.lock:
+                if not entry.loaded:
+                    try:
+                        rss0 = _rss_bytes()
+                        t0 = time.perf_counter()
+                        print(f"Loading {kind} model: {key}")
+                        entry.obj = loader()
+                        entry.load_seconds = round(time.perf_counter() - t0, 3)
+                        entry.rss_delta = max(0, _rss_bytes() - rss0) or None
+                        entry.bytes = _estimate_bytes(entry.obj)
+                        entry.loaded = True
+                    except Exception:
+                        self.release(kind, key)
+                        raise
+        return entry.obj
+
+    def release(self, kind: str, key: str):
+        """Drop one reference; the instance is unloaded when none remain."""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs <= 0:
+                del self._entries[(kind, key)]
+                if entry.loaded:
+                    print(f"Unloaded {kind} model: {key}")
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            entries = list(self._entries.values())
+        return [e.as_dict() for e in entries]
+
+
+registry = ModelRegistry()
+
+
+# -------------------------------------------------------------------
+# Typed helpers
+# -------------------------------------------------------------------
+def encoder_key(name: str) -> str:
+    """'all-MiniLM-L6-v2' and 'sentence-transformers/all-MiniLM-L6-v2' are one model."""
+    return name if "/" in name else f"sentence-transformers/{name}"
+
+
+def get_encoder(name: str = DEFAULT_ENCODER):
+    key = encoder_key(name)
+
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(key)
+
+    return registry.acquire("encoder", key, load)
+
+
+def release_encoder(name: str = DEFAULT_ENCODER):
+    registry.release("encoder", encoder_key(name))
+
+
+def get_topic_model(path: str):
+    key = os.path.abspath(path)
+
+    def load():
+        from bertopic import BERTopic
+        return BERTopic.load(key)
+
+    return registry.acquire("topic_model", key, load)
+
+
+def release_topic_model(path: str):
+    registry.release("topic_model", os.path.abspath(path))
+
+
+def get_llm(model: str = DEFAULT_LLM):
+    def load():
+        from langchain_community.llms import Ollama
+        # greedy decoding: the gateway caches answers by prompt, which only holds for a deterministic model
+        return Ollama(model=model, temperature=0)
+
+    return registry.acquire("llm", model, load)
+
+
+def release_llm(model: str = DEFAULT_LLM):
+    registry.release("llm", model)
+
+
+def get_normalized_embeddings(path: str):
+    """Row-normalized float32 copy of an embeddings.npy, shared by every consumer."""
+    import numpy as np
+    key = os.path.abspath(path)
+
+    def load():
+        emb = np.load(key).astype(np.float32, copy=False)
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        emb = emb / norms
+        emb.setflags(write=False)  # shared: nobody may mutate in place
+        return emb
+
+    return registry.acquire("embeddings", key, load)
+
+
+def release_normalized_embeddings(path: str):
+    registry.release("embeddings", os.path.abspath(path))
+
+
+class EncoderEmbeddings:
+    """LangChain Embeddings adapter over the shared sentence encoder."""
+
+    def __init__(self, name: str = DEFAULT_ENCODER):
+        self.name = name
+        self.client = get_encoder(name)
+
+    def embed_documents(self, texts):
+        return self.client.encode(list(texts), convert_to_numpy=True).tolist()
+
+    def embed_query(self, text):
+        return self.client.encode([text], convert_to_numpy=True)[0].tolist()
+
+    def __call__(self, text):
+        return self.embed_query(text)
+
+
+def make_langchain_embeddings(name: str = DEFAULT_ENCODER):
+    """EncoderEmbeddings registered as a LangChain Embeddings subclass when available."""
+    try:
+        from langchain_core.embeddings import Embeddings
+    except ImportError:
+        return EncoderEmbeddings(name)
+
+    class SharedEncoderEmbeddings(EncoderEmbeddings, Embeddings):
+        pass
+
+    return SharedEncoderEmbeddings(name)
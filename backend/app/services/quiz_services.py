@@ -1,6 +1,4 @@
-from langchain_community.llms import Ollama
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 from typing import List
@@ -8,6 +6,7 @@ from typing import List
 from backend.app.db.session import SessionLocal
 from backend.app.db.models.quiz import Quiz, QuizQuestion
 from backend.app.db.models.article import Article
+from backend.app.services import llm_gateway
 
 
 # --------------------------
@@ -26,8 +25,8 @@ class QuizSchema(BaseModel):
 
 quiz_parser = PydanticOutputParser(pydantic_object=QuizSchema)
 
-# Llama model
-llm = Ollama(model="llama3.1")
+# Llama model, called through the shared LLM gateway
+QUIZ_TIMEOUT = 120.0
 
 
 # --------------------------
@@ -53,17 +52,18 @@ def generate_quiz_from_article(article_id: int):
             "Summary:\n{summary}\n"
         )
 
-        chain = LLMChain(
-            llm=llm,
-            prompt=PromptTemplate(
-                input_variables=["summary", "format_instructions"],
-                template=prompt,
-            )
+        template = PromptTemplate(
+            input_variables=["summary", "format_instructions"],
+            template=prompt,
         )
 
-        raw = chain.run(
-            summary=base_text,
-            format_instructions=quiz_parser.get_format_instructions()
+        raw = llm_gateway.generate(
+            template.format(
+                summary=base_text,
+                format_instructions=quiz_parser.get_format_instructions()
+            ),
+            caller="quiz",
+            timeout=QUIZ_TIMEOUT,
         )
 
         quiz_data: QuizSchema = quiz_parser.parse(raw)
@@ -108,7 +108,9 @@ def get_quiz(quiz_id: int):
                     "id": q.id,
                     "question": q.question,
                     "options": q.options,
-                    "answer": q.answer
+                    "answer": q.answer,
+                    # index into options, what the quiz page scores against
+                    "correct": q.options.index(q.answer) if q.answer in (q.options or []) else None
                 }
                 for q in quiz.questions
             ]
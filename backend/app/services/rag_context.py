@@ -0,0 +1,187 @@
+# backend/app/services/rag_context.py
+"""Token-budgeted context assembly for RAG prompts.
+
+The retriever used to hand the top 3 chunks straight to the prompt. Neighbouring
+chunks of one article overlap by design (chunk_overlap) and often all three came
+from the same story, so the prompt paid for the same sentences several times.
+
+build_context() instead:
+  1. over-retrieves `candidates` chunks from FAISS in one search,
+  2. reuses the vectors already stored in the index (no re-embedding),
+  3. picks greedily by maximal marginal relevance — relevance to the query minus
+     similarity to what is already picked — skipping near-duplicates and capping
+     chunks per article,
+  4. stops adding once the token budget is full.
+
+The budget covers everything build_context() puts in the prompt: the most
+recent chat turns that fit in HISTORY_TOKENS are rendered first and paid for
+out of it, the chunks get the rest. The default is the size of the old top-3
+context (3 chunks of up to 800 characters, about 600 tokens), so the packed
+prompt is never larger than the one it replaced.
+
+Token counts are estimated (about 4 characters per token for English with the
+Llama tokenizer), which is close enough to size the prompt.
+"""
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+CONTEXT_TOKENS = int(os.getenv("NEWSPREP_RAG_CONTEXT_TOKENS", "600"))
+HISTORY_TOKENS = int(os.getenv("NEWSPREP_RAG_HISTORY_TOKENS", "150"))   # share of the budget, at most
+CANDIDATES = int(os.getenv("NEWSPREP_RAG_CANDIDATES", "20"))
+MAX_PER_ARTICLE = int(os.getenv("NEWSPREP_RAG_MAX_PER_ARTICLE", "2"))
+MMR_LAMBDA = 0.7          # 1.0 = pure relevance, 0.0 = pure diversity
+DUPLICATE_SIM = 0.92      # chunks this similar to a picked one add nothing new
+BASELINE_K = 3            # what the old retriever put in the prompt, for the report
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / 4))
+
+
+@dataclass
+class Context:
+    docs: list
+    text: str
+    stats: Dict[str, object] = field(default_factory=dict)
+    history: str = ""
+
+
+def format_history(turns: Sequence[dict], budget: int):
+    """Render the most recent turns that fit in `budget` tokens, oldest first; returns (text, tokens, turns)."""
+    lines: List[str] = []
+    used = 0
+    for turn in reversed(turns):
+        line = f"User: {turn.get('user', '')}\nAssistant: {turn.get('assistant', '')}"
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    lines.reverse()
+    return "\n\n".join(lines), used, len(lines)
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def _search(store, query_vec: np.ndarray, k: int):
+    """(docs, their stored vectors) for the k nearest chunks, straight from the index."""
+    k = min(k, store.index.ntotal)
+    if k <= 0:
+        return [], np.zeros((0, len(query_vec)), np.float32)
+    _, idx = store.index.search(query_vec[None, :].astype(np.float32), k)
+    positions = [int(i) for i in idx[0] if i >= 0]
+
+    docs = [store.docstore.search(store.index_to_docstore_id[i]) for i in positions]
+    try:
+        vecs = np.stack([store.index.reconstruct(i) for i in positions]) if positions else None
+    except Exception:
+        vecs = None  # index type without reconstruct(): embed the candidates instead
+    if vecs is None and docs:
+        from backend.app.services.rag_service import get_embeddings
+        vecs = np.asarray(get_embeddings().embed_documents([d.page_content for d in docs]), dtype=np.float32)
+    return docs, vecs
+
+
+def select(query_vec: np.ndarray, vecs: np.ndarray, docs: list, budget: int,
+           max_per_article: int = MAX_PER_ARTICLE, mmr_lambda: float = MMR_LAMBDA,
+           duplicate_sim: float = DUPLICATE_SIM):
+    """Greedy MMR under a token budget; returns (picked indices in rank order, drop counts)."""
+    dropped = {"duplicate": 0, "per_article": 0, "budget": 0}
+    if not docs:
+        return [], dropped
+
+    q = _normalize(query_vec)
+    v = _normalize(vecs)
+    relevance = v @ q
+    pairwise = v @ v.T
+    tokens = [estimate_tokens(d.page_content) for d in docs]
+
+    picked: List[int] = []
+    per_article: Dict[object, int] = {}
+    remaining = set(range(len(docs)))
+    used = 0
+
+    while remaining:
+        cand = sorted(remaining)
+        if picked:
+            redundancy = pairwise[np.ix_(cand, picked)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(cand), np.float32)
+        scores = mmr_lambda * relevance[cand] - (1 - mmr_lambda) * redundancy
+        best_pos = int(np.argmax(scores))
+        i = cand[best_pos]
+        remaining.discard(i)
+
+        aid = docs[i].metadata.get("article_id")
+        if picked and redundancy[best_pos] >= duplicate_sim:
+            dropped["duplicate"] += 1
+            continue
+        if aid is not None and per_article.get(aid, 0) >= max_per_article:
+            dropped["per_article"] += 1
+            continue
+        if used + tokens[i] > budget and picked:
+            dropped["budget"] += 1
+            continue  # a shorter chunk further down may still fit
+
+        picked.append(i)
+        used += tokens[i]
+        per_article[aid] = per_article.get(aid, 0) + 1
+
+    return picked, dropped
+
+
+def build_context(store, query: str, budget: Optional[int] = None, candidates: Optional[int] = None,
+                  query_vec: Optional[np.ndarray] = None, history: Sequence[dict] = ()) -> Context:
+    budget = budget or CONTEXT_TOKENS
+    candidates = candidates or CANDIDATES
+    history_text, history_tokens, history_turns = format_history(history, min(HISTORY_TOKENS, budget // 3))
+
+    if query_vec is None:
+        from backend.app.services.rag_service import get_embeddings
+        query_vec = np.asarray(get_embeddings().embed_query(query), dtype=np.float32)
+
+    docs, vecs = _search(store, query_vec, candidates)
+    picked, dropped = select(query_vec, vecs, docs, budget - history_tokens)
+
+    # keep chunks of one article together, articles in order of their best chunk
+    rank_of = {i: rank for rank, i in enumerate(picked)}
+    order: Dict[object, int] = {}
+    for i in picked:
+        order.setdefault(docs[i].metadata.get("article_id"), rank_of[i])
+    picked.sort(key=lambda i: (order[docs[i].metadata.get("article_id")], rank_of[i]))
+
+    chosen = [docs[i] for i in picked]
+    text = "\n\n".join(f"Source {n + 1}: {d.page_content}" for n, d in enumerate(chosen))
+
+    context_tokens = sum(estimate_tokens(d.page_content) for d in chosen)
+    candidate_tokens = sum(estimate_tokens(d.page_content) for d in docs)
+    baseline_tokens = sum(estimate_tokens(d.page_content) for d in docs[:BASELINE_K])
+    return Context(
+        docs=chosen,
+        text=text,
+        history=history_text,
+        stats={
+            "budget_tokens": budget,
+            "history_tokens": history_tokens,
+            "history_turns": history_turns,
+            "candidates": len(docs),
+            "selected": len(chosen),
+            "articles": len(order),
+            "dropped": dropped,
+            "context_tokens": context_tokens,
+            "candidate_tokens": candidate_tokens,
+            # what the old top-3 retriever would have sent, for comparison
+            "baseline_tokens": baseline_tokens,
+            # vs. that baseline; negative when the budget allowed more than it
+            "tokens_saved": baseline_tokens - context_tokens,
+        },
+    )
@@ -1,106 +1,248 @@
 import os
-from typing import List, Dict
+import threading
+from typing import Dict, List, Set, Tuple
 
-from langchain_community.vectorstores import FAISS
+import numpy as np
 
-# ---- text splitter (new + old LC support) ----
-try:
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
-except ImportError:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
+from backend.app.db.session import SessionLocal
+from backend.app.db.models.article import Article
+from backend.app.metrics import stage
+from backend.app.services import artifacts, llm_gateway, model_registry
+from backend.app.services.rag_context import build_context
+from backend.app.services.answer_cache import article_revisions, get_answer_cache, history_key, source_key
 
-# ---- Document class (new + old LC support) ----
-try:
-    from langchain_core.documents import Document
-except ImportError:
-    from langchain.docstore.document import Document
+# LangChain, the HuggingFace encoder and the Ollama client are imported and built on
+# first use (or by the warmup task), not at import time.
 
-from langchain_community.llms import Ollama
-from langchain_community.embeddings import HuggingFaceEmbeddings
 
-from backend.app.db.session import SessionLocal
-from backend.app.db.models.article import Article
+def _text_splitter_cls():
+    # ---- text splitter (new + old LC support) ----
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+    return RecursiveCharacterTextSplitter
+
+
+def _document_cls():
+    # ---- Document class (new + old LC support) ----
+    try:
+        from langchain_core.documents import Document
+    except ImportError:
+        from langchain.docstore.document import Document
+    return Document
 
 
 # -------------------------
 # GLOBAL MODELS & MEMORY
 # -------------------------
 
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
-)
-
-llm = Ollama(model="llama3.1")
+embeddings = None
 
 faiss_index = None
 chat_history = []
+MAX_HISTORY_TURNS = 20  # kept for the response; the prompt only gets what fits its budget
+
+_build_lock = threading.Lock()
+
+
+def get_embeddings():
+    global embeddings
+    if embeddings is None:
+        # same MiniLM instance TopicService uses (model registry)
+        embeddings = model_registry.make_langchain_embeddings(
+            "sentence-transformers/all-MiniLM-L6-v2"
+        )
+    return embeddings
+
+
+RAG_LLM_TIMEOUT = float(os.getenv("NEWSPREP_RAG_LLM_TIMEOUT", "60"))
 
 
 # -------------------------
 # BUILD VECTORSTORE
 # -------------------------
 
+_splitter = None
+
+
+def _split(text: str) -> List[str]:
+    global _splitter
+    if _splitter is None:
+        _splitter = _text_splitter_cls()(chunk_size=800, chunk_overlap=100)
+    return _splitter.split_text(text)
+
+
+def _metadata(art) -> dict:
+    return {
+        "article_id": art.id,
+        "title": art.title,
+        "published": art.published_date.isoformat()
+        if art.published_date else None
+    }
+
+
+def _article_docs(articles) -> List["Document"]:
+    Document = _document_cls()
+    docs: List["Document"] = []
+
+    for art in articles:
+        text = art.summary or art.text or ""
+        if not text.strip():
+            continue
+
+        for ch in _split(text):
+            docs.append(Document(page_content=ch, metadata=_metadata(art)))
+    return docs
+
+
+# store -> article ids it holds chunks of / chunk delta rows already read, by delta version
+_indexed: Dict[int, Set[int]] = {}
+_delta_rows: Dict[Tuple[int, str], int] = {}
+_append_lock = threading.Lock()
+
+
 def build_vectorstore():
     global faiss_index
+    from langchain_community.vectorstores import FAISS
 
     db = SessionLocal()
     articles = db.query(Article).all()
     db.close()
 
-    docs: List[Document] = []
-    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+    docs = _article_docs(articles)
+    store = FAISS.from_documents(docs, get_embeddings())
+    # ingested articles already in the DB are in the store; _append_ingested skips their delta rows
+    _indexed[id(store)] = {art.id for art in articles}
+    faiss_index = store
+
+    print(f"✅ FAISS vector store created with {len(docs)} chunks")
+
+
+# -------------------------
+# INGESTED ARTICLES
+# -------------------------
+
+def _ingested_chunks(art) -> List[str]:
+    # ingested rows have no summary yet and their text never changes, so the
+    # chunks can be re-split from it to match the vectors stored by the job
+    text = art.text or ""
+    return _split(text) if text.strip() else []
+
 
+def index_chunks(articles, delta) -> int:
+    """Embed the chunks of newly ingested articles into the RAG chunk delta (ingest job).
+
+    Returns chunks written; articles whose chunks are already there are skipped.
+    """
+    have = set(delta.ids.tolist())
+    ids, numbers, texts = [], [], []
     for art in articles:
-        text = art.summary or art.text or ""
-        if not text.strip():
+        if art.id in have:
             continue
+        for n, ch in enumerate(_ingested_chunks(art)):
+            ids.append(art.id)
+            numbers.append(n)
+            texts.append(ch)
+    if not texts:
+        return 0
+    vecs = np.asarray(get_embeddings().embed_documents(texts), dtype=np.float32)
+    return delta.append(ids, numbers, vecs)
+
+
+def _append_ingested(store):
+    """Add chunks of articles ingested since the store was built or loaded.
+
+    Their vectors come from the chunk delta (services/vector_delta.py), embedded
+    by the ingest job, so nothing is encoded here.
+    """
+    delta = artifacts.current().chunk_delta
+    delta.sync()
+    key = (id(store), delta.version)
+    if delta.rows <= _delta_rows.get(key, 0):
+        return
+    with _append_lock:
+        done = _delta_rows.get(key, 0)
+        ids, numbers, vecs = delta.since(done)
+        if not len(ids):
+            return
+        indexed = _indexed.setdefault(id(store), set())
+        new = sorted(set(ids.tolist()) - indexed)
+        db = SessionLocal()
+        try:
+            articles = {a.id: a for a in db.query(Article).filter(Article.id.in_(new)).all()} if new else {}
+        finally:
+            db.close()
+        chunks = {aid: _ingested_chunks(art) for aid, art in articles.items()}
+
+        pairs, metadatas = [], []
+        for aid, n, vec in zip(ids.tolist(), numbers.tolist(), vecs):
+            texts = chunks.get(aid)
+            if not texts or n >= len(texts):
+                continue  # deleted since, or already in the store
+            pairs.append((texts[n], vec.tolist()))
+            metadatas.append(_metadata(articles[aid]))
+        if pairs:
+            store.add_embeddings(pairs, metadatas=metadatas)
+        indexed.update(articles)
+        _delta_rows[key] = done + len(ids)
+        print(f"RAG store: added {len(pairs)} chunks from {len(articles)} ingested article(s)")
+
+
+def ensure_vectorstore():
+    """FAISS store to query: the live artifact version's prebuilt one, else one built
+    from the DB once (even if warmup and a request race for it)."""
+    prebuilt = artifacts.current().faiss_index()
+    if prebuilt is not None:
+        _append_ingested(prebuilt)
+        return prebuilt
+    if faiss_index is None:
+        with _build_lock:
+            if faiss_index is None:
+                build_vectorstore()
+    _append_ingested(faiss_index)
+    return faiss_index
 
-        chunks = splitter.split_text(text)
-        for ch in chunks:
-            docs.append(
-                Document(
-                    page_content=ch,
-                    metadata={
-                        "article_id": art.id,
-                        "title": art.title,
-                        "published": art.published_date.isoformat()
-                        if art.published_date else None
-                    }
-                )
-            )
-
-    faiss_index = FAISS.from_documents(docs, embeddings)
 
-    print(f"✅ FAISS vector store created with {len(docs)} chunks")
+def warmup():
+    llm_gateway.get_gateway().client()
+    ensure_vectorstore()
 
 
 # -------------------------
 # RAG QUESTION ANSWERING
 # -------------------------
 
+def _remember(query: str, answer: str):
+    chat_history.append({"user": query, "assistant": answer})
+    del chat_history[:-MAX_HISTORY_TURNS]
+
+
 def ask_question(query: str):
     global faiss_index, chat_history
 
-    if faiss_index is None:
-        build_vectorstore()
-
-    retriever = faiss_index.as_retriever(search_kwargs={"k": 3})
+    store = ensure_vectorstore()
 
     # ------------------------------
-    # Version-safe document retrieval
+    # Retrieve + pack context (over-retrieve, MMR, dedupe, token budget)
     # ------------------------------
-    try:
-        docs = retriever.invoke(query)           # new LC (>=0.2)
-    except Exception:
-        docs = retriever._get_relevant_documents(query)  # old LC fallback
+    with stage("rag.retrieve"):
+        query_vec = np.asarray(get_embeddings().embed_query(query), dtype=np.float32)
+        ctx = build_context(store, query, query_vec=query_vec, history=chat_history)
+    docs = ctx.docs
+    context = ctx.text
 
     # ------------------------------
-    # Build context
+    # Semantic answer cache: similar question + same sources (at the same revisions) and history -> earlier answer
     # ------------------------------
-    context = "\n\n".join(
-        f"Source {i+1}: {d.page_content}"
-        for i, d in enumerate(docs)
-    )
+    answer_cache = get_answer_cache()
+    sources_used = source_key(d.metadata.get("article_id") for d in docs)
+    history_used = history_key(ctx.history)
+    revisions = article_revisions(sources_used)  # read before answering: an edit meanwhile misses later
+    cached = answer_cache.lookup(query_vec, sources_used, history_used, revisions)
+    if cached is not None:
+        _remember(query, cached["answer"])
+        return {**cached, "history": chat_history}
 
     # ------------------------------
     # RAG Prompt
@@ -112,7 +254,7 @@ CONTEXT:
 {context}
 
 CHAT HISTORY:
-{chat_history}
+{ctx.history}
 
 QUESTION:
 {query}
@@ -120,16 +262,21 @@ QUESTION:
 Give a factual answer. If the answer is not in the context, say: "Information not found in the news corpus."
 """
 
-    llm_response = llm.invoke(prompt).strip()
+    with stage("rag.llm"):
+        llm_response = llm_gateway.generate(prompt, caller="rag", timeout=RAG_LLM_TIMEOUT)
 
-    # update chat history
-    chat_history.append({"user": query, "assistant": llm_response})
+    _remember(query, llm_response)
 
     # ------------------------------
     # Build source list
     # ------------------------------
     sources = []
+    seen = set()
     for d in docs:
+        # up to MAX_PER_ARTICLE chunks per article in the prompt, one source entry each
+        if d.metadata.get("article_id") in seen:
+            continue
+        seen.add(d.metadata.get("article_id"))
         sources.append({
             "article_id": d.metadata.get("article_id"),
             "title": d.metadata.get("title"),
@@ -137,8 +284,11 @@ Give a factual answer. If the answer is not in the context, say: "Information no
             "published": d.metadata.get("published")
         })
 
-    return {
+    result = {
         "answer": llm_response,
         "sources": sources,
-        "history": chat_history
+        "context": ctx.stats,
     }
+    answer_cache.store(query, query_vec, sources_used, history_used, revisions, result)
+
+    return {**result, "history": chat_history, "cache": {"hit": False}}
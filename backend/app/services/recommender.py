@@ -1,9 +1,15 @@
 import os
+import threading
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import Iterable, List, Tuple, Optional
 
 from backend.app.db.session import SessionLocal
 from backend.app.db.models.article import Article
+from backend.app.db.events import membership_since
+from backend.app.db import versions
+from backend.app.metrics import timed
+from backend.app.services.model_registry import get_normalized_embeddings, release_normalized_embeddings
+from backend.app.services.topic_centroids import TopicCentroids
 
 
 class RecommenderService:
@@ -14,7 +20,7 @@ class RecommenderService:
       - article_ids.npy : (N,) ints matching DB article.id
     """
 
-    def __init__(self, embeddings_path: Optional[str] = None, ids_path: Optional[str] = None):
+    def __init__(self, embeddings_path: Optional[str] = None, ids_path: Optional[str] = None, delta=None):
         # sensible defaults relative to repo
         base = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "ml", "data", "topic_corpus"))
         self.embeddings_path = embeddings_path or os.path.join(base, "embeddings.npy")
@@ -25,29 +31,90 @@ class RecommenderService:
         self.ids = None
         self.id_to_idx = {}
 
+        # rows ingested after the artifact was built (services/vector_delta.py)
+        self.delta = delta
+        self._base_rows = 0
+        self._delta_rows = 0
+        self._grown = None  # (embeddings, ids) buffers with room for more delta rows
+
+        # topic id -> normalized centroid, built on first topic query
+        self._centroids: Optional[TopicCentroids] = None
+        self._centroid_membership = None  # shared "membership" version the centroids reflect
+        self._row_topics = None  # topic counted for each embedding row (-1: none / deleted)
+        self._centroid_lock = threading.Lock()
+        self._related = None  # (centroids.version, topic_ids, T x T similarities)
+
     def load(self):
         if self._loaded:
+            self._sync_delta()
             return
         if not os.path.exists(self.embeddings_path) or not os.path.exists(self.ids_path):
             raise FileNotFoundError("Embeddings or ids file not found. Run precompute_embeddings.py first.")
 
-        self.embeddings = np.load(self.embeddings_path)
+        # normalized for cosine similarity; shared with TopicService via the registry
+        self.embeddings = get_normalized_embeddings(self.embeddings_path)
         self.ids = np.load(self.ids_path)
 
-        # normalize embeddings for cosine similarity
-        norms = np.linalg.norm(self.embeddings, axis=1, keepdims=True)
-        norms[norms == 0] = 1.0
-        self.embeddings = self.embeddings / norms
-
         for idx, aid in enumerate(self.ids):
             self.id_to_idx[int(aid)] = idx
+        self._base_rows = len(self.ids)
+        self._delta_rows = 0
+        self._grown = None
 
         self._loaded = True
+        self._sync_delta()
+
+    def close(self):
+        """Release the shared embeddings matrix."""
+        if self._loaded:
+            release_normalized_embeddings(self.embeddings_path)
+            self.embeddings = None
+            self._grown = None
+            self._loaded = False
+            self._centroids = None
+            self._row_topics = None
+            self._related = None
 
     def _ensure(self):
-        if not self._loaded:
-            self.load()
+        self.load()
+
+    def _sync_delta(self):
+        """Append rows other processes ingested since the last look (cheap when there are none)."""
+        if self.delta is None:
+            return
+        self.delta.sync()
+        if self.delta.rows <= self._delta_rows:
+            return
+        with self._centroid_lock:
+            new_ids, new_topics, new_vecs = self.delta.since(self._delta_rows)
+            if not len(new_ids):
+                return
+            self._delta_rows += len(new_ids)
+            fresh = np.array([int(a) not in self.id_to_idx for a in new_ids], dtype=bool)
+            new_ids, new_topics, new_vecs = new_ids[fresh], new_topics[fresh], new_vecs[fresh]
+            if not len(new_ids):
+                return
+            n, m = len(self.ids), len(new_ids)
+            if self._grown is None or n + m > len(self._grown[1]):
+                # the shared base matrix is read-only: copy once into a buffer with headroom
+                cap = max(n + m, int(n * 1.25), n + 4096)
+                emb = np.empty((cap, self.embeddings.shape[1]), dtype=np.float32)
+                ids = np.empty(cap, dtype=self.ids.dtype)
+                emb[:n], ids[:n] = self.embeddings, self.ids
+                self._grown = (emb, ids)
+            emb, ids = self._grown
+            emb[n:n + m], ids[n:n + m] = new_vecs, new_ids
+            # ids, then rows, then the lookup: readers never index past what they can see
+            self.ids = ids[:n + m]
+            self.embeddings = emb[:n + m]
+            for i, aid in enumerate(new_ids.tolist()):
+                self.id_to_idx[aid] = n + i
+            if self._centroids is not None:
+                topics = np.array([-1 if t is None else int(t) for t in new_topics.tolist()], dtype=np.int64)
+                self._centroids.add(topics.tolist(), new_vecs)
+                self._row_topics = np.concatenate([self._row_topics, topics])
 
+    @timed("recommender.similar_by_article")
     def similar_by_article(self, article_id: int, top_n: int = 10, exclude_self: bool = True) -> List[Tuple[int, float]]:
         """Return list of (article_id, score) sorted desc."""
         self._ensure()
@@ -67,34 +134,119 @@ class RecommenderService:
         pairs.sort(key=lambda x: x[1], reverse=True)
         return [(int(a), float(s)) for a, s in pairs[:top_n]]
 
-    def similar_by_embedding(self, embedding: np.ndarray, top_n: int = 10) -> List[Tuple[int, float]]:
+    @timed("recommender.similar_by_embedding")
+    def similar_by_embedding(self, embedding: np.ndarray, top_n: int = 10,
+                             exclude: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """Nearest articles to a vector; article ids in `exclude` never appear."""
         self._ensure()
         # normalize embedding
-        e = embedding.astype(float)
+        e = np.asarray(embedding, dtype=np.float32)
         denom = np.linalg.norm(e)
         if denom == 0:
             return []
         e = e / denom
-        sims = np.dot(self.embeddings, e)
-        pairs = list(zip(self.ids.tolist(), sims.tolist()))
-        pairs.sort(key=lambda x: x[1], reverse=True)
-        return [(int(a), float(s)) for a, s in pairs[:top_n]]
+        sims = self.embeddings @ e
+        if exclude:
+            rows = [self.id_to_idx[int(a)] for a in exclude if int(a) in self.id_to_idx]
+            sims[rows] = -np.inf
+        # top-k without sorting the whole corpus
+        k = min(top_n, len(sims))
+        if k <= 0:
+            return []
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return [(int(self.ids[i]), float(sims[i])) for i in top if np.isfinite(sims[i])]
 
-    def similar_by_topic(self, topic_id: int, top_n: int = 10) -> List[Tuple[int, float]]:
-        """Compute centroid of embeddings for articles with given topic_id and find nearest neighbors."""
+    def embedding_of(self, article_id: int) -> Optional[np.ndarray]:
+        """Normalized embedding row of an article (None when it has none)."""
         self._ensure()
+        idx = self.id_to_idx.get(int(article_id))
+        return None if idx is None else self.embeddings[idx]
+
+    # -----------------------------------------------------------------
+    # Topic centroids
+    # -----------------------------------------------------------------
+    def topic_centroids(self) -> TopicCentroids:
+        """Centroid matrix over the embedded articles, keyed by their current DB topic.
+
+        Follows inserts, deletes and re-topics made by any process by applying the
+        membership_changes rows past the version it reflects (one counter read when
+        there are none); rebuilt from the articles table only when the log no
+        longer reaches back that far.
+        """
+        self._ensure()
+        current = versions.read_version(versions.MEMBERSHIP) or 0
+        if self._centroids is not None and self._centroid_membership == current:
+            return self._centroids
+        with self._centroid_lock:
+            if self._centroids is None:
+                self._centroids = self._build_centroids()
+            elif self._centroid_membership != current:
+                delta = membership_since(self._centroid_membership)
+                if delta is None:
+                    self._centroids.replace(self._build_centroids())  # the topic assigner holds this object
+                else:
+                    self._apply_membership(*delta)
+        return self._centroids
+
+    def _build_centroids(self) -> TopicCentroids:
+        # read before the scan: rows applied again afterwards are no-ops (_apply_membership)
+        seen = versions.read_version(versions.MEMBERSHIP) or 0
         db = SessionLocal()
         try:
-            q = db.query(Article).filter(Article.topic_id == int(topic_id)).all()
-            ids = [r.id for r in q if r.id in self.id_to_idx]
-            if not ids:
-                return []
-            vecs = [self.embeddings[self.id_to_idx[int(i)]] for i in ids]
-            centroid = np.mean(np.stack(vecs, axis=0), axis=0)
-            return self.similar_by_embedding(centroid, top_n=top_n)
+            topic_of = dict(db.query(Article.id, Article.topic_id).all())
         finally:
             db.close()
+        tids = (topic_of.get(int(a)) for a in self.ids)
+        self._row_topics = np.fromiter((-1 if t is None else t for t in tids), dtype=np.int64, count=len(self.ids))
+        self._centroid_membership = seen
+        return TopicCentroids.from_assignments(self.embeddings, self._row_topics.tolist())
+
+    def _apply_membership(self, version: int, rows):
+        """Move embedded rows to the topic each logged change left them in."""
+        target = {}
+        for aid, tid, deleted in rows:
+            idx = self.id_to_idx.get(aid)
+            if idx is not None and idx < len(self._row_topics):
+                # ingested rows not synced yet enter with their delta topic
+                target[idx] = -1 if deleted or tid is None else int(tid)
+        if target:
+            idxs = np.fromiter(target.keys(), dtype=np.int64, count=len(target))
+            new = np.fromiter(target.values(), dtype=np.int64, count=len(target))
+            old = self._row_topics[idxs]
+            moved = old != new
+            if moved.any():
+                idxs, old, new = idxs[moved], old[moved], new[moved]
+                self._centroids.move(self.embeddings[idxs], old.tolist(), new.tolist())
+                self._row_topics[idxs] = new
+        self._centroid_membership = version
+
+    def similar_by_topic(self, topic_id: int, top_n: int = 10) -> List[Tuple[int, float]]:
+        """Nearest articles to the topic's centroid."""
+        centroid = self.topic_centroids().centroid(topic_id)
+        if centroid is None:
+            return []
+        return self.similar_by_embedding(centroid, top_n=top_n)
+
+    def related_topics(self, topic_id: int, top_n: int = 5) -> List[Tuple[int, float]]:
+        """Topics whose centroids are closest to this one's, from a cached T x T table."""
+        centroids = self.topic_centroids()
+        related = self._related
+        if related is None or related[0] != centroids.version:
+            version = centroids.version
+            ids, sims = centroids.similarity_matrix()
+            related = self._related = (version, ids, sims)
+        _, ids, sims = related
 
+        hit = np.flatnonzero(ids == int(topic_id))
+        if not len(hit):
+            return []
+        row = sims[hit[0]].copy()
+        row[hit[0]] = -np.inf  # not related to itself
+        order = np.argsort(-row)[:top_n]
+        return [(int(ids[i]), float(row[i])) for i in order if np.isfinite(row[i])]
+
+    @timed("recommender.article_meta")
     def get_article_meta(self, article_ids: List[int]) -> List[dict]:
         db = SessionLocal()
         try:
@@ -115,11 +267,7 @@ class RecommenderService:
             db.close()
 
 
-# singleton
-_recommender = None
-
 def get_recommender() -> RecommenderService:
-    global _recommender
-    if _recommender is None:
-        _recommender = RecommenderService()
-    return _recommender
+    """Recommender of the artifact generation pinned for the current request."""
+    from backend.app.services import artifacts
+    return artifacts.current().recommender
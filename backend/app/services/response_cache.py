@@ -0,0 +1,362 @@
+# backend/app/services/response_cache.py
+"""Response cache for read-heavy endpoints.
+
+    @router.get("/article/{article_id}")
+    @cached(ttl=60, deps=("articles", "artifacts"))
+    def recommend_by_article(article_id: int, n: int = 8): ...
+
+The key is the route path plus its normalized parameters plus the current version
+of every namespace the route depends on. Bumping a namespace (articles committed,
+stats recorded, artifacts swapped) therefore invalidates all dependent entries at
+once without scanning the cache; stale entries just age out of the LRU.
+
+Tiers:
+  memory — per-process LRU with TTL (NEWSPREP_CACHE_SIZE entries)
+  disk   — optional, NEWSPREP_CACHE_DIR; shared by all workers on the host. Namespace
+           versions then live in the same directory (file mtimes), so a bump in one
+           worker invalidates the others too.
+
+The "articles" namespace also includes the shared articles counter (db.versions),
+so article writes made by any process invalidate every worker, with or without a
+cache directory.
+
+Concurrent misses for the same key are coalesced: one thread computes, the others
+wait for its result (single-flight). Only 200 responses are cached; the stored
+value is the rendered body, so hits skip the serializer as well.
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from backend.app.db import versions as db_versions
+from backend.app.db.events import on_articles_changed
+from backend.app.metrics import register_collector
+from backend.app.responses import FastJSONResponse
+from backend.app.services import artifacts
+
+CACHE_SIZE = int(os.getenv("NEWSPREP_CACHE_SIZE", "2048"))
+CACHE_DIR = os.getenv("NEWSPREP_CACHE_DIR") or None
+CACHE_ENABLED = os.getenv("NEWSPREP_CACHE", "on").lower() not in ("0", "off", "false")
+
+NAMESPACES = ("articles", "stats", "artifacts")
+
+# followers give up waiting on a stuck leader after this long and compute themselves
+_FLIGHT_WAIT = 30.0
+
+
+class _Entry:
+    __slots__ = ("expires", "status", "body", "headers", "media_type")
+
+    def __init__(self, expires, status, body, headers, media_type):
+        self.expires = expires
+        self.status = status
+        self.body = body
+        self.headers = headers
+        self.media_type = media_type
+
+    def response(self, state: str) -> Response:
+        return Response(
+            content=self.body,
+            status_code=self.status,
+            headers={**self.headers, "X-Cache": state},
+            media_type=self.media_type,
+        )
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: Optional[_Entry] = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = CACHE_SIZE, disk_dir: Optional[str] = CACHE_DIR):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._lru: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._versions = {ns: 0 for ns in NAMESPACES}
+        self._disk_writes = 0
+        self.counters = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "stores": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # -----------------------------------------------------------------
+    # Versions
+    # -----------------------------------------------------------------
+    def _version_file(self, ns: str) -> str:
+        return os.path.join(self.disk_dir, f"_version_{ns}")
+
+    def version(self, ns: str):
+        local = self._local_version(ns)
+        if ns == "articles":
+            return local, db_versions.read_version(db_versions.ARTICLES) or 0
+        return local
+
+    def _local_version(self, ns: str):
+        if not self.disk_dir:
+            return self._versions[ns]
+        # shared tier: every worker must derive the same key, so only the file counts
+        try:
+            return os.stat(self._version_file(ns)).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def bump(self, *namespaces: str):
+        """Invalidate every entry that depends on any of `namespaces`."""
+        for ns in namespaces:
+            with self._lock:
+                self._versions[ns] += 1
+            if self.disk_dir:
+                path = self._version_file(ns)
+                with open(path, "a"):
+                    pass
+                os.utime(path, None)  # new mtime = new shared version
+
+    # -----------------------------------------------------------------
+    # Storage tiers
+    # -----------------------------------------------------------------
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl")
+
+    def get(self, key: str) -> Tuple[Optional[_Entry], str]:
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry.expires > now:
+                    self._lru.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return entry, "HIT"
+                del self._lru[key]
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, "rb") as f:
+                    stored_key, entry = pickle.load(f)
+                if stored_key == key and entry.expires > now:
+                    self._put_memory(key, entry)
+                    with self._lock:
+                        self.counters["disk_hits"] += 1
+                    return entry, "HIT-DISK"
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except Exception:
+                # torn or foreign file: treat as a miss
+                pass
+        return None, "MISS"
+
+    def _put_memory(self, key: str, entry: _Entry):
+        with self._lock:
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def put(self, key: str, entry: _Entry):
+        self._put_memory(key, entry)
+        with self._lock:
+            self.counters["stores"] += 1
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    pickle.dump((key, entry), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except OSError as e:
+                print("Response cache disk write failed:", e)
+            self._disk_writes += 1
+            if self._disk_writes % 256 == 0:
+                self._sweep_disk()
+
+    def _sweep_disk(self):
+        """Drop expired disk entries (their versions are long gone anyway)."""
+        now = time.time()
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                with open(path, "rb") as f:
+                    _, entry = pickle.load(f)
+                if entry.expires <= now:
+                    os.remove(path)
+            except Exception:
+                pass
+
+    def reset_after_fork(self):
+        """A forked worker starts with an empty memory tier and none of the parent's flights."""
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+        self._flights = {}
+        self.counters = dict.fromkeys(self.counters, 0)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+        self.bump(*NAMESPACES)
+
+    # -----------------------------------------------------------------
+    # Single-flight
+    # -----------------------------------------------------------------
+    def get_or_compute(self, key: str, ttl: float, compute) -> Tuple[Optional[_Entry], Optional[Response], str]:
+        """(entry, uncacheable_response, state). compute() returns a Response."""
+        entry, state = self.get(key)
+        if entry is not None:
+            return entry, None, state
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.counters["coalesced"] += 1
+
+        if not leader:
+            if flight.done.wait(_FLIGHT_WAIT):
+                if flight.error is not None:
+                    raise flight.error
+                if flight.entry is not None:
+                    return flight.entry, None, "COALESCED"
+            # leader's result was not cacheable (or it is stuck): compute our own
+            return None, compute(), "MISS"
+
+        with self._lock:
+            self.counters["misses"] += 1
+        try:
+            response = compute()
+            if response.status_code == 200:
+                headers = {k: v for k, v in response.headers.items()
+                           if k.lower() not in ("content-length", "x-cache")}
+                flight.entry = _Entry(time.time() + ttl, response.status_code, bytes(response.body),
+                                      headers, response.media_type)
+                self.put(key, flight.entry)
+                return flight.entry, None, "MISS"
+            return None, response, "MISS"
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            flight.done.set()
+            with self._lock:
+                self._flights.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "entries": len(self._lru),
+                "max_entries": self.max_entries,
+                "inflight": len(self._flights),
+                "disk_dir": self.disk_dir,
+                "versions": {ns: self.version(ns) for ns in NAMESPACES},
+            }
+
+
+cache = ResponseCache()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=cache.reset_after_fork)
+
+
+# -------------------------------------------------------------------
+# Route decorator
+# -------------------------------------------------------------------
+def _normalize(value, casefold: bool):
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return value.lower() if casefold else value
+    return value
+
+
+def _to_response(result) -> Response:
+    if isinstance(result, Response):
+        return result
+    return FastJSONResponse(result)
+
+
+def _not_modified(request: Optional[Request], entry: _Entry) -> bool:
+    etag = entry.headers.get("etag")
+    if request is None or not etag:
+        return False
+    return etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+
+
+def cached(ttl: float = 60.0, deps: Iterable[str] = ("articles",), casefold: Iterable[str] = ()):
+    """Cache a sync route's 200 responses; see module docstring."""
+    deps = tuple(deps)
+    casefold = set(casefold)
+    for ns in deps:
+        if ns not in NAMESPACES:
+            raise ValueError(f"Unknown cache namespace '{ns}'")
+
+    def decorate(fn):
+        sig = inspect.signature(fn)
+        request_params = [n for n, p in sig.parameters.items() if p.annotation is Request]
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not CACHE_ENABLED:
+                return fn(*args, **kwargs)
+
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            request = next((bound.arguments[n] for n in request_params), None)
+            params = sorted(
+                (n, _normalize(v, n in casefold))
+                for n, v in bound.arguments.items() if n not in request_params
+            )
+            versions = tuple(cache.version(ns) for ns in deps)
+            key = repr((fn.__module__, fn.__qualname__, params, versions))
+
+            entry, response, state = cache.get_or_compute(key, ttl, lambda: _to_response(fn(*args, **kwargs)))
+            if entry is None:
+                return response
+            if _not_modified(request, entry):
+                return Response(status_code=304, headers={"ETag": entry.headers["etag"], "X-Cache": state})
+            return entry.response(state)
+
+        return wrapper
+
+    return decorate
+
+
+@register_collector
+def _cache_metrics():
+    st = cache.stats()
+    lines = ["# HELP newsprep_response_cache_events_total Response cache lookups by outcome.",
+             "# TYPE newsprep_response_cache_events_total counter"]
+    lines += [f'newsprep_response_cache_events_total{{outcome="{k}"}} {st[k]}'
+              for k in ("hits", "disk_hits", "misses", "coalesced", "stores")]
+    lines += ["# HELP newsprep_response_cache_entries Entries in the in-process tier.",
+              "# TYPE newsprep_response_cache_entries gauge",
+              f"newsprep_response_cache_entries {st['entries']}"]
+    return lines
+
+
+# -------------------------------------------------------------------
+# Invalidation hooks
+# -------------------------------------------------------------------
+@on_articles_changed
+def _articles_changed(changes):
+    cache.bump("articles")
+
+
+@artifacts.on_swap
+def _artifacts_swapped(gen):
+    cache.bump("artifacts")
@@ -1,32 +1,24 @@
 # backend/app/services/summarizer.py
 
+import hashlib
 import os
 import re
 from typing import List, Dict, Any
 
-# ------------------------
-# Extractive Summarization
-# ------------------------
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.text_rank import TextRankSummarizer
-from heapq import nlargest
+import numpy as np
 
-# ------------------------
-# Abstractive (Ollama Llama3.1)
-# ------------------------
-from langchain_community.llms import Ollama
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from pydantic import BaseModel, Field
-from langchain_core.output_parsers import PydanticOutputParser
 
 # ------------------------
 # DB Access
 # ------------------------
 from backend.app.db.session import SessionLocal
 from backend.app.db.models.article import Article
+from backend.app.metrics import stage
+from backend.app.services import llm_gateway
+
+# LangChain (abstractive path) is imported on first use so importing this module
+# stays cheap.
 
 
 
@@ -40,31 +32,115 @@ class SummaryOut(BaseModel):
     key_points: List[str] = Field(..., description="3-5 bullet takeaways")
 
 
-summary_parser = PydanticOutputParser(pydantic_object=SummaryOut)
+_summary_parser = None
+
+def get_summary_parser():
+    global _summary_parser
+    if _summary_parser is None:
+        from langchain_core.output_parsers import PydanticOutputParser
+        _summary_parser = PydanticOutputParser(pydantic_object=SummaryOut)
+    return _summary_parser
 
 # =====================================================================
-# 2) LLM — OLLAMA LLAMA 3.1
+# 2) LLM — OLLAMA LLAMA 3.1 (through the shared gateway: cache, limits, timeouts)
 # =====================================================================
 
-llm = Ollama(model="llama3.1")
+MAP_TIMEOUT = 90.0
+REDUCE_TIMEOUT = 120.0
 
 # =====================================================================
-# 3) Extractive Summarizer (TextRank + fallback)
+# 3) Extractive Summarizer (TextRank over TF-IDF sentence vectors)
 # =====================================================================
 
-def extractive_summary_text_rank(text: str, sentences_count: int = 2):
-    text = text.strip()
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'“(\[]?[A-Z0-9])")
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by for from had has have he her his i if in into is it its "
+    "of on or our she so than that the their them then there these they this to was we were "
+    "what when which who will with would you said says also after over about more".split()
+)
+
+
+_ABBREVIATIONS = frozenset("mr mrs ms dr prof st jr sr gen gov sen rep lt col capt sgt u.s u.k vs inc corp co ltd".split())
+_INITIAL = re.compile(r"[A-Z]\.")
+
+
+def split_sentences(text: str) -> List[str]:
+    text = re.sub(r"\s+", " ", text or "").strip()
+    sentences: List[str] = []
+    for piece in _SENTENCE_END.split(text):
+        piece = piece.strip()
+        if not piece:
+            continue
+        # "Mr. Smith", "U.S. officials", "J. Doe": the split was not a sentence end
+        if sentences:
+            last_word = sentences[-1].rsplit(" ", 1)[-1]
+            if last_word.rstrip(".").lower() in _ABBREVIATIONS or _INITIAL.fullmatch(last_word):
+                sentences[-1] += " " + piece
+                continue
+        sentences.append(piece)
+    return sentences
+
+
+def textrank_scores(sentences: List[str], damping: float = 0.85, max_iter: int = 100,
+                    tol: float = 1e-6) -> np.ndarray:
+    """PageRank over the cosine-similarity graph of TF-IDF sentence vectors."""
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    vocab: Dict[str, int] = {}
+    rows, cols = [], []
+    for i, sentence in enumerate(sentences):
+        for word in _WORD.findall(sentence.lower()):
+            if word not in _STOPWORDS:
+                rows.append(i)
+                cols.append(vocab.setdefault(word, len(vocab)))
+    if not vocab:
+        return np.full(n, 1.0 / n, dtype=np.float32)
+
+    tf = np.zeros((n, len(vocab)), dtype=np.float32)
+    np.add.at(tf, (rows, cols), 1.0)
+    idf = np.log((1.0 + n) / (1.0 + (tf > 0).sum(axis=0))) + 1.0
+    vecs = tf * idf
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    vecs /= np.where(norms > 0, norms, 1.0)
+
+    sim = vecs @ vecs.T
+    np.fill_diagonal(sim, 0.0)
+    out_weight = sim.sum(axis=1, keepdims=True)
+    # row-stochastic transitions; a sentence sharing no words links to every sentence
+    trans = np.where(out_weight > 0, sim / np.where(out_weight > 0, out_weight, 1.0), 1.0 / n)
+
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(max_iter):
+        nxt = (1.0 - damping) / n + damping * (trans.T @ scores)
+        if np.abs(nxt - scores).sum() < tol:
+            scores = nxt
+            break
+        scores = nxt
+    return scores
+
+
+def extractive_summary_text_rank(text: str, sentences_count: int = 2, key_points_count: int = 5):
+    text = (text or "").strip()
     if not text:
         return {"summary": "", "key_points": []}
 
-    sentences = [s.strip() for s in text.split('.') if s.strip()]
+    sentences = split_sentences(text)
     if len(sentences) <= sentences_count:
         return {"summary": text, "key_points": sentences}
-    
-    # Take first and last sentences
-    key_sentences = [sentences[0], sentences[-1]]
-    summary = '. '.join(key_sentences) + '.'
-    return {"summary": summary, "key_points": key_sentences}
+
+    ranked = np.argsort(-textrank_scores(sentences), kind="stable")
+    # both outputs keep the article's sentence order so they read naturally
+    summary = " ".join(sentences[i] for i in sorted(ranked[:sentences_count]))
+    key_points = [sentences[i] for i in sorted(ranked[:key_points_count])]
+    return {"summary": summary, "key_points": key_points}
+
+
+def summary_hash(text: str) -> str:
+    """Fingerprint of the text a stored summary was made from (Article.summary_hash)."""
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
 
 
 # =====================================================================
@@ -76,6 +152,11 @@ def abstractive_summary_langchain(text: str, chunk_size: int = 1800, chunk_overl
     if not text or text.strip() == "":
         return {"summary_paragraph": "", "key_points": []}
 
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from langchain_core.prompts import PromptTemplate
+
+    summary_parser = get_summary_parser()
+
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap
@@ -92,9 +173,10 @@ def abstractive_summary_langchain(text: str, chunk_size: int = 1800, chunk_overl
     )
 
     partial_summaries = []
-    for chunk in chunks:
-        chain = LLMChain(llm=llm, prompt=MAP_PROMPT)
-        partial_summaries.append(chain.run(text=chunk))
+    with stage("summarizer.map"):
+        for chunk in chunks:
+            partial_summaries.append(llm_gateway.generate(
+                MAP_PROMPT.format(text=chunk), caller="summarizer.map", timeout=MAP_TIMEOUT))
 
     combined = "\n".join(partial_summaries)
 
@@ -114,15 +196,15 @@ def abstractive_summary_langchain(text: str, chunk_size: int = 1800, chunk_overl
         )
     )
 
-    reduce_chain = LLMChain(
-        llm=llm,
-        prompt=REDUCE_PROMPT
-    )
-
-    output_raw = reduce_chain.run(
-        text=combined,
-        format_instructions=summary_parser.get_format_instructions()
-    )
+    with stage("summarizer.reduce"):
+        output_raw = llm_gateway.generate(
+            REDUCE_PROMPT.format(
+                text=combined,
+                format_instructions=summary_parser.get_format_instructions()
+            ),
+            caller="summarizer.reduce",
+            timeout=REDUCE_TIMEOUT,
+        )
 
     # Cleanup
     try:
@@ -159,6 +241,7 @@ def summarize_article_and_store(article_id: int, use_abstractive: bool = True):
 
         article.summary = final_summary
         article.key_points = final_key_points
+        article.summary_hash = summary_hash(text)
 
         db.add(article)
         db.commit()
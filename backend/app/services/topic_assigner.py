@@ -0,0 +1,112 @@
+# backend/app/services/topic_assigner.py
+"""Online topic assignment for new articles.
+
+Instead of re-running BERTopic, a new article gets the topic whose centroid (mean
+embedding of the articles already assigned to it) is closest. A whole batch is one
+matrix product; articles whose best similarity is below the threshold get -1, the
+same "outlier" id BERTopic uses. Accepted assignments are folded back into the
+centroids so topics follow the stream.
+"""
+import os
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.app.db.models.article import Article
+from backend.app.services import artifacts
+from backend.app.services.model_registry import DEFAULT_ENCODER, get_encoder
+from backend.app.services.topic_centroids import TopicCentroids
+
+DEFAULT_THRESHOLD = float(os.getenv("NEWSPREP_TOPIC_ASSIGN_THRESHOLD", "0.35"))
+
+
+def article_text(art) -> str:
+    """Text used to embed an article; must match how embeddings.npy was built."""
+    return str(art.text or art.title or "")
+
+
+class TopicAssigner:
+    def __init__(self, centroids: TopicCentroids, threshold: float = DEFAULT_THRESHOLD,
+                 encoder_name: str = DEFAULT_ENCODER):
+        self.centroids = centroids
+        self.threshold = threshold
+        self.encoder_name = encoder_name
+        self._encoder = None
+
+    def encode(self, texts: Sequence[str], batch_size: int = 256) -> np.ndarray:
+        if self._encoder is None:
+            self._encoder = get_encoder(self.encoder_name)
+        return self._encoder.encode(list(texts), batch_size=batch_size, convert_to_numpy=True)
+
+    def assign_embeddings(self, embeddings: np.ndarray, update: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """Topic id (or -1) and confidence for each embedding row."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim == 1:
+            embeddings = embeddings[None, :]
+        topics, conf = self.centroids.nearest(embeddings)
+        topics = np.where(conf >= self.threshold, topics, -1)
+        if update:
+            self.centroids.add(topics.tolist(), embeddings)
+        return topics, conf
+
+    def assign_texts(self, texts: Sequence[str], batch_size: int = 256, update: bool = True):
+        out_t, out_c = [], []
+        for i in range(0, len(texts), batch_size):
+            emb = self.encode(texts[i:i + batch_size], batch_size=batch_size)
+            t, c = self.assign_embeddings(emb, update=update)
+            out_t.append(t)
+            out_c.append(c)
+        if not out_t:
+            return np.zeros(0, np.int64), np.zeros(0, np.float32)
+        return np.concatenate(out_t), np.concatenate(out_c)
+
+    def assign_articles(self, articles: List[Article], batch_size: int = 256, overwrite: bool = False) -> int:
+        """Set topic_id on Article objects (in place) that do not have one yet."""
+        todo = [a for a in articles if overwrite or a.topic_id is None]
+        if not todo:
+            return 0
+        topics, _ = self.assign_texts([article_text(a) for a in todo], batch_size=batch_size)
+        for art, tid in zip(todo, topics.tolist()):
+            art.topic_id = int(tid)
+        return len(todo)
+
+
+# -------------------------------------------------------------------
+# Singleton, rebuilt when artifacts change
+# -------------------------------------------------------------------
+_assigner: Optional[TopicAssigner] = None
+_lock = threading.Lock()
+
+
+def get_topic_assigner() -> TopicAssigner:
+    """Assigner built from the live artifact version's embeddings (raises FileNotFoundError)."""
+    global _assigner
+    if _assigner is not None:
+        # the shared centroids catch up with writes made by other processes
+        artifacts.live().recommender.topic_centroids()
+        return _assigner
+    with _lock:
+        if _assigner is None:
+            t0 = time.perf_counter()
+            # share the recommender's centroids: assignments and hook updates land in one place
+            _assigner = TopicAssigner(artifacts.live().recommender.topic_centroids())
+            print(f"Topic assigner ready: {len(_assigner.centroids)} centroids "
+                  f"in {time.perf_counter() - t0:.2f}s")
+    return _assigner
+
+
+@artifacts.on_swap
+def _reset_assigner(gen):
+    global _assigner
+    _assigner = None
+
+
+def assign_topics(articles: List[Article], batch_size: int = 256) -> int:
+    """Best-effort assignment for ingest paths: leaves topic_id None if no model is available."""
+    try:
+        return get_topic_assigner().assign_articles(articles, batch_size=batch_size)
+    except (FileNotFoundError, ImportError) as e:
+        print("Topic assignment skipped:", e)
+        return 0
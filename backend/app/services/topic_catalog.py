@@ -0,0 +1,188 @@
+# backend/app/services/topic_catalog.py
+"""Materialized topic catalog.
+
+The `topics` table holds name, keywords and article count for every topic. Counts
+are kept in step with article inserts / re-topics / deletes by db.events, in the
+same transaction as the write and in whichever process made it (server workers,
+import scripts, jobs), so the /api/topics endpoints never scan the articles table
+or the BERTopic DataFrame.
+
+Each process serves from an in-memory copy of the table, reloaded as soon as the
+shared "articles" / "topics" versions (db.versions) move. ETags are derived from
+the content, so every worker hands out the same tag for the same data.
+"""
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import delete, func, insert, select, update
+
+from backend.app.db.session import engine
+from backend.app.db.models.article import Article
+from backend.app.db.models.topic import Topic
+from backend.app.db import versions
+
+# versions the in-memory copy depends on (TOPIC_COUNTS moves on every rebuild)
+_VERSIONS = (versions.ARTICLES, versions.TOPICS, versions.TOPIC_COUNTS)
+
+
+def _digest(value) -> str:
+    return hashlib.sha1(orjson.dumps(value)).hexdigest()[:16]
+
+
+class TopicCatalog:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._topics: Dict[int, dict] = {}
+        self._topic_etags: Dict[int, str] = {}
+        self._list: List[dict] = []
+        self._list_etag = 'W/"topics-empty"'
+        self._loaded: Optional[Tuple[int, ...]] = None
+
+        # metadata from the topic model (set once the model is loaded)
+        self.topic_info: Dict[int, dict] = {}
+        self.topic_keywords: Dict[str, list] = {}
+
+    # ---------------------------------------------------------------
+    # Naming
+    # ---------------------------------------------------------------
+    def _describe(self, tid: int):
+        """Return (name, keywords) for a topic using the best metadata available."""
+        name = f"Topic {tid}"
+        keywords = []
+
+        info = self.topic_info.get(tid)
+        if info:
+            keywords = list(info.get("Representation") or [])
+
+        if str(tid) in self.topic_keywords:
+            kw_list = self.topic_keywords[str(tid)][:3]  # Top 3 keywords
+            name = " | ".join(kw_list).title()
+            keywords = self.topic_keywords[str(tid)]
+        elif info and info.get("Name"):
+            name = info["Name"]
+        elif keywords:
+            name = " | ".join(keywords[:3]).title()
+
+        return name, keywords
+
+    def set_metadata(self, topic_info: Optional[List[dict]] = None, topic_keywords: Optional[dict] = None):
+        """Install topic model metadata and rename every known topic (names/keywords only)."""
+        with self._lock:
+            if topic_info is not None:
+                self.topic_info = {int(t["Topic"]): t for t in topic_info}
+            if topic_keywords is not None:
+                self.topic_keywords = dict(topic_keywords)
+
+            try:
+                with engine.begin() as conn:
+                    existing = {int(r[0]) for r in conn.execute(select(Topic.id))}
+                    for tid in existing | {t for t in self.topic_info if t != -1}:
+                        name, keywords = self._describe(tid)
+                        if tid in existing:
+                            conn.execute(update(Topic).where(Topic.id == tid).values(name=name, keywords=keywords))
+                        else:
+                            conn.execute(insert(Topic).values(id=tid, name=name, keywords=keywords, count=0,
+                                                              version=0))
+                    versions.bump_version(conn, versions.TOPICS)
+            except Exception as e:
+                print("Warning: could not persist topic names:", e)
+            self._loaded = None
+
+    # ---------------------------------------------------------------
+    # Build / load
+    # ---------------------------------------------------------------
+    def build(self):
+        """Recount articles per topic and rewrite the topics table in one transaction."""
+        with self._lock, engine.begin() as conn:
+            # first statement is a write: holds the DB write lock, so no article change can land
+            # between the recount and TOPIC_COUNTS telling db.events to maintain the counts
+            versions.bump_version(conn, versions.TOPIC_COUNTS)
+            v = versions.read_version(versions.ARTICLES, conn) or 0
+            counts = {
+                row[0]: row[1]
+                for row in conn.execute(select(Article.topic_id, func.count(Article.id))
+                                        .group_by(Article.topic_id))
+            }
+            tids = {int(t) for t in counts if t is not None and t != -1}
+            tids |= {t for t in self.topic_info if t != -1}
+            rows = []
+            for tid in sorted(tids):
+                name, keywords = self._describe(tid)
+                rows.append({"id": tid, "name": name, "keywords": keywords,
+                             "count": int(counts.get(tid, 0)), "version": v})
+            conn.execute(delete(Topic))
+            if rows:
+                conn.execute(insert(Topic), rows)
+            self._loaded = None
+
+        print(f"Topic catalog built with {len(rows)} topics.")
+
+    def load_or_build(self):
+        """Recount from the articles table, then serve from the topics table.
+
+        The recount (one GROUP BY over the topic index) picks up anything written
+        while no process was maintaining the counts: rows written before this
+        database had a catalog, or by tools outside the app.
+        """
+        self.build()
+        self._ensure()
+
+    def _load(self, key: Tuple[int, ...]):
+        with engine.connect() as conn:
+            rows = conn.execute(select(Topic.id, Topic.name, Topic.keywords, Topic.count, Topic.version)
+                                .order_by(Topic.id)).all()
+        topics, etags = {}, {}
+        for tid, name, keywords, count, version in rows:
+            entry = {"topic_id": int(tid), "name": name, "keywords": keywords or [], "count": int(count or 0)}
+            topics[int(tid)] = entry
+            etags[int(tid)] = f'W/"topic-{int(tid)}-{int(version or 0)}-{_digest(entry)[:8]}"'
+        listing = [topics[t] for t in sorted(topics)]
+        self._topics, self._topic_etags, self._list = topics, etags, listing
+        self._list_etag = f'W/"topics-{_digest(listing)}"'
+        self._loaded = key
+
+    def _ensure(self):
+        """Reload when another process (or this one) changed articles or topic names."""
+        current = versions.read_versions(_VERSIONS)
+        key = tuple(current.values())
+        if key == self._loaded:
+            return
+        with self._lock:
+            if key == self._loaded:
+                return
+            if not current[versions.TOPIC_COUNTS]:
+                # counts were never set up for this database
+                self.build()
+                current = versions.read_versions(_VERSIONS)
+                key = tuple(current.values())
+            self._load(key)
+
+    # ---------------------------------------------------------------
+    # Lookups
+    # ---------------------------------------------------------------
+    def list_topics(self) -> List[dict]:
+        self._ensure()
+        return self._list
+
+    def get(self, topic_id: int) -> Optional[dict]:
+        self._ensure()
+        entry = self._topics.get(int(topic_id))
+        return dict(entry) if entry else None
+
+    def etag(self, topic_id: Optional[int] = None) -> str:
+        self._ensure()
+        if topic_id is None:
+            return self._list_etag
+        return self._topic_etags.get(int(topic_id), f'W/"topic-{int(topic_id)}-none"')
+
+
+# singleton
+_catalog = None
+
+def get_topic_catalog() -> TopicCatalog:
+    global _catalog
+    if _catalog is None:
+        _catalog = TopicCatalog()
+    return _catalog
@@ -0,0 +1,129 @@
+# backend/app/services/topic_centroids.py
+"""Per-topic centroid matrix over article embeddings.
+
+Keeps a running sum and count per topic so centroids can be updated one batch at
+a time, plus the row-normalized (T, D) centroid matrix used for nearest-topic
+lookups. Topic -1 (BERTopic outliers) and unassigned articles never contribute.
+"""
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+def _normalize_rows(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    if x.ndim == 1:
+        x = x[None, :]
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def _group_sums(topic_ids: np.ndarray, vectors: np.ndarray):
+    """Vectorized per-topic sums: returns (unique_topics, sums, counts)."""
+    uniq, inv = np.unique(topic_ids, return_inverse=True)
+    order = np.argsort(inv, kind="stable")
+    counts = np.bincount(inv, minlength=len(uniq))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sums = np.add.reduceat(vectors[order], starts, axis=0) if len(order) else np.zeros((0, vectors.shape[1]), np.float32)
+    return uniq, sums.astype(np.float32), counts.astype(np.int64)
+
+
+class TopicCentroids:
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.topic_ids = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros((0, dim), dtype=np.float32)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.matrix = np.zeros((0, dim), dtype=np.float32)   # normalized centroids
+        self._row: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    @classmethod
+    def from_assignments(cls, embeddings: np.ndarray, topic_ids: Iterable) -> "TopicCentroids":
+        """Build from an (N, D) embedding matrix and the N topic ids (None / -1 skipped)."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        self = cls(embeddings.shape[1])
+        self.add(topic_ids, embeddings)
+        return self
+
+    # -----------------------------------------------------------------
+    # Incremental updates
+    # -----------------------------------------------------------------
+    def _valid(self, topic_ids, vectors) -> Tuple[np.ndarray, np.ndarray]:
+        tids = np.array([(-1 if t is None else int(t)) for t in topic_ids], dtype=np.int64)
+        vecs = _normalize_rows(vectors)
+        mask = tids >= 0
+        return tids[mask], vecs[mask]
+
+    def add(self, topic_ids, vectors, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) article vectors from their topics."""
+        tids, vecs = self._valid(topic_ids, vectors)
+        if not len(tids):
+            return
+        uniq, sums, counts = _group_sums(tids, vecs)
+
+        with self._lock:
+            new = [int(t) for t in uniq if int(t) not in self._row]
+            if new:
+                base = len(self.topic_ids)
+                self.topic_ids = np.concatenate([self.topic_ids, np.array(new, dtype=np.int64)])
+                self.sums = np.vstack([self.sums, np.zeros((len(new), self.dim), np.float32)])
+                self.counts = np.concatenate([self.counts, np.zeros(len(new), np.int64)])
+                self.matrix = np.vstack([self.matrix, np.zeros((len(new), self.dim), np.float32)])
+                for i, t in enumerate(new):
+                    self._row[t] = base + i
+
+            rows = np.array([self._row[int(t)] for t in uniq], dtype=np.int64)
+            self.sums[rows] += sign * sums
+            self.counts[rows] = np.maximum(0, self.counts[rows] + sign * counts)
+            # only the touched rows need re-normalizing
+            self.matrix[rows] = _normalize_rows(self.sums[rows])
+            self.matrix[rows[self.counts[rows] == 0]] = 0.0
+            self.version += 1
+
+    def replace(self, other: "TopicCentroids"):
+        """Take over another instance's state (a rebuild), keeping this object for its holders."""
+        with self._lock:
+            self.topic_ids, self.sums, self.counts = other.topic_ids, other.sums, other.counts
+            self.matrix, self._row = other.matrix, other._row
+            self.version += 1
+
+    def remove(self, topic_ids, vectors):
+        self.add(topic_ids, vectors, sign=-1)
+
+    def move(self, vectors, old_topics, new_topics):
+        """Re-topic: take the vectors out of their old topics and into the new ones."""
+        self.remove(old_topics, vectors)
+        self.add(new_topics, vectors)
+
+    # -----------------------------------------------------------------
+    # Lookups
+    # -----------------------------------------------------------------
+    def __len__(self):
+        return len(self.topic_ids)
+
+    def centroid(self, topic_id: int) -> Optional[np.ndarray]:
+        row = self._row.get(int(topic_id))
+        if row is None or self.counts[row] == 0:
+            return None
+        return self.matrix[row]
+
+    def nearest(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest topic and cosine similarity for each row of `vectors`, in one matmul."""
+        vecs = _normalize_rows(vectors)
+        with self._lock:
+            topic_ids, matrix = self.topic_ids, self.matrix
+        if not len(topic_ids):
+            return np.full(len(vecs), -1, dtype=np.int64), np.zeros(len(vecs), dtype=np.float32)
+        sims = vecs @ matrix.T
+        best = np.argmax(sims, axis=1)
+        return topic_ids[best], sims[np.arange(len(vecs)), best]
+
+    def similarity_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(topic_ids, T x T cosine similarities between live centroids)."""
+        live = self.counts > 0
+        m = self.matrix[live]
+        return self.topic_ids[live], m @ m.T
@@ -1,36 +1,45 @@
 # backend/app/services/topic_service.py
 import os
-import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import math
 
-# Optional heavy dependencies — import safely so server can start without them
-try:
-    from bertopic import BERTopic
-except Exception:
-    BERTopic = None
+from backend.app.metrics import stage
+from backend.app.services.corpus_snapshot import get_corpus_snapshot, release_corpus_snapshot
+from backend.app.services.model_registry import (
+    get_encoder, release_encoder,
+    get_topic_model, release_topic_model,
+    get_normalized_embeddings, release_normalized_embeddings,
+)
 
-try:
-    from sentence_transformers import SentenceTransformer
-except Exception:
-    SentenceTransformer = None
+# Heavy dependencies (BERTopic, sentence_transformers) are loaded on first use
+# through the model registry, which shares one instance per process. Article
+# titles, texts and topics come from the version's corpus snapshot
+# (services/corpus_snapshot.py), row-aligned with the embeddings.
 
-# Singleton holder to avoid reloading multiple times
-_SERVICE_SINGLETON = None
+
+def cosine_similarity(a, b):
+    """Row-wise cosine similarity matrix (same contract as sklearn's, without the import)."""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    an = np.linalg.norm(a, axis=1, keepdims=True)
+    bn = np.linalg.norm(b, axis=1, keepdims=True)
+    an[an == 0] = 1.0
+    bn[bn == 0] = 1.0
+    return (a / an) @ (b / bn).T
 
 
 class TopicService:
-    def __init__(self, model_path, articles_csv, embedder_name="all-MiniLM-L6-v2"):
+    def __init__(self, model_path, version, embeddings_path=None, ids_path=None,
+                 embedder_name="all-MiniLM-L6-v2"):
         self.model_path = model_path
-        self.articles_csv = articles_csv
-        print("Loading articles from", articles_csv)
-
-        self.df = pd.read_csv(articles_csv)
+        self.version = version
+        self.emb_path = embeddings_path
+        self.id_path = ids_path
+        if not (embeddings_path and ids_path and os.path.exists(embeddings_path) and os.path.exists(ids_path)):
+            self.emb_path = self.id_path = None
 
-        # Ensure id column exists
-        if "id" not in self.df.columns:
-            self.df = self.df.reset_index().rename(columns={"index": "id"})
+        # Shared with every service of this version: row i is article_ids[i]
+        self.corpus = get_corpus_snapshot(version, self.id_path)
 
         self.topic_info = None
         self.topic_model = None
@@ -40,16 +49,16 @@ class TopicService:
         self.embedder_name = embedder_name
         self.embedder = None
 
-        base = os.path.dirname(articles_csv)
-        self.emb_path = os.path.join(base, "embeddings.npy")
-        self.id_path = os.path.join(base, "article_ids.npy")
-
         self._embeddings = None
         self._article_ids = None
 
-        if os.path.exists(self.emb_path) and os.path.exists(self.id_path):
+        # articles ingested after the corpus was built (set by artifacts.Generation)
+        self.delta = None
+        self._delta_docs = {}  # id -> (title, text, source, url, lowercased title, lowercased text)
+
+        if self.emb_path:
             print("Loading precomputed embeddings:", self.emb_path)
-            self._embeddings = np.load(self.emb_path)
+            self._embeddings = get_normalized_embeddings(self.emb_path)
             self._article_ids = np.load(self.id_path)
         else:
             print("No precomputed embeddings found (semantic search limited).")
@@ -66,14 +75,14 @@ class TopicService:
 
     def _load_model(self):
         try:
-            if BERTopic is None:
-                print("bertopic not installed; topic model features disabled.")
-                self.topic_model = None
-                return
-
             if os.path.exists(self.model_path):
                 print("Loading BERTopic model from", self.model_path)
-                self.topic_model = BERTopic.load(self.model_path)
+                try:
+                    self.topic_model = get_topic_model(self.model_path)
+                except ImportError:
+                    print("bertopic not installed; topic model features disabled.")
+                    self.topic_model = None
+                    return
                 try:
                     info = self.topic_model.get_topic_info()
                     info = info.rename(columns={"Name": "Name", "Representation": "Representation"})
@@ -104,11 +113,11 @@ class TopicService:
                     })
                 return result
 
-            # Fallback grouping
-            groups = self.df["bertopic_topic"].value_counts().to_dict()
+            # Fallback grouping, largest first
+            groups = sorted(self.corpus.topic_counts().items(), key=lambda kv: -kv[1])
             return [
-                {"Topic": int(k), "Count": int(v), "Name": str(k), "Representation": []}
-                for k, v in groups.items()
+                {"Topic": k, "Count": v, "Name": str(k), "Representation": []}
+                for k, v in groups
             ]
 
         # Specific topic details
@@ -136,17 +145,17 @@ class TopicService:
         except Exception:
             docs = []
 
-        dfsel = self.df[self.df["bertopic_topic"] == int(topic_id)].head(top_n)
-
+        self.corpus.refresh()
         ret = []
-        for _, r in dfsel.iterrows():
+        for i in self.corpus.rows_of_topic(topic_id, top_n):
+            r = self.corpus.row(i)
             ret.append({
-                "id": int(r["id"]),
-                "title": r.get("title"),
-                "text": r.get("text"),
-                "source": r.get("source"),
-                "url": r.get("url") if "url" in r else None,
-                "published": r.get("published") if "published" in r else None,
+                "id": r["id"],
+                "title": r["title"],
+                "text": r["text"],
+                "source": r["source"],
+                "url": r["url"],
+                "published": r["published"],
             })
 
         return ret or docs
@@ -156,43 +165,83 @@ class TopicService:
     def keyword_search(self, q: str, top_k: int = 10):
         ql = str(q).lower()
 
-        df = self.df
-        df["__score_kw"] = (
-            df["title"].fillna("").str.lower().str.contains(ql).astype(int) * 2
-            + df["text"].fillna("").str.lower().str.contains(ql).astype(int)
-        )
-
-        res = df[df["__score_kw"] > 0].sort_values("__score_kw", ascending=False).head(top_k)
-
-        out = []
-        for _, r in res.iterrows():
-            out.append({
-                "id": int(r["id"]),
-                "title": r.get("title"),
-                "text": r.get("text"),
-                "topic": int(r.get("bertopic_topic")) if "bertopic_topic" in r else None,
-                "source": r.get("source"),
-                "url": r.get("url") if "url" in r else None,
-            })
-
-        try:
-            df.drop(columns="__score_kw", inplace=True)
-        except Exception:
-            pass
-
-        return out
+        with stage("topic.keyword_scan"):
+            self.corpus.refresh()
+            hits = self.corpus.keyword_search(ql, top_k)
+
+        scored = []
+        for i, sc in hits:
+            r = self.corpus.row(i)
+            scored.append((sc, {
+                "id": r["id"],
+                "title": r["title"],
+                "text": r["text"],
+                "topic": r["topic"] if r["topic"] >= 0 else None,
+                "source": r["source"],
+                "url": r["url"],
+            }))
+
+        delta = self._sync_delta_docs()
+        if delta is not None:
+            ids, topics, _ = delta
+            for aid, tid in zip(ids.tolist(), topics.tolist()):
+                title, text, source, url, lt, ltx = self._delta_docs[aid]
+                sc = (ql in lt) * 2 + (ql in ltx)
+                if sc:
+                    scored.append((sc, {"id": aid, "title": title, "text": text,
+                                        "topic": tid, "source": source, "url": url}))
+            # stable: corpus rows stay ahead of ingested ones with the same score
+            scored.sort(key=lambda x: -x[0])
+
+        return [r for _, r in scored[:top_k]]
+
+    def _sync_delta_docs(self):
+        """(ids, topics, vectors) of ingested articles with their text cached, or None."""
+        d = self.delta
+        if d is None:
+            return None
+        d.sync()
+        if not d.rows:
+            return None
+        ids, topics, vecs = d.since(0)
+        missing = [a for a in ids.tolist() if a not in self._delta_docs]
+        if missing:
+            from backend.app.db.session import SessionLocal
+            from backend.app.db.models.article import Article
+            db = SessionLocal()
+            try:
+                for i in range(0, len(missing), 500):
+                    rows = db.query(Article.id, Article.title, Article.text, Article.source, Article.url).filter(
+                        Article.id.in_(missing[i:i + 500])).all()
+                    for aid, title, text, source, url in rows:
+                        self._delta_docs[aid] = (title, text, source, url, (title or "").lower(), (text or "").lower())
+            finally:
+                db.close()
+            for aid in missing:
+                self._delta_docs.setdefault(aid, (None, None, None, None, "", ""))  # deleted meanwhile
+        return ids, topics, vecs
 
     # ===============================================================
 
     def has_embeddings(self):
         return self._embeddings is not None
 
+    def _similarities(self, q_emb):
+        """Cosine similarity of one query to every article row.
+
+        The shared embeddings are already normalized: only the query is, so no
+        per-request copy of the matrix is made (it would be private to each worker).
+        """
+        q = np.asarray(q_emb, dtype=np.float32).reshape(-1)
+        n = np.linalg.norm(q)
+        return self._embeddings @ (q / n if n > 0 else q)
+
     def _ensure_embedder(self):
         if self.embedder is None:
-            if SentenceTransformer is None:
+            try:
+                self.embedder = get_encoder(self.embedder_name)
+            except ImportError:
                 raise RuntimeError("SentenceTransformer is not installed; semantic search is unavailable.")
-            print("Loading embedder:", self.embedder_name)
-            self.embedder = SentenceTransformer(self.embedder_name)
 
     # ===============================================================
     # FIXED SEMANTIC SEARCH
@@ -205,45 +254,71 @@ class TopicService:
         # No precomputed embeddings
         if not self.has_embeddings():
             self._ensure_embedder()
-            texts = self.df["text"].astype(str).tolist()
+            self.corpus.refresh()
+            texts = [self.corpus.text(i) for i in range(len(self.corpus))]
 
             emb = self.embedder.encode(texts, convert_to_numpy=True)
             sims = cosine_similarity(self.embedder.encode([query]), emb)[0]
 
-            idx = sims.argsort()[::-1][:top_k]
             out = []
-
-            for i in idx:
-                r = self.df.iloc[i]
+            for i in sims.argsort()[::-1]:
+                r = self.corpus.row(int(i))
+                if r is None:
+                    continue
                 out.append({
-                    "id": int(r["id"]),
-                    "title": r.get("title"),
-                    "text": r.get("text"),
+                    "id": r["id"],
+                    "title": r["title"],
+                    "text": r["text"],
                     "score": clean(sims[i]),
                 })
+                if len(out) >= top_k:
+                    break
 
             return out
 
         # With precomputed embeddings
-        self._ensure_embedder()
-        q_emb = self.embedder.encode([query], convert_to_numpy=True)
-
-        sims = cosine_similarity(q_emb, self._embeddings)[0]
-        idx = sims.argsort()[::-1][:top_k]
-
-        out = []
+        with stage("topic.encode_query"):
+            self._ensure_embedder()
+            q_emb = self.embedder.encode([query], convert_to_numpy=True)
+
+        with stage("topic.semantic_score"):
+            sims = self._similarities(q_emb)
+            # a few spare rows for articles deleted since the version was built
+            idx = sims.argsort()[::-1][:2 * top_k]
+            delta = self._sync_delta_docs()
+            if delta is not None:
+                d_ids, _, d_vecs = delta
+                d_sims = cosine_similarity(q_emb, d_vecs)[0]
+                d_idx = d_sims.argsort()[::-1][:top_k]
+
+        self.corpus.refresh()
+        scored = []
         for i in idx:
-            aid = int(self._article_ids[i])
-            row = self.df[self.df["id"] == aid].iloc[0]
-
-            out.append({
-                "id": aid,
-                "title": row.get("title"),
-                "text": (row.get("text") or "")[:600],
+            row = self.corpus.row(int(i))
+            if row is None:
+                continue
+            scored.append((float(sims[i]), {
+                "id": row["id"],
+                "title": row["title"],
+                "text": (row["text"] or "")[:600],
                 "score": clean(sims[i]),
-            })
-
-        return out
+            }))
+            if len(scored) >= top_k:
+                break
+
+        if delta is not None:
+            for j in d_idx:
+                aid = int(d_ids[j])
+                title, text = self._delta_docs[aid][:2]
+                scored.append((float(d_sims[j]), {
+                    "id": aid,
+                    "title": title,
+                    "text": (text or "")[:600],
+                    "score": clean(d_sims[j]),
+                }))
+            scored.sort(key=lambda x: -x[0])
+
+        return [r for _, r in scored[:top_k]]
 
     # ===============================================================
 
@@ -261,28 +336,42 @@ class TopicService:
         i = int(np.where(self._article_ids == article_id)[0][0])
         q_emb = self._embeddings[i:i + 1]
 
-        sims = cosine_similarity(q_emb, self._embeddings)[0]
+        sims = self._similarities(q_emb)
         idx = sims.argsort()[::-1]
 
+        self.corpus.refresh()
         results = []
-        for j in idx[1:top_k+1]:
-            aid = int(self._article_ids[j])
-            r = self.df[self.df["id"] == aid].iloc[0]
-
+        for j in idx:
+            if j == i:
+                continue
+            r = self.corpus.row(int(j))
+            if r is None:
+                continue
             results.append({
-                "id": aid,
-                "title": r.get("title"),
-                "text": r.get("text"),
+                "id": r["id"],
+                "title": r["title"],
+                "text": r["text"],
                 "score": clean(sims[j]),
             })
+            if len(results) >= top_k:
+                break
 
         return results
 
 
-# ===============================================================
+    # ===============================================================
 
-def get_topic_service(model_path, articles_csv):
-    global _SERVICE_SINGLETON
-    if _SERVICE_SINGLETON is None:
-        _SERVICE_SINGLETON = TopicService(model_path=model_path, articles_csv=articles_csv)
-    return _SERVICE_SINGLETON
+    def close(self):
+        """Release this service's references to shared models."""
+        if self.corpus is not None:
+            release_corpus_snapshot(self.version)
+            self.corpus = None
+        if self.topic_model is not None:
+            release_topic_model(self.model_path)
+            self.topic_model = None
+        if self._embeddings is not None:
+            release_normalized_embeddings(self.emb_path)
+            self._embeddings = None
+        if self.embedder is not None:
+            release_encoder(self.embedder_name)
+            self.embedder = None
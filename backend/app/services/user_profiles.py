@@ -0,0 +1,234 @@
+# backend/app/services/user_profiles.py
+"""Per-user taste vectors for "for you" recommendations.
+
+A user's profile is the recency- and event-weighted mean of the (normalized)
+embeddings of the articles they viewed, liked or bookmarked:
+
+    profile = sum_i w_i * 0.5 ** (age_i / half_life) * v_i  /  sum_i (same weights)
+
+It is kept as (mean, total weight, last update time) and folded forward one event
+at a time — decay the old state to the event's time, add the event — so an event
+costs O(D) and history is never re-read.
+
+Storage is three memory-mapped arrays indexed by user id, in
+NEWSPREP_PROFILES_DIR/<dim>/:
+
+    vectors.f16   (capacity, D) float16 mean vectors (768 bytes per user at D=384)
+    weights.f32   (capacity,)   decayed total weight, 0 = no profile
+    updated.f64   (capacity,)   epoch seconds of the last folded-in event
+
+so a million users take ~780 MB of disk and only the touched pages of RAM, and
+every worker process maps the same files. The files grow (doubling) as higher
+user ids appear. Updates are read-modify-write, so they hold an flock on
+.write.lock in the store's directory as well as the in-process lock: two workers
+folding events into the same user would otherwise lose one of them.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev servers only
+    fcntl = None
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+PROFILES_DIR = os.path.abspath(os.getenv("NEWSPREP_PROFILES_DIR", os.path.join(DATA_DIR, "profiles")))
+HALF_LIFE_DAYS = float(os.getenv("NEWSPREP_PROFILE_HALF_LIFE_DAYS", "14"))
+MAX_USER_ID = int(os.getenv("NEWSPREP_PROFILE_MAX_USER_ID", "50000000"))
+INITIAL_CAPACITY = 1024
+
+EVENT_WEIGHTS: Dict[str, float] = {"view": 1.0, "like": 3.0, "bookmark": 4.0}
+
+
+def decay_factor(dt_seconds, half_life_days: float = HALF_LIFE_DAYS):
+    return np.power(0.5, np.maximum(dt_seconds, 0.0) / (half_life_days * 86400.0))
+
+
+class UserProfiles:
+    def __init__(self, dim: int, directory: str = PROFILES_DIR, half_life_days: float = HALF_LIFE_DAYS):
+        self.dim = dim
+        self.half_life_days = half_life_days
+        self.directory = os.path.join(directory, str(dim))
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._lock_pid = None
+        os.makedirs(self.directory, exist_ok=True)
+        self._paths = {name: os.path.join(self.directory, name) for name in ("vectors.f16", "weights.f32", "updated.f64")}
+        meta_path = os.path.join(self.directory, "meta.json")
+        if not os.path.exists(meta_path):
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": dim, "dtype": "float16", "half_life_days": half_life_days}, f)
+        self.capacity = 0
+        self._map(max(self._capacity_on_disk(), INITIAL_CAPACITY))
+
+    # -----------------------------------------------------------------
+    # Storage
+    # -----------------------------------------------------------------
+    def _capacity_on_disk(self) -> int:
+        path = self._paths["weights.f32"]
+        return os.path.getsize(path) // 4 if os.path.exists(path) else 0
+
+    def _map(self, capacity: int):
+        """(Re)map all three files at `capacity` rows, extending them if needed."""
+        specs = (("vectors.f16", np.float16, (capacity, self.dim)),
+                 ("weights.f32", np.float32, (capacity,)),
+                 ("updated.f64", np.float64, (capacity,)))
+        arrays = []
+        for name, dtype, shape in specs:
+            path = self._paths[name]
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            with open(path, "ab") as f:
+                if f.tell() < nbytes:
+                    f.truncate(nbytes)  # sparse zero fill
+            arrays.append(np.memmap(path, dtype=dtype, mode="r+", shape=shape))
+        self.vectors, self.weights, self.updated = arrays
+        self.capacity = capacity
+
+    def _ensure_capacity(self, user_id: int):
+        if user_id < self.capacity:
+            return
+        lock_file = None
+        if fcntl is not None:
+            # other worker processes map the same files: grow them one at a time
+            lock_file = open(os.path.join(self.directory, ".grow.lock"), "w")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            capacity = max(self._capacity_on_disk(), self.capacity)
+            while capacity <= user_id:
+                capacity *= 2
+            self._map(min(capacity, MAX_USER_ID + 1))
+        finally:
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+    @contextmanager
+    def _writing(self):
+        """Exclusive across threads and processes for a read-modify-write."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            # an flock belongs to the open file, which a forked worker shares with its parent: open our own
+            if self._lock_file is None or self._lock_pid != os.getpid():
+                self._lock_file = open(os.path.join(self.directory, ".write.lock"), "w")
+                self._lock_pid = os.getpid()
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def flush(self):
+        with self._lock:
+            for arr in (self.vectors, self.weights, self.updated):
+                arr.flush()
+
+    # -----------------------------------------------------------------
+    # Updates
+    # -----------------------------------------------------------------
+    def observe(self, user_id: int, vector: np.ndarray, event: str, ts: Optional[float] = None) -> bool:
+        """Fold one interaction into the user's profile; False when the event type carries no weight."""
+        weight = EVENT_WEIGHTS.get(event)
+        if weight is None or user_id is None or not 0 <= int(user_id) <= MAX_USER_ID:
+            return False
+        user_id = int(user_id)
+        ts = time.time() if ts is None else ts
+        v = np.asarray(vector, dtype=np.float32)
+        with self._writing():
+            self._ensure_capacity(user_id)
+            w_old = float(self.weights[user_id])
+            if w_old > 0:
+                t_old = float(self.updated[user_id])
+                # an out-of-order (older) event is decayed instead of the stored state
+                if ts >= t_old:
+                    w_old *= float(decay_factor(ts - t_old, self.half_life_days))
+                else:
+                    weight *= float(decay_factor(t_old - ts, self.half_life_days))
+                    ts = t_old
+                mean = self.vectors[user_id].astype(np.float32)
+                new_w = w_old + weight
+                self.vectors[user_id] = (mean * w_old + v * weight) / new_w
+            else:
+                new_w = weight
+                self.vectors[user_id] = v
+            self.weights[user_id] = new_w
+            self.updated[user_id] = ts
+        return True
+
+    def set_many(self, user_ids: np.ndarray, means: np.ndarray, weights: np.ndarray, updated: np.ndarray):
+        """Bulk write (backfill from history)."""
+        if not len(user_ids):
+            return
+        with self._writing():
+            self._ensure_capacity(int(user_ids.max()))
+            self.vectors[user_ids] = means.astype(np.float16)
+            self.weights[user_ids] = weights
+            self.updated[user_ids] = updated
+
+    # -----------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------
+    def get(self, user_id: int) -> Optional[np.ndarray]:
+        """The user's profile vector (float32), or None without history."""
+        user_id = int(user_id)
+        if user_id < 0:
+            return None
+        if user_id >= self.capacity and user_id < self._capacity_on_disk():
+            with self._lock:
+                self._ensure_capacity(user_id)  # grown by another process
+        if user_id >= self.capacity or self.weights[user_id] <= 0:
+            return None
+        return self.vectors[user_id].astype(np.float32)
+
+    def stats(self) -> dict:
+        active = int(np.count_nonzero(self.weights))
+        return {
+            "dim": self.dim,
+            "capacity": self.capacity,
+            "profiles": active,
+            "bytes_on_disk": sum(os.path.getsize(p) for p in self._paths.values()),
+            "half_life_days": self.half_life_days,
+            "directory": self.directory,
+        }
+
+
+_profiles: Dict[int, UserProfiles] = {}
+_profiles_lock = threading.Lock()
+
+
+def get_user_profiles(dim: int) -> UserProfiles:
+    """Profile store for embeddings of width `dim` (one per embedding model)."""
+    store = _profiles.get(dim)
+    if store is None:
+        with _profiles_lock:
+            store = _profiles.get(dim)
+            if store is None:
+                store = _profiles[dim] = UserProfiles(dim)
+    return store
+
+
+def record_interaction(user_id: Optional[int], article_id: int, event: str, ts: Optional[float] = None) -> bool:
+    """Update the user's profile from one event (best effort; needs the article's embedding)."""
+    if user_id is None or event not in EVENT_WEIGHTS:
+        return False
+    from backend.app.services import artifacts
+    recommender = artifacts.live().recommender
+    try:
+        vec = recommender.embedding_of(article_id)
+    except FileNotFoundError:
+        return False
+    if vec is None:
+        return False
+    return get_user_profiles(vec.shape[0]).observe(user_id, vec, event, ts)
+
+
+def flush():
+    for store in list(_profiles.values()):
+        store.flush()
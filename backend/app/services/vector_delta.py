@@ -0,0 +1,162 @@
+# backend/app/services/vector_delta.py
+"""Vectors of articles ingested after an artifact version was built.
+
+An artifact version's embeddings.npy is immutable. Articles added later (bulk
+ingest, services/ingest.py) get their normalized embedding and topic appended to
+a per-version delta file instead:
+
+    NEWSPREP_VECTOR_DELTA_DIR/<version>/rows.bin     fixed-size records
+                                                     (int64 id, int64 topic, float32[D])
+    NEWSPREP_VECTOR_DELTA_DIR/<version>/meta.json    {"dim": D}
+
+The RAG store has its own delta of the same format under CHUNK_DIR: one record
+per text chunk (article id, chunk number, chunk embedding), written by the
+ingest job so no server process has to run the encoder to take the article in.
+
+Only whole records count, so a reader never sees a half-written row. Every
+process tails the file (sync(), at most once per SYNC_SECONDS) and the
+recommender, search and RAG store extend themselves with the new rows, so an
+ingested article is searchable everywhere within seconds and no index is
+rebuilt. The next published artifact version starts with an empty delta.
+"""
+import json
+import os
+import threading
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev servers only
+    fcntl = None
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+DELTA_DIR = os.path.abspath(os.getenv("NEWSPREP_VECTOR_DELTA_DIR", os.path.join(DATA_DIR, "vector_delta")))
+CHUNK_DIR = os.path.abspath(os.getenv("NEWSPREP_RAG_DELTA_DIR", os.path.join(DELTA_DIR, "rag_chunks")))
+SYNC_SECONDS = float(os.getenv("NEWSPREP_VECTOR_DELTA_SYNC_SECONDS", "1.0"))
+
+
+def _record_dtype(dim: int) -> np.dtype:
+    return np.dtype([("id", "<i8"), ("topic", "<i8"), ("vec", "<f4", (dim,))])
+
+
+class VectorDelta:
+    def __init__(self, version: str, directory: str = DELTA_DIR):
+        self.version = version
+        self.directory = os.path.join(directory, version)
+        self.path = os.path.join(self.directory, "rows.bin")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.dim: Optional[int] = None
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._buf = None          # amortized growth: views below are prefixes of it
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.topics = np.zeros(0, dtype=np.int64)
+        self.vectors: Optional[np.ndarray] = None
+
+    @property
+    def rows(self) -> int:
+        return len(self.ids)
+
+    def _read_dim(self) -> Optional[int]:
+        if self.dim is None and os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.dim = int(json.load(f)["dim"])
+        return self.dim
+
+    # -----------------------------------------------------------------
+    # Reading
+    # -----------------------------------------------------------------
+    def sync(self, force: bool = False) -> int:
+        """Pick up rows other processes appended; returns how many are new."""
+        now = time.monotonic()
+        if not force and now - self._checked < SYNC_SECONDS:
+            return 0
+        with self._lock:
+            self._checked = now
+            if not os.path.exists(self.path) or self._read_dim() is None:
+                return 0
+            dtype = _record_dtype(self.dim)
+            have = self.rows
+            total = os.path.getsize(self.path) // dtype.itemsize
+            if total <= have:
+                return 0
+            with open(self.path, "rb") as f:
+                f.seek(have * dtype.itemsize)
+                recs = np.fromfile(f, dtype=dtype, count=total - have)
+            self._extend(recs)
+            return len(recs)
+
+    def _extend(self, recs: np.ndarray):
+        n, m = self.rows, len(recs)
+        if self._buf is None or n + m > len(self._buf):
+            buf = np.empty(max(2 * (n + m), 1024), dtype=recs.dtype)
+            if self._buf is not None:
+                buf[:n] = self._buf[:n]
+            self._buf = buf
+        self._buf[n:n + m] = recs
+        view = self._buf[:n + m]
+        # vectors before ids: a reader going by len(ids) never indexes past the vectors
+        self.vectors = view["vec"]
+        self.topics = view["topic"]
+        self.ids = view["id"]
+
+    def since(self, start: int):
+        """(ids, topics, vectors) of the rows from `start` on."""
+        ids = self.ids
+        end = len(ids)
+        if start >= end:
+            return ids[:0], self.topics[:0], None
+        return ids[start:end], self.topics[start:end], self.vectors[start:end]
+
+    # -----------------------------------------------------------------
+    # Writing
+    # -----------------------------------------------------------------
+    def append(self, ids: Sequence[int], topics: Sequence[Optional[int]], vectors: np.ndarray) -> int:
+        """Append vectors; ids already in the delta are skipped. Returns rows written.
+
+        An id may repeat within one call (several chunks of one article).
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(ids):
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(os.path.join(self.directory, ".append.lock"), "w")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if self._read_dim() is None:
+                self.dim = vectors.shape[1]
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector width {vectors.shape[1]} does not match the delta's {self.dim}")
+            self.sync(force=True)
+            present = set(self.ids.tolist())
+            keep = [i for i, a in enumerate(ids) if int(a) not in present]
+            if not keep:
+                return 0
+            recs = np.zeros(len(keep), dtype=_record_dtype(self.dim))
+            recs["id"] = [int(ids[i]) for i in keep]
+            recs["topic"] = [-1 if topics[i] is None else int(topics[i]) for i in keep]
+            recs["vec"] = vectors[keep]
+            with open(self.path, "ab") as f:
+                # a torn tail from a crashed writer would shift every later record
+                f.truncate(f.tell() - f.tell() % recs.dtype.itemsize)
+                f.write(recs.tobytes())
+            self.sync(force=True)
+            return len(keep)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "rows": self.rows,
+            "dim": self.dim,
+            "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
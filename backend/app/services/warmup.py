@@ -0,0 +1,108 @@
+# backend/app/services/warmup.py
+"""Deferred model loading.
+
+Heavy components (BERTopic, sentence encoders, embeddings, the RAG store) register a
+loader here instead of loading at import or in a blocking startup hook. start()
+runs the loaders in a background thread once the app is up, so the port opens
+immediately and cheap endpoints (articles, topics catalog) serve right away.
+/readyz reports the per-component state.
+
+NEWSPREP_STARTUP_MODE=eager runs the loaders synchronously during startup (the old
+behaviour: the server only accepts traffic once everything is loaded).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+STARTUP_MODE = os.getenv("NEWSPREP_STARTUP_MODE", "lazy").lower()
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+DISABLED = "disabled"   # optional dependency missing; the feature degrades gracefully
+
+
+class ComponentDisabled(Exception):
+    """Raised by a loader when its feature is unavailable in this deployment."""
+
+
+class _Component:
+    def __init__(self, name: str, loader: Callable[[], None], required: bool):
+        self.name = name
+        self.loader = loader
+        self.required = required
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+
+    def run(self):
+        self.state = LOADING
+        t0 = time.perf_counter()
+        try:
+            self.loader()
+            self.state = READY
+        except ComponentDisabled as e:
+            self.state = DISABLED
+            self.error = str(e)
+        except Exception as e:
+            self.state = FAILED
+            self.error = str(e)
+            print(f"Warmup of '{self.name}' failed:", e)
+        self.seconds = round(time.perf_counter() - t0, 3)
+
+    def as_dict(self):
+        return {
+            "state": self.state,
+            "required": self.required,
+            "seconds": self.seconds,
+            "error": self.error,
+        }
+
+
+_components: "OrderedDict[str, _Component]" = OrderedDict()
+_thread: Optional[threading.Thread] = None
+_started_at = time.time()
+
+
+def register(name: str, loader: Callable[[], None], required: bool = True):
+    """Register a loader; components load in registration order."""
+    _components[name] = _Component(name, loader, required)
+
+
+def _run_all():
+    for comp in list(_components.values()):
+        if comp.state == PENDING:
+            comp.run()
+
+
+def start():
+    """Kick off loading (background thread unless STARTUP_MODE is eager)."""
+    global _thread
+    if STARTUP_MODE == "eager":
+        _run_all()
+        return
+    if _thread is not None:
+        return
+    _thread = threading.Thread(target=_run_all, name="warmup", daemon=True)
+    _thread.start()
+
+
+def preload():
+    """Run every pending loader in this thread (the prefork master, see server.py)."""
+    _run_all()
+
+
+def is_ready() -> bool:
+    return all(c.state in (READY, DISABLED) for c in _components.values() if c.required)
+
+
+def status() -> Dict[str, object]:
+    return {
+        "ready": is_ready(),
+        "mode": STARTUP_MODE,
+        "uptime_s": round(time.time() - _started_at, 3),
+        "components": {name: c.as_dict() for name, c in _components.items()},
+    }
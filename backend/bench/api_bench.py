@@ -0,0 +1,255 @@
+# backend/bench/api_bench.py
+"""End-to-end API benchmark on a synthetic corpus, fully offline.
+
+Builds a seeded corpus in a scratch directory (see corpus.py), installs the stub
+encoder and LLM (stubs.py), then drives every endpoint through the ASGI app
+in-process — first sequentially (latency without contention) and then from N
+concurrent client threads (throughput and tail latency under load).
+
+Run from the repository root:
+    python -m backend.bench.api_bench --articles 5000 --requests 200 --concurrency 8 --out bench.json
+    python -m backend.bench.api_bench --compare old.json --out new.json
+
+Results: per endpoint and phase p50/p95/p99/mean latency (ms), throughput (req/s)
+and error count, plus corpus sizes, setup times and peak RSS of the process.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _prepare_env(workdir: str, cache: bool):
+    # must happen before anything imports backend.app (engine + paths bind at import)
+    os.environ["NEWSPREP_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'news.db')}"
+    os.environ["NEWSPREP_ARTIFACTS_DIR"] = os.path.join(workdir, "artifacts")
+    os.environ["NEWSPREP_EVENTS_DIR"] = os.path.join(workdir, "events")
+    for name, sub in (("PROFILES", "profiles"), ("VECTOR_DELTA", "vector_delta"), ("CORPUS", "corpus")):
+        os.environ[f"NEWSPREP_{name}_DIR"] = os.path.join(workdir, sub)
+    os.environ["NEWSPREP_ANSWER_CACHE_PATH"] = os.path.join(workdir, "answer_cache.npz")
+    os.environ["NEWSPREP_STARTUP_MODE"] = "eager"
+    os.environ["NEWSPREP_CACHE"] = "on" if cache else "off"
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def _percentile(sorted_ms: List[float], p: float) -> Optional[float]:
+    if not sorted_ms:
+        return None
+    k = (len(sorted_ms) - 1) * p / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(sorted_ms) - 1)
+    return round(sorted_ms[lo] + (sorted_ms[hi] - sorted_ms[lo]) * (k - lo), 3)
+
+
+def _summarize(latencies_ms: List[float], errors: int, wall_s: float) -> dict:
+    lat = sorted(latencies_ms)
+    n = len(lat)
+    return {
+        "requests": n,
+        "errors": errors,
+        "p50_ms": _percentile(lat, 50),
+        "p95_ms": _percentile(lat, 95),
+        "p99_ms": _percentile(lat, 99),
+        "mean_ms": round(sum(lat) / n, 3) if n else None,
+        "throughput_rps": round(n / wall_s, 1) if wall_s > 0 else None,
+    }
+
+
+# -------------------------------------------------------------------
+# Scenarios
+# -------------------------------------------------------------------
+def _scenarios(info: dict) -> Dict[str, Callable]:
+    """name -> fn(client, rng) issuing one request and returning the response."""
+    terms, aids, tids = info["query_terms"], info["article_ids"], info["topic_ids"]
+    users = max(1, info.get("users") or 1)
+
+    return {
+        "articles.list": lambda c, r: c.get("/api/articles/", params={"limit": 50}),
+        "articles.list_fields": lambda c, r: c.get("/api/articles/", params={"limit": 50, "fields": "id,title"}),
+        "topics.list": lambda c, r: c.get("/api/topics/"),
+        "topics.detail": lambda c, r: c.get(f"/api/topics/{r.choice(tids)}", params={"limit": 20}),
+        "topics.related": lambda c, r: c.get(f"/api/topics/{r.choice(tids)}/related"),
+        "search.split": lambda c, r: c.get("/api/search", params={"q": r.choice(terms), "k": 10}),
+        "search.rrf": lambda c, r: c.get("/api/search", params={"q": r.choice(terms), "k": 10, "mode": "rrf"}),
+        "recommend.article": lambda c, r: c.get(f"/api/recommend/article/{r.choice(aids)}"),
+        "recommend.topic": lambda c, r: c.get(f"/api/recommend/topic/{r.choice(tids)}"),
+        "recommend.hybrid": lambda c, r: c.get(f"/api/recommend/hybrid/article/{r.choice(aids)}"),
+        "events.post": lambda c, r: c.post("/api/events/", json={
+            "user_id": r.randint(1, users), "event": r.choice(["view", "like", "bookmark"]),
+            "item_id": r.choice(aids),
+        }),
+        "ask": lambda c, r: c.post("/api/ask", json={"query": f"what happened with {r.choice(terms)}"}),
+    }
+
+
+def _run_sequential(client, fn, n: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    lat, errors = [], 0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        s = time.perf_counter()
+        resp = fn(client, rng)
+        lat.append((time.perf_counter() - s) * 1000)
+        errors += resp.status_code >= 400
+    return _summarize(lat, errors, time.perf_counter() - t0)
+
+
+def _run_concurrent(client, fn, n: int, concurrency: int, seed: int) -> dict:
+    lat: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(wid: int, count: int):
+        rng = random.Random(seed * 1000 + wid)
+        local, bad = [], 0
+        for _ in range(count):
+            s = time.perf_counter()
+            resp = fn(client, rng)
+            local.append((time.perf_counter() - s) * 1000)
+            bad += resp.status_code >= 400
+        with lock:
+            lat.extend(local)
+            errors[0] += bad
+
+    per = [n // concurrency + (1 if i < n % concurrency else 0) for i in range(concurrency)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency), per))
+    return _summarize(lat, errors[0], time.perf_counter() - t0)
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(args) -> dict:
+    workdir = args.workdir or tempfile.mkdtemp(prefix="newsprep-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    _prepare_env(workdir, cache=args.cache)
+
+    # imports only after the environment points at the scratch corpus
+    from backend.bench import stubs
+    from backend.bench.corpus import build_corpus
+
+    t0 = time.perf_counter()
+    info = build_corpus(workdir, n_articles=args.articles, n_topics=args.topics, n_events=args.events, seed=args.seed)
+    corpus_s = time.perf_counter() - t0
+
+    stubs.install(encoder_latency_ms=args.encoder_latency_ms, llm_latency_ms=args.llm_latency_ms)
+
+    from fastapi.testclient import TestClient
+    from backend.app.main import app
+
+    t0 = time.perf_counter()
+    results: Dict[str, dict] = {}
+    with TestClient(app) as client:
+        startup_s = time.perf_counter() - t0
+        scenarios = _scenarios(info)
+        selected = [s for s in scenarios if not args.only or any(s.startswith(o) for o in args.only)]
+        for name in selected:
+            fn = scenarios[name]
+            # one untimed call: lazy loads and probe whether the endpoint works here at all
+            try:
+                probe = fn(client, random.Random(args.seed))
+            except Exception as e:
+                results[name] = {"skipped": f"{type(e).__name__}: {e}"}
+                print(f"{name:<22} skipped ({type(e).__name__})")
+                continue
+            if probe.status_code >= 500:
+                results[name] = {"skipped": f"HTTP {probe.status_code}: {probe.text[:200]}"}
+                print(f"{name:<22} skipped (HTTP {probe.status_code})")
+                continue
+            for _ in range(args.warmup):
+                fn(client, random.Random(args.seed))
+
+            seq = _run_sequential(client, fn, args.requests, args.seed)
+            conc = _run_concurrent(client, fn, args.requests, args.concurrency, args.seed)
+            results[name] = {"sequential": seq, "concurrent": conc}
+            print(f"{name:<22} seq p50 {seq['p50_ms']:>8.2f} ms  p99 {seq['p99_ms']:>8.2f} ms | "
+                  f"x{args.concurrency} p50 {conc['p50_ms']:>8.2f} ms  p99 {conc['p99_ms']:>8.2f} ms  "
+                  f"{conc['throughput_rps']:>8.1f} req/s  err {seq['errors'] + conc['errors']}")
+
+    return {
+        "meta": {
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "workdir": workdir,
+            "args": vars(args),
+        },
+        "corpus": {k: info[k] for k in ("articles", "topics", "events", "users", "embedding_dim")},
+        "setup": {"corpus_s": round(corpus_s, 3), "startup_s": round(startup_s, 3)},
+        "peak_rss_mb": _peak_rss_mb(),
+        "endpoints": results,
+    }
+
+
+def compare(old: dict, new: dict):
+    """Print p50/p99/throughput change per endpoint between two result files."""
+    print(f"\n{'endpoint':<22} {'phase':<11} {'p50 ms':>17} {'p99 ms':>17} {'req/s':>17}")
+    for name, cur in new["endpoints"].items():
+        prev = old.get("endpoints", {}).get(name)
+        if not prev or "skipped" in cur or "skipped" in prev:
+            continue
+        for phase in ("sequential", "concurrent"):
+            a, b = prev[phase], cur[phase]
+
+            def delta(key):
+                if not a.get(key) or b.get(key) is None:
+                    return f"{b.get(key)!s:>17}"
+                return f"{b[key]:>9.2f} ({(b[key] - a[key]) / a[key] * 100:+5.1f}%)"
+
+            print(f"{name:<22} {phase:<11} {delta('p50_ms')} {delta('p99_ms')} {delta('throughput_rps')}")
+    print(f"peak RSS: {old.get('peak_rss_mb')} -> {new.get('peak_rss_mb')} MB")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--articles", type=int, default=5000)
+    ap.add_argument("--topics", type=int, default=40)
+    ap.add_argument("--events", type=int, default=20000)
+    ap.add_argument("--requests", type=int, default=200, help="requests per endpoint and phase")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--warmup", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--encoder-latency-ms", type=float, default=0.0)
+    ap.add_argument("--llm-latency-ms", type=float, default=0.0)
+    ap.add_argument("--cache", action="store_true", help="keep the response cache on (off by default)")
+    ap.add_argument("--only", nargs="*", help="endpoint name prefixes, e.g. search recommend")
+    ap.add_argument("--workdir", help="scratch directory (default: a new temp dir); must not hold a corpus")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--compare", help="previous results JSON to diff against")
+    args = ap.parse_args()
+
+    result = run(args)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print("Saved", args.out)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# backend/bench/corpus.py
+"""Synthetic corpus for benchmarks.
+
+build_corpus(workdir, n_articles, n_topics, n_events) writes, under workdir:
+
+    news.db                      SQLite DB with articles, users, stats, interactions
+    artifacts/CURRENT            -> "bench"
+    artifacts/bench/manifest.json
+    artifacts/bench/embeddings.npy, article_ids.npy, corpus.csv
+
+Articles are drawn from per-topic vocabularies so keyword search, topic centroids
+and recommendations behave like they do on real data (clustered, not uniform).
+Embeddings come from the stub encoder, so query-time encodings are consistent with
+the stored ones. Everything is seeded: the same arguments give the same corpus.
+"""
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backend.bench.stubs import StubEncoder
+
+_COMMON = ("the a of to in and for on with at by from said new year government "
+           "people report week city country officials market plan").split()
+
+
+def _vocab(rng, n_topics: int, words_per_topic: int = 40):
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    return [
+        ["".join(rng.choice(letters, size=rng.integers(4, 10))) for _ in range(words_per_topic)]
+        for _ in range(n_topics)
+    ]
+
+
+def _text(rng, words, n_words: int) -> str:
+    topical = rng.choice(words, size=n_words // 2)
+    common = rng.choice(_COMMON, size=n_words - n_words // 2)
+    toks = np.concatenate([topical, common])
+    rng.shuffle(toks)
+    sentences = [" ".join(toks[i:i + 12]).capitalize() for i in range(0, len(toks), 12)]
+    return ". ".join(sentences) + "."
+
+
+def build_corpus(workdir: str, n_articles: int = 5000, n_topics: int = 40, n_events: int = 20000,
+                 seed: int = 7) -> dict:
+    """Create the corpus; returns paths and sizes. Requires NEWSPREP_DATABASE_URL to
+    already point at workdir/news.db (the app's engine is bound at import)."""
+    from backend.app.db.init_db import init_db
+    from backend.app.db.session import engine
+    from backend.app.db.models.article import Article
+    from backend.app.db.models.article_stats import ArticleStats
+    from backend.app.db.models.interaction import UserInteraction
+    from backend.app.db.models.user import User
+
+    rng = np.random.default_rng(seed)
+    vocab = _vocab(rng, n_topics)
+    topics = rng.integers(0, n_topics, size=n_articles)
+    # ~3% outliers, like BERTopic's -1
+    topics[rng.random(n_articles) < 0.03] = -1
+    start = datetime(2024, 1, 1)
+
+    rows = []
+    for i in range(n_articles):
+        t = int(topics[i])
+        words = vocab[t] if t >= 0 else vocab[int(rng.integers(0, n_topics))]
+        rows.append({
+            "id": i + 1,
+            "title": _text(rng, words, 10).rstrip("."),
+            "text": _text(rng, words, int(rng.integers(120, 400))),
+            "published_date": start + timedelta(minutes=int(rng.integers(0, 60 * 24 * 365))),
+            "topic_id": t,
+        })
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(Article.__table__.insert(), rows)
+        conn.execute(ArticleStats.__table__.insert(), [
+            {"article_id": r["id"], "views": int(v), "likes": int(v // 10), "bookmarks": int(v // 25)}
+            for r, v in zip(rows, rng.poisson(50, size=n_articles))
+        ])
+        if n_events:
+            n_users = max(1, n_events // 20)
+            conn.execute(User.__table__.insert(), [
+                {"id": u, "name": f"user{u}", "email": f"user{u}@example.invalid"} for u in range(1, n_users + 1)
+            ])
+            ids = rng.integers(1, n_articles + 1, size=n_events)
+            users = rng.integers(1, n_users + 1, size=n_events)
+            kinds = rng.choice(["view", "view", "view", "like", "bookmark"], size=n_events)
+            conn.execute(UserInteraction.__table__.insert(), [
+                {"user_id": int(u), "article_id": int(a), "event_type": str(k),
+                 "timestamp": start + timedelta(seconds=int(j) * 30)}
+                for j, (a, u, k) in enumerate(zip(ids, users, kinds))
+            ])
+
+    # artifacts: embeddings from the same stub encoder the API will use
+    vdir = os.path.join(workdir, "artifacts", "bench")
+    os.makedirs(vdir, exist_ok=True)
+    enc = StubEncoder()
+    emb = np.concatenate([
+        enc.encode([r["text"] for r in rows[i:i + 512]]) for i in range(0, n_articles, 512)
+    ]).astype(np.float32)
+    np.save(os.path.join(vdir, "embeddings.npy"), emb)
+    np.save(os.path.join(vdir, "article_ids.npy"), np.array([r["id"] for r in rows], dtype=np.int64))
+
+    with open(os.path.join(vdir, "corpus.csv"), "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["id", "title", "text", "bertopic_topic", "source", "url", "published"])
+        for r in rows:
+            w.writerow([r["id"], r["title"], r["text"], r["topic_id"], "bench",
+                        f"https://example.invalid/{r['id']}", r["published_date"].isoformat()])
+
+    with open(os.path.join(vdir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "embeddings": "embeddings.npy",
+            "article_ids": "article_ids.npy",
+            "corpus_csv": "corpus.csv",
+            "topic_models": {"global": "bertopic_global", "india_global": "bertopic_india_global"},
+        }, f, indent=2)
+    with open(os.path.join(workdir, "artifacts", "CURRENT"), "w", encoding="utf-8") as f:
+        f.write("bench\n")
+
+    # handy query terms: a few topical words that are guaranteed to match
+    return {
+        "articles": n_articles,
+        "topics": n_topics,
+        "events": n_events,
+        "embedding_dim": int(emb.shape[1]),
+        "query_terms": [vocab[t][0] for t in range(min(n_topics, 20))],
+        "article_ids": [r["id"] for r in rows[:: max(1, n_articles // 50)]],
+        "topic_ids": list(range(min(n_topics, 20))),
+        "users": max(1, n_events // 20) if n_events else 0,
+    }
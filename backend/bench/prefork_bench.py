@@ -0,0 +1,224 @@
+# backend/bench/prefork_bench.py
+"""Throughput and memory of the prefork server (backend/app/server.py) by worker count.
+
+Builds the synthetic corpus once (see corpus.py), then for every --workers value
+starts a real server process with the stub encoder and LLM preloaded, drives the
+api_bench scenarios over keep-alive HTTP from --concurrency client threads, and
+records throughput/latency per endpoint plus the memory of the whole process tree:
+RSS counts shared pages once per process, PSS splits them between the processes
+sharing them, so summed PSS is the real footprint.
+
+Run from the repository root:
+    python -m backend.bench.prefork_bench --articles 20000 --workers 1 2 4 --concurrency 8 --out prefork.json
+
+Throughput can only scale up to the number of cores; the client threads run on
+the same machine and take their share too.
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlencode
+
+from backend.bench.api_bench import REPO_ROOT, _prepare_env, _run_concurrent, _scenarios
+from backend.bench.startup_bench import _free_port, _get
+
+DEFAULT_ONLY = ("search.split", "recommend.article", "topics.related")
+
+
+class _Response:
+    __slots__ = ("status_code",)
+
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+class HttpClient:
+    """The slice of TestClient the scenarios use, over one keep-alive connection per thread."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self._local = threading.local()
+
+    def _request(self, method: str, path: str, params=None, body=None) -> _Response:
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=120)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            return _Response(resp.status)
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self._local.conn = None
+            return _Response(599)
+
+    def get(self, path: str, params=None) -> _Response:
+        return self._request("GET", path, params=params)
+
+    def post(self, path: str, json=None) -> _Response:
+        import json as _json
+        return self._request("POST", path, body=_json.dumps(json).encode("utf-8"))
+
+
+def _tree_pids(pid: int) -> List[int]:
+    out, todo = [], [pid]
+    while todo:
+        p = todo.pop()
+        out.append(p)
+        try:
+            with open(f"/proc/{p}/task/{p}/children", "r") as f:
+                todo.extend(int(c) for c in f.read().split())
+        except OSError:
+            pass
+    return out
+
+
+def tree_memory(pid: int) -> dict:
+    """Summed RSS and PSS (MB) of a process and its descendants (Linux /proc)."""
+    rss = pss = 0
+    pids = _tree_pids(pid)
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/smaps_rollup", "r") as f:
+                for line in f:
+                    if line.startswith("Rss:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+        except OSError:
+            continue
+    return {"processes": len(pids), "rss_mb": round(rss / 1024, 1), "pss_mb": round(pss / 1024, 1)}
+
+
+def _start_server(port: int, workers: int, args) -> subprocess.Popen:
+    code = (
+        "from backend.bench import stubs; "
+        f"stubs.install(encoder_latency_ms={args.encoder_latency_ms}, llm_latency_ms={args.llm_latency_ms}); "
+        "from backend.app import server; server.main()"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return subprocess.Popen(
+        [sys.executable, "-c", code, "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env,
+        stdout=None if args.verbose else subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+
+
+def _wait_ready(proc: subprocess.Popen, port: int, timeout: float) -> float:
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        if _get(f"http://127.0.0.1:{port}/readyz") == 200:
+            return round(time.perf_counter() - t0, 3)
+        time.sleep(0.1)
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+def measure(workers: int, info: dict, args) -> dict:
+    port = _free_port()
+    proc = _start_server(port, workers, args)
+    try:
+        ready_s = _wait_ready(proc, port, args.timeout)
+        client = HttpClient(port)
+        scenarios = _scenarios(info)
+        names = [n for n in scenarios if any(n.startswith(o) for o in args.only)]
+        idle = tree_memory(proc.pid)
+        results: Dict[str, dict] = {}
+        for name in names:
+            fn = scenarios[name]
+            _run_concurrent(client, fn, args.warmup * args.concurrency, args.concurrency, args.seed)
+            results[name] = _run_concurrent(client, fn, args.requests, args.concurrency, args.seed)
+            r = results[name]
+            print(f"workers={workers:<3} {name:<20} p50 {r['p50_ms']:>8.2f} ms  p99 {r['p99_ms']:>8.2f} ms "
+                  f"{r['throughput_rps']:>8.1f} req/s  err {r['errors']}")
+        loaded = tree_memory(proc.pid)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return {"workers": workers, "ready_s": ready_s, "memory_idle": idle, "memory_loaded": loaded,
+            "endpoints": results}
+
+
+def run(args) -> dict:
+    workdir = args.workdir or tempfile.mkdtemp(prefix="newsprep-prefork-")
+    os.makedirs(workdir, exist_ok=True)
+    _prepare_env(workdir, cache=False)
+    # one cache directory for every worker, as the server would pick in production
+    os.environ["NEWSPREP_CACHE_DIR"] = os.path.join(workdir, "response_cache")
+
+    from backend.bench.corpus import build_corpus
+    info = build_corpus(workdir, n_articles=args.articles, n_topics=args.topics, n_events=args.events,
+                        seed=args.seed)
+
+    runs = [measure(w, info, args) for w in args.workers]
+    return {
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "corpus": {k: info[k] for k in ("articles", "topics", "events", "users", "embedding_dim")},
+        "concurrency": args.concurrency,
+        "runs": runs,
+    }
+
+
+def report(result: dict):
+    base = result["runs"][0]
+    print(f"\n{'workers':>7} {'endpoint':<20} {'req/s':>9} {'scale':>6} {'p99 ms':>9} "
+          f"{'PSS MB':>8} {'RSS MB':>8}")
+    for run in result["runs"]:
+        mem = run["memory_loaded"]
+        for name, r in run["endpoints"].items():
+            b = base["endpoints"].get(name, {}).get("throughput_rps")
+            scale = f"{r['throughput_rps'] / b:.2f}x" if b else "-"
+            print(f"{run['workers']:>7} {name:<20} {r['throughput_rps']:>9.1f} {scale:>6} {r['p99_ms']:>9.2f} "
+                  f"{mem['pss_mb']:>8.1f} {mem['rss_mb']:>8.1f}")
+    print(f"({result['cpus']} CPU(s); PSS/RSS summed over master and workers after the run)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--articles", type=int, default=20000)
+    ap.add_argument("--topics", type=int, default=40)
+    ap.add_argument("--events", type=int, default=2000)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--requests", type=int, default=400, help="requests per endpoint and worker count")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--warmup", type=int, default=3, help="untimed requests per client thread")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--encoder-latency-ms", type=float, default=0.0)
+    ap.add_argument("--llm-latency-ms", type=float, default=0.0)
+    ap.add_argument("--only", nargs="*", default=list(DEFAULT_ONLY), help="endpoint name prefixes")
+    ap.add_argument("--timeout", type=float, default=300.0, help="seconds to wait for /readyz")
+    ap.add_argument("--workdir", help="scratch directory (default: a new temp dir); must not hold a corpus")
+    ap.add_argument("--verbose", action="store_true", help="show server output")
+    ap.add_argument("--out", help="write results JSON here")
+    args = ap.parse_args()
+
+    result = run(args)
+    report(result)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print("Saved", args.out)
+
+
+if __name__ == "__main__":
+    main()
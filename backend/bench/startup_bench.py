@@ -0,0 +1,144 @@
+# backend/bench/startup_bench.py
+"""Import-time and cold-start benchmark for the API.
+
+Measures, in fresh interpreters:
+  - import time of backend.app.main (wall clock and -X importtime cumulative)
+  - time from process spawn until /healthz, /api/articles/ and /readyz answer 200
+
+Run from the repository root:
+    python -m backend.bench.startup_bench --runs 3 --out startup.json
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def measure_import(module: str = "backend.app.main") -> dict:
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=_env(), capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+
+    # "import time: self [us] | cumulative | imported package"
+    cumulative_us = None
+    top = []
+    for line in proc.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if not m:
+            continue
+        self_us, cum_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        if name == module and len(indent) == 1:
+            cumulative_us = cum_us
+        top.append((self_us, name))
+    top.sort(reverse=True)
+
+    return {
+        "wall_s": round(wall, 3),
+        "import_s": round((cumulative_us or 0) / 1e6, 3),
+        "heaviest_self": [{"module": n, "self_ms": round(us / 1e3, 1)} for us, n in top[:10]],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=2) as r:
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except Exception:
+        return 0
+
+
+def measure_startup(timeout: float = 120.0, mode: str = "lazy") -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = _env()
+    env["NEWSPREP_STARTUP_MODE"] = mode
+
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    marks = {"healthz_s": None, "articles_s": None, "readyz_s": None}
+    paths = {"healthz_s": "/healthz", "articles_s": "/api/articles/?limit=20", "readyz_s": "/readyz"}
+    try:
+        while time.perf_counter() - t0 < timeout and None in marks.values():
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with code {proc.returncode}")
+            for key, path in paths.items():
+                if marks[key] is None and _get(base + path) == 200:
+                    marks[key] = round(time.perf_counter() - t0, 3)
+            time.sleep(0.02)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return marks
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--mode", choices=["lazy", "eager"], default="lazy")
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--skip-server", action="store_true", help="only measure import time")
+    ap.add_argument("--out", help="write results as JSON to this path")
+    args = ap.parse_args(argv)
+
+    imports = [measure_import() for _ in range(args.runs)]
+    result = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "mode": args.mode,
+        "import": {
+            "wall_s_median": statistics.median(r["wall_s"] for r in imports),
+            "import_s_median": statistics.median(r["import_s"] for r in imports),
+            "heaviest_self": imports[-1]["heaviest_self"],
+        },
+    }
+
+    if not args.skip_server:
+        starts = [measure_startup(args.timeout, args.mode) for _ in range(args.runs)]
+        result["startup"] = {
+            key: (statistics.median(v for v in vals if v is not None) if any(v is not None for v in vals) else None)
+            for key, vals in ((k, [s[k] for s in starts]) for k in starts[0])
+        }
+        result["startup_runs"] = starts
+
+    print(json.dumps(result, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# backend/bench/stubs.py
+"""Deterministic stand-ins for the sentence encoder and the Ollama LLM.
+
+They are installed into the model registry under the real keys, so every service
+that asks the registry for "sentence-transformers/all-MiniLM-L6-v2" or "llama3.1"
+gets the stub without any code path knowing about benchmarks. Nothing here
+touches the network.
+"""
+import hashlib
+import time
+
+import numpy as np
+
+from backend.app.services import model_registry
+
+DIM = 384
+
+
+def _token_vector(token: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+class StubEncoder:
+    """Bag-of-hashed-tokens embeddings: same text -> same vector, shared words -> similar vectors."""
+
+    def __init__(self, dim: int = DIM, latency_ms: float = 0.0):
+        self.dim = dim
+        self.latency_ms = latency_ms
+        self._cache = {}
+
+    def _vec(self, token: str) -> np.ndarray:
+        v = self._cache.get(token)
+        if v is None:
+            v = self._cache[token] = _token_vector(token, self.dim)
+        return v
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0 * max(1, len(texts) // batch_size))
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for tok in str(text).lower().split()[:256]:
+                out[i] += self._vec(tok)
+        return out
+
+
+class StubLLM:
+    """Echoes a short, stable answer; optional fixed latency to mimic a local model."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def invoke(self, prompt, **kwargs) -> str:
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        digest = hashlib.sha1(str(prompt).encode("utf-8")).hexdigest()[:8]
+        return f"Stub answer {digest}: the context mentions the requested topic."
+
+    __call__ = invoke
+
+    def predict(self, text, **kwargs) -> str:
+        return self.invoke(text)
+
+
+def install(encoder_latency_ms: float = 0.0, llm_latency_ms: float = 0.0):
+    """Pin the stubs in the registry (one held reference each, never released)."""
+    encoder = model_registry.registry.acquire(
+        "encoder", model_registry.encoder_key(model_registry.DEFAULT_ENCODER),
+        lambda: StubEncoder(latency_ms=encoder_latency_ms),
+    )
+    llm = model_registry.registry.acquire(
+        "llm", model_registry.DEFAULT_LLM, lambda: StubLLM(latency_ms=llm_latency_ms),
+    )
+    return encoder, llm
@@ -1,3 +1,6 @@
 #!/bin/bash
-cd /app/backend
-python -m uvicorn app.main:app --host 0.0.0.0 --port $PORT
\ No newline at end of file
+cd /app
+# NEWSPREP_WORKERS=N (N <= the container's CPU quota) preforks N workers: more throughput,
+# but the port opens only once every model is loaded and RSS grows with N. Unset, one
+# process serves at once and warms up in the background (backend/app/server.py).
+python -m backend.app.server --host 0.0.0.0 --port $PORT
\ No newline at end of file
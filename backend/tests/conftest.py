@@ -0,0 +1,30 @@
+# backend/tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# must be set before backend.app.db.session is imported anywhere
+_TMP = tempfile.mkdtemp(prefix="newsprep-tests-")
+os.environ["NEWSPREP_DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    from backend.app.db.init_db import init_db
+    init_db()
+
+
+@pytest.fixture
+def db():
+    from backend.app.db.session import SessionLocal
+    from backend.app.db.models.article import Article
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.query(Article).delete()
+        session.commit()
+        session.close()
@@ -0,0 +1,36 @@
+import numpy as np
+from sqlalchemy import update
+
+from backend.app.db.models.article import Article
+from backend.app.services.answer_cache import AnswerCache, article_revisions, source_key
+
+
+def test_entries_follow_the_revisions_of_their_sources(db, tmp_path):
+    cited, other = Article(title="cited", text="x"), Article(title="other", text="y")
+    db.add_all([cited, other])
+    db.commit()
+    cache = AnswerCache(max_entries=4, path=str(tmp_path / "answers.npz"))
+    sources = source_key([cited.id])
+    vec = np.array([1.0, 0.0], dtype=np.float32)
+    cache.store("q", vec, sources, "h", article_revisions(sources), {"answer": "a"})
+
+    # writes to other articles, by any process, leave the entry alone
+    db.execute(update(Article).where(Article.id == other.id).values(summary="s"))
+    db.commit()
+    assert cache.lookup(vec, sources, "h", article_revisions(sources))["answer"] == "a"
+
+    # so does a restart: the saved entry is checked against the DB when looked up
+    cache.save()
+    reloaded = AnswerCache(max_entries=4, path=str(tmp_path / "answers.npz"))
+    reloaded.load()
+
+    db.execute(update(Article).where(Article.id == cited.id).values(text="edited"))
+    db.commit()
+    assert reloaded.lookup(vec, sources, "h", article_revisions(sources)) is None
+    assert reloaded.stats()["entries"] == 0
+
+    db.delete(cited)
+    db.commit()
+    assert article_revisions(sources) == (None,)
+    cache.store("q", vec, sources, "h", article_revisions(sources), {"answer": "gone"})
+    assert cache.stats()["stores"] == 1
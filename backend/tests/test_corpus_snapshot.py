@@ -0,0 +1,48 @@
+import numpy as np
+
+from backend.app.db.models.article import Article
+from backend.app.services.corpus_snapshot import CorpusSnapshot
+
+
+def _snapshot(db, tmp_path):
+    arts = [Article(title=f"t{i}", text=f"body {i}", topic_id=i % 2, source="BBC", url=f"http://x/{i}")
+            for i in range(4)]
+    db.add_all(arts)
+    db.commit()
+    ids_path = str(tmp_path / "ids.npy")
+    np.save(ids_path, np.array([a.id for a in arts], dtype=np.int64))
+    snap = CorpusSnapshot("test", ids_path, directory=str(tmp_path / "corpus"))
+    return snap, arts, ids_path
+
+
+def test_rows_carry_source_and_url(db, tmp_path):
+    snap, arts, _ = _snapshot(db, tmp_path)
+    try:
+        row = snap.row(1)
+        assert (row["id"], row["source"], row["url"]) == (arts[1].id, "BBC", "http://x/1")
+    finally:
+        snap.close()
+
+
+def test_overlay_log_is_appended_and_tailed(db, tmp_path):
+    snap, arts, ids_path = _snapshot(db, tmp_path)
+    reader = CorpusSnapshot("test", ids_path, directory=str(tmp_path / "corpus"), build=False)
+    try:
+        arts[1].url = "http://y/1"
+        arts[2].title = "changed"
+        db.commit()
+        assert snap.apply_changes([arts[1].id, arts[2].id, arts[3].id]) == 2  # arts[3] is unchanged
+
+        reader.refresh(force=True)
+        assert reader.row(1)["url"] == "http://y/1"
+        assert reader.row(2)["title"] == "changed"
+
+        arts[2].title = "t2"  # back to the snapshot's value
+        db.commit()
+        assert snap.apply_changes([arts[2].id]) == 3
+        reader.refresh(force=True)
+        assert reader.row(2)["title"] == "t2"
+        assert set(reader.overlay) == {arts[1].id}
+    finally:
+        reader.close()
+        snap.close()
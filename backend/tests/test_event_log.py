@@ -0,0 +1,80 @@
+import fcntl
+import json
+import os
+import subprocess
+import sys
+
+from datetime import datetime, timedelta, timezone
+
+from backend.app.services import event_log
+from backend.app.services.event_log import EventLog, iter_lines, list_segments, read_block
+
+T0 = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def _orphan(directory, n):
+    path = os.path.join(directory, f"events-20260101T120000-{_dead_pid()}-000001.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({"i": i, "ts": "2026-01-01T12:00:00"}) + "\n")
+    return path
+
+
+def test_orphan_held_by_another_sealer_is_skipped(tmp_path):
+    path = _orphan(str(tmp_path), 5)
+
+    # another worker is sealing it: this one must not touch the file
+    with open(path, "rb") as held:
+        fcntl.flock(held, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        EventLog(str(tmp_path)).close()
+        assert os.path.exists(path)
+        assert not os.path.exists(path + ".gz")
+
+    EventLog(str(tmp_path)).close()
+    assert not os.path.exists(path)
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
+    sealed = [s for s in list_segments(str(tmp_path)) if s["index"]]
+    assert [s["path"] for s in sealed] == [path + ".gz"]
+    assert [json.loads(l)["i"] for l in iter_lines(path + ".gz")] == list(range(5))
+
+
+def test_sealed_segments_replay_every_event_by_block(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_log, "BLOCK_EVENTS", 3)
+    log = EventLog(str(tmp_path))
+    for i in range(10):
+        if i == 7:
+            log.rotate()
+        log.append({"i": i, "ts": (T0 + timedelta(seconds=i)).isoformat()})
+    log.close()
+
+    segments = list_segments(str(tmp_path))
+    assert len(segments) == 2 and all(s["index"] for s in segments)
+    assert [s["index"]["events"] for s in segments] == [7, 3]
+    assert [len(s["index"]["blocks"]) for s in segments] == [3, 1]
+    assert segments[0]["index"]["ts_min"] == T0.timestamp()
+    assert segments[1]["index"]["ts_max"] == (T0 + timedelta(seconds=9)).timestamp()
+
+    replayed = []
+    for seg in segments:
+        for b in seg["index"]["blocks"]:
+            lines = read_block(seg["path"], b["offset"], b["length"]).splitlines()
+            assert len(lines) == b["events"]
+            assert b["ts_min"] <= b["ts_max"]
+            replayed += [json.loads(l)["i"] for l in lines]
+        # the whole file is one ordinary gzip stream as well
+        assert len(list(iter_lines(seg["path"]))) == seg["index"]["events"]
+    assert replayed == list(range(10))
+
+
+def test_orphan_with_a_torn_last_write_keeps_its_complete_lines(tmp_path):
+    path = _orphan(str(tmp_path), 4)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"i": 4, "ts"')
+    EventLog(str(tmp_path)).close()
+    assert [json.loads(l)["i"] for l in iter_lines(path + ".gz")] == [0, 1, 2, 3]
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from backend.app.db.models.feed import UserFeed
+from backend.app.services import feeds
+from backend.app.services.feeds import CursorExpired, UnknownUser, pack
+
+USER = 900001
+
+
+def _ranking(ids):
+    return pack(np.asarray(ids), np.linspace(1.0, 0.5, len(ids)))
+
+
+def _rewrite(db, ids):
+    """What a rebuild or a merge does to the row."""
+    t = UserFeed.__table__
+    id_bytes, score_bytes = _ranking(ids)
+    db.execute(t.update().where(t.c.user_id == USER)
+               .values(item_ids=id_bytes, scores=score_bytes, **feeds._ROTATE))
+    db.commit()
+
+
+@pytest.fixture
+def feed(db):
+    id_bytes, score_bytes = _ranking([1, 2, 3, 4, 5])
+    db.execute(UserFeed.__table__.insert(), [{"user_id": USER, "item_ids": id_bytes, "scores": score_bytes,
+                                              "built_at": 0.0, "revision": 1}])
+    db.commit()
+    yield db
+    db.query(UserFeed).filter(UserFeed.user_id == USER).delete()
+    db.commit()
+
+
+def test_cursor_finishes_on_the_ranking_it_started_with(feed):
+    first = feeds.read_page(USER, 0, 2)
+    assert (first["ids"], first["revision"], first["total"]) == ([1, 2], 1, 5)
+
+    _rewrite(feed, [9, 8, 3, 2, 1, 7])
+    rest = feeds.read_page(USER, 2, 3, revision=first["revision"])
+    assert rest["ids"] == [3, 4, 5]
+    assert not rest["current"] and rest["revision"] == 1
+    latest = feeds.read_page(USER, 0, 2)
+    assert (latest["ids"], latest["revision"], latest["current"]) == ([9, 8], 2, True)
+
+
+def test_cursor_older_than_two_rewrites_is_rejected(feed):
+    _rewrite(feed, [6, 7])
+    _rewrite(feed, [8, 9])
+    assert feeds.read_page(USER, 0, 2, revision=2)["ids"] == [6, 7]
+    with pytest.raises(CursorExpired):
+        feeds.read_page(USER, 2, 2, revision=1)
+
+
+def test_unknown_users_and_cursors_without_a_feed(db):
+    with pytest.raises(UnknownUser):
+        feeds.get_page(USER + 1)
+    with pytest.raises(CursorExpired):
+        feeds.get_page(USER + 1, offset=20, revision=3)
@@ -0,0 +1,60 @@
+import math
+import threading
+
+from backend.app.services.hybrid_search import hybrid_search, rrf_fuse, weighted_fuse
+
+
+class _Service:
+    def __init__(self, keyword, semantic, release=None):
+        self.keyword, self.semantic, self.release = keyword, semantic, release
+
+    def has_embeddings(self):
+        return True
+
+    def keyword_search(self, q, top_k):
+        return [{"id": i, "title": f"k{i}"} for i in self.keyword[:top_k]]
+
+    def semantic_search(self, q, top_k):
+        if self.release is not None:
+            self.release.wait(5)  # a cold encoder
+        return [{"id": i, "title": f"s{i}", "score": s} for i, s in self.semantic[:top_k]]
+
+
+def test_rrf_sums_weighted_reciprocal_ranks():
+    lists = {"keyword": [{"id": 1}, {"id": 2}], "semantic": [{"id": 2}, {"id": 3}]}
+    fused = rrf_fuse(lists, {"keyword": 0.5, "semantic": 0.5}, k=60)
+    assert math.isclose(fused[2], 0.5 / 62 + 0.5 / 61)
+    assert math.isclose(fused[1], 0.5 / 61)
+    assert max(fused, key=fused.get) == 2
+
+
+def test_weighted_normalizes_each_list_and_ignores_non_finite_scores():
+    lists = {"semantic": [{"id": 1, "score": 0.9}, {"id": 2, "score": float("nan")}, {"id": 3, "score": 0.1}],
+             "keyword": [{"id": 3, "score": 5.0}]}
+    fused = weighted_fuse(lists, {"semantic": 0.6, "keyword": 0.4})
+    assert math.isclose(fused[1], 0.6)
+    assert fused[2] == 0.0                       # NaN counts as 0.0, the list minimum here
+    assert math.isclose(fused[3], 0.6 * 0.1 / 0.9 + 0.4)  # single hit normalizes to 1.0
+
+
+def test_results_are_fused_and_deduplicated():
+    svc = _Service(keyword=[1, 2, 2, 3], semantic=[(3, 0.9), (3, 0.8), (4, 0.5)])
+    out = hybrid_search(svc, "q", top_k=10)
+    ids = [r["id"] for r in out["results"]]
+    assert sorted(ids) == [1, 2, 3, 4] and len(ids) == len(set(ids))
+    assert ids[0] == 3                           # found by both retrievers
+    assert out["stages"]["keyword"]["hits"] == 3
+    assert not out["degraded"]
+
+
+def test_slow_semantic_stage_degrades_to_keyword_results():
+    release = threading.Event()
+    svc = _Service(keyword=[1, 2], semantic=[(9, 1.0)], release=release)
+    try:
+        out = hybrid_search(svc, "q", top_k=5, semantic_timeout=0.05)
+    finally:
+        release.set()
+    assert out["degraded"]
+    assert out["stages"]["semantic"]["status"] == "timeout"
+    assert [r["id"] for r in out["results"]] == [1, 2]
+    assert all(math.isfinite(r["score"]) for r in out["results"])
@@ -0,0 +1,59 @@
+from sqlalchemy import create_engine, text
+
+from backend.app.db.init_db import _ensure_indexes
+from backend.app.db.session import Base, engine
+
+# hot access paths -> index the plan must use
+QUERIES = {
+    "SELECT id, title FROM articles WHERE topic_id = 3 ORDER BY published_date DESC LIMIT 10":
+        "ix_articles_topic_published",
+    "SELECT id, title FROM articles ORDER BY published_date DESC LIMIT 10":
+        "ix_articles_published_date",
+    "SELECT topic_id, count(id) FROM articles GROUP BY topic_id":
+        "ix_articles_topic_published",
+    "SELECT article_id, event_type FROM user_interactions WHERE user_id = 7 ORDER BY timestamp DESC LIMIT 50":
+        "ix_user_interactions_user_ts",
+    "SELECT event_type, count(id) FROM user_interactions "
+    "WHERE article_id = 5 AND timestamp >= '2026-01-01' GROUP BY event_type":
+        "ix_user_interactions_article_ts",
+}
+
+
+def _plan(conn, sql: str) -> list:
+    return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def _assert_indexed(conn):
+    for sql, index in QUERIES.items():
+        plan = _plan(conn, sql)
+        assert any(index in step for step in plan), f"{sql}\n  -> {plan}"
+        # no full table scan and no sort of the result
+        assert not [s for s in plan if s.startswith("SCAN") and "USING" not in s], plan
+        assert not [s for s in plan if "TEMP B-TREE FOR ORDER BY" in s], plan
+
+
+def test_access_paths_use_indexes():
+    # the session fixture ran init_db on this database
+    with engine.connect() as conn:
+        _assert_indexed(conn)
+
+
+def test_indexes_added_to_existing_database(tmp_path):
+    old = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=old)
+    with old.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if not index.name.startswith("ix_") or index.name.endswith("_id"):
+                    continue
+                conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        # a database from before the indexes: plans fall back to full scans
+        plan = _plan(conn, "SELECT id FROM articles ORDER BY published_date DESC LIMIT 10")
+        assert any("TEMP B-TREE" in step for step in plan), plan
+
+    with old.begin() as conn:
+        _ensure_indexes(conn)
+        _ensure_indexes(conn)  # idempotent
+    with old.connect() as conn:
+        _assert_indexed(conn)
+    old.dispose()
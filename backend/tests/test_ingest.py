@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from backend.app.db import versions
+from backend.app.services import ingest
+from backend.app.services.vector_delta import VectorDelta
+
+
+def _gen(tmp_path, version="t-announce"):
+    return SimpleNamespace(version=version, delta=VectorDelta(version, str(tmp_path)))
+
+
+def test_announce_counts_each_delta_row_once(tmp_path):
+    gen = _gen(tmp_path)
+    before = versions.read_version(versions.ARTICLES) or 0
+
+    gen.delta.append([1, 2], [3, None], np.ones((2, 4), dtype=np.float32))
+    assert ingest._announce(gen) == 2
+    assert ingest._announce(gen) == 0
+
+    # rows appended by a failed attempt are announced by the next one
+    gen.delta.append([3], [3], np.ones((1, 4), dtype=np.float32))
+    other = _gen(tmp_path)
+    assert ingest._announce(other) == 1
+    assert ingest._announce(gen) == 0
+    assert versions.read_version(versions.ARTICLES) == before + 2
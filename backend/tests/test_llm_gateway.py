@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+from backend.app.services.llm_gateway import FakeLLM, LLMGateway, LLMTimeout
+
+
+def _gateway(latency_ms: float = 0.0, concurrency: int = 2) -> LLMGateway:
+    gw = LLMGateway(backend="fake", concurrency=concurrency, timeout=5.0)
+    gw._client = FakeLLM(latency_ms=latency_ms)
+    return gw
+
+
+def test_repeat_prompt_is_served_from_cache():
+    gw = _gateway()
+    first = gw.generate("What happened?", caller="test")
+    assert gw.generate("What happened?", caller="test") == first
+    st = gw.stats()["callers"]["test"]
+    assert (st["generated"], st["cache_hits"]) == (1, 1)
+
+
+def test_follower_outlives_leader_timeout():
+    gw = _gateway(latency_ms=300)
+    leader_error = []
+
+    def leader():
+        try:
+            gw.generate("slow prompt", caller="leader", timeout=0.1)
+        except LLMTimeout as e:
+            leader_error.append(e)
+
+    t = threading.Thread(target=leader)
+    t.start()
+    time.sleep(0.05)  # the leader's call is running: join it
+    text = gw.generate("slow prompt", caller="follower", timeout=2.0)
+    t.join(5)
+
+    assert leader_error and text.startswith("Fake answer")
+    callers = gw.stats()["callers"]
+    assert callers["follower"]["coalesced"] == 1
+    assert callers["leader"]["generated"] == 1  # one backend call for both
+
+
+def test_no_free_slot_times_out():
+    gw = _gateway(latency_ms=300, concurrency=1)
+    busy = threading.Thread(target=gw.generate, args=("first",), kwargs={"caller": "a"})
+    busy.start()
+    try:
+        with pytest.raises(LLMTimeout):
+            gw.generate("second", caller="b", timeout=0.05)
+    finally:
+        busy.join(5)
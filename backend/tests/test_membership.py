@@ -0,0 +1,63 @@
+import numpy as np
+
+from backend.app.db import versions
+from backend.app.db.events import membership_since
+from backend.app.db.models.article import Article
+from backend.app.services.recommender import RecommenderService
+
+
+def _recommender(db, tmp_path):
+    arts = [Article(title=f"m{i}", text="x", topic_id=i % 2) for i in range(4)]
+    db.add_all(arts)
+    db.commit()
+    emb = np.eye(4, dtype=np.float32)
+    np.save(tmp_path / "embeddings.npy", emb)
+    np.save(tmp_path / "article_ids.npy", np.array([a.id for a in arts], dtype=np.int64))
+    rec = RecommenderService(str(tmp_path / "embeddings.npy"), str(tmp_path / "article_ids.npy"))
+    return rec, arts
+
+
+def test_summary_edits_leave_membership_alone(db):
+    art = Article(title="s", text="x", topic_id=3)
+    db.add(art)
+    db.commit()
+    seen = versions.read_version(versions.MEMBERSHIP)
+
+    art.summary = "short"
+    db.commit()
+    assert versions.read_version(versions.MEMBERSHIP) == seen
+    assert membership_since(seen) == (seen, [])
+
+    art.topic_id = 4
+    db.commit()
+    assert membership_since(seen) == (seen + 1, [(art.id, 4, False)])
+    db.delete(art)
+    db.commit()
+    assert membership_since(seen)[1][-1] == (art.id, None, True)
+    # not in the log (pruned, other database): the caller rebuilds
+    assert membership_since(seen + 5) is None
+
+
+def test_centroids_follow_the_log_without_rebuilding(db, tmp_path, monkeypatch):
+    rec, arts = _recommender(db, tmp_path)
+    try:
+        centroids = rec.topic_centroids()
+        assert sorted(centroids.topic_ids.tolist()) == [0, 1]
+
+        def no_rebuild():
+            raise AssertionError("rebuilt from the articles table")
+        monkeypatch.setattr(rec, "_build_centroids", no_rebuild)
+
+        arts[0].summary = "edited"
+        db.commit()
+        assert rec.topic_centroids() is centroids
+
+        arts[0].topic_id = 1          # rows 0, 1, 3 in topic 1
+        db.delete(arts[2])            # topic 0 is left empty
+        db.commit()
+        rec.topic_centroids()
+        assert centroids.centroid(0) is None
+        expected = np.array([1, 1, 0, 1], dtype=np.float32) / np.sqrt(3)
+        assert np.allclose(centroids.centroid(1), expected)
+    finally:
+        rec.close()
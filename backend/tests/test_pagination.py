@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import insert, update
+
+from backend.app.db.models.article import Article
+from backend.app.db.pagination import ARTICLE_FIELDS, keyset_page
+
+
+def _all_pages(db, limit):
+    fields = {"id": ARTICLE_FIELDS["id"]}
+    ids, cursor = [], None
+    for _ in range(50):
+        page, cursor = keyset_page(db, fields, cursor=cursor, limit=limit)
+        ids += [r["id"] for r in page]
+        if cursor is None:
+            return ids
+    raise AssertionError(f"pagination did not finish: {ids[:12]}...")
+
+
+def test_second_resolution_timestamps_advance(db):
+    # the column default (CURRENT_TIMESTAMP) stores '2026-10-19 16:27:34', no fraction
+    db.execute(insert(Article), [{"title": f"a{i}", "text": "x"} for i in range(10)])
+    db.commit()
+
+    ids = _all_pages(db, limit=3)
+    assert ids == list(range(10, 0, -1))
+
+
+def test_mixed_date_formats(db):
+    db.execute(insert(Article), [{"title": f"d{i}", "text": "x"} for i in range(4)])
+    db.add_all([Article(title=f"o{i}", text="x", published_date=datetime(2020, 1, 1 + i)) for i in range(4)])
+    db.commit()
+    db.execute(insert(Article), [{"title": f"u{i}", "text": "x"} for i in range(3)])
+    # the column default fills in None on insert: clear it afterwards
+    db.execute(update(Article).where(Article.id > 8).values(published_date=None))
+    db.commit()
+
+    ids = _all_pages(db, limit=2)
+    assert len(ids) == len(set(ids)) == 11
+    # default-dated rows (now) first, then the 2020 rows newest first, then undated by id
+    assert ids[:4] == [4, 3, 2, 1]
+    assert ids[4:8] == [8, 7, 6, 5]
+    assert ids[8:] == [11, 10, 9]
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from backend.app.services.rag_context import build_context, estimate_tokens, format_history, select
+
+
+def _doc(article_id, chars):
+    return SimpleNamespace(page_content="x" * chars, metadata={"article_id": article_id})
+
+
+class _Store:
+    """Flat inner-product index over the given vectors, the parts of a FAISS store _search uses."""
+
+    def __init__(self, docs, vecs):
+        self.vecs = np.asarray(vecs, dtype=np.float32)
+        self.index_to_docstore_id = {i: str(i) for i in range(len(docs))}
+        self.docstore = SimpleNamespace(search=lambda key: docs[int(key)])
+        self.index = SimpleNamespace(ntotal=len(docs), search=self._search, reconstruct=lambda i: self.vecs[i])
+
+    def _search(self, q, k):
+        order = np.argsort(-(self.vecs @ q[0]))[:k]
+        return None, order[None, :]
+
+
+def test_near_duplicates_and_extra_chunks_of_one_article_are_dropped():
+    q = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    vecs = np.array([[1.0, 0.0, 0.0],
+                     [0.99, 0.01, 0.0],     # same sentences as chunk 0
+                     [0.8, 0.6, 0.0],
+                     [0.8, 0.0, 0.6],
+                     [0.7, 0.5, 0.5]], dtype=np.float32)
+    docs = [_doc(1, 40), _doc(2, 40), _doc(1, 40), _doc(1, 40), _doc(3, 40)]
+    picked, dropped = select(q, vecs, docs, budget=1000, max_per_article=2)
+    assert picked[0] == 0
+    assert 1 not in picked and dropped["duplicate"] == 1
+    assert sum(docs[i].metadata["article_id"] == 1 for i in picked) == 2
+    assert dropped["per_article"] == 1
+
+
+def test_budget_is_never_exceeded_but_shorter_chunks_still_fit():
+    q = np.array([1.0, 0.0], dtype=np.float32)
+    vecs = np.array([[1.0, 0.0], [0.9, 0.44], [0.6, 0.8]], dtype=np.float32)
+    docs = [_doc(1, 200), _doc(2, 200), _doc(3, 40)]   # 50, 50 and 10 tokens
+    picked, dropped = select(q, vecs, docs, budget=65)
+    assert picked == [0, 2]
+    assert dropped["budget"] == 1
+    assert sum(estimate_tokens(docs[i].page_content) for i in picked) <= 65
+
+
+def test_history_is_paid_for_out_of_the_budget():
+    turns = [{"user": "u" * 40, "assistant": "a" * 40} for _ in range(5)]
+    text, used, n = format_history(turns, budget=50)
+    assert n == 2 and used <= 50 and text.count("User:") == 2
+
+    docs = [_doc(i, 120) for i in range(6)]          # 30 tokens each
+    vecs = np.eye(6, dtype=np.float32) + 0.5
+    ctx = build_context(_Store(docs, vecs), "q", budget=150, query_vec=vecs[0], history=turns)
+    assert ctx.stats["history_tokens"] == used
+    assert ctx.stats["context_tokens"] + ctx.stats["history_tokens"] <= 150
+    assert ctx.text.startswith("Source 1: ")
+    assert ctx.docs[0] is docs[0]
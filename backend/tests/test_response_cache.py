@@ -0,0 +1,49 @@
+from backend.app.db import versions
+from backend.app.db.session import engine
+from backend.app.services.response_cache import cache, cached
+
+calls = []
+
+
+@cached(ttl=60, deps=("articles",), casefold=("q",))
+def _search(q: str, source: str = "", limit: int = 10):
+    calls.append((q, source, limit))
+    return {"q": q, "n": len(calls)}
+
+
+@cached(ttl=60, deps=("stats",))
+def _stats(period: str = "day"):
+    calls.append(period)
+    return {"period": period, "n": len(calls)}
+
+
+def test_key_normalizes_casefolded_params_only():
+    calls.clear()
+    first = _search("Climate  Change", source="BBC")
+    assert _search(" climate change ", source="BBC").body == first.body
+    assert len(calls) == 1
+    _search("climate change", source="bbc")      # not a casefold param: its own entry
+    _search("climate change", source="BBC", limit=5)
+    assert len(calls) == 3
+
+
+def test_bumps_invalidate_only_dependent_routes():
+    calls.clear()
+    _search("energy")
+    _stats()
+    cache.bump("stats")
+    _search("energy")
+    _stats()
+    assert calls == [("energy", "", 10), "day", "day"]
+
+
+def test_article_writes_in_another_process_change_the_key():
+    calls.clear()
+    _search("markets")
+    # what another worker's commit does: only the shared counter moves, no local bump
+    with engine.begin() as conn:
+        versions.bump_version(conn, versions.ARTICLES)
+    _search("markets")
+    assert len(calls) == 2
+    _search("markets")
+    assert len(calls) == 2
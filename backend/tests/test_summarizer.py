@@ -0,0 +1,13 @@
+from backend.app.services.summarizer import split_sentences
+
+
+def test_number_before_full_stop_ends_the_sentence():
+    assert split_sentences("He scored 5. Then the team won the cup.") == [
+        "He scored 5.",
+        "Then the team won the cup.",
+    ]
+
+
+def test_initials_and_abbreviations_do_not_split():
+    text = "J. Doe met Mr. Smith in the U.S. on Monday. They talked."
+    assert split_sentences(text) == ["J. Doe met Mr. Smith in the U.S. on Monday.", "They talked."]
@@ -0,0 +1,55 @@
+import multiprocessing
+
+import numpy as np
+
+from backend.app.services.user_profiles import INITIAL_CAPACITY, UserProfiles
+
+DAY = 86400.0
+
+
+def test_events_fold_into_a_decayed_weighted_mean(tmp_path):
+    store = UserProfiles(2, directory=str(tmp_path), half_life_days=1.0)
+    store.observe(7, [1.0, 0.0], "view", ts=0.0)
+    store.observe(7, [0.0, 1.0], "like", ts=DAY)    # the view is worth 0.5 by now
+    assert np.isclose(store.weights[7], 3.5)
+    assert np.allclose(store.get(7), [0.5 / 3.5, 3.0 / 3.5], atol=1e-3)
+
+    # an older event is decayed itself; the stored time does not go back
+    store.observe(7, [1.0, 0.0], "bookmark", ts=0.0)
+    assert np.isclose(store.weights[7], 5.5)
+    assert store.updated[7] == DAY
+    assert not store.observe(7, [1.0, 0.0], "quiz_attempt")
+    assert store.get(8) is None
+
+
+def _fold(store, user_id, n, vec):
+    for _ in range(n):
+        store.observe(user_id, vec, "view", ts=1000.0)
+    store.flush()
+
+
+def test_concurrent_workers_never_lose_an_update(tmp_path):
+    store = UserProfiles(2, directory=str(tmp_path))
+    store.observe(3, [0.0, 0.0], "view", ts=1000.0)   # the parent's lock file is inherited by the workers
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_fold, args=(store, 3, 200, vec)) for vec in ([1.0, 0.0], [0.0, 1.0])]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+        assert p.exitcode == 0
+
+    fresh = UserProfiles(2, directory=str(tmp_path))
+    assert fresh.weights[3] == 401.0
+    # both workers' events are in the mean (float16 storage: loose tolerance)
+    assert np.allclose(fresh.get(3), [200 / 401, 200 / 401], atol=0.02)
+
+
+def test_files_grown_by_another_process_are_remapped_on_read(tmp_path):
+    writer = UserProfiles(2, directory=str(tmp_path))
+    reader = UserProfiles(2, directory=str(tmp_path))
+    uid = INITIAL_CAPACITY * 3
+    writer.observe(uid, [0.0, 1.0], "like", ts=0.0)
+    writer.flush()
+    assert reader.capacity == INITIAL_CAPACITY
+    assert np.allclose(reader.get(uid), [0.0, 1.0])
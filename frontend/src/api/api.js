@@ -35,3 +35,23 @@ export async function summarizeArticle(id, useAbstractive = true) {
   return api.post(`/summarize/${id}`, { abstractive: useAbstractive });
 }
 
+// Slow work (summaries, quizzes) runs as a background job: POST returns 202 with
+// a status_url. Poll it until the job is done; resolves with the job's result.
+export async function waitForJob(statusUrl, { intervalMs = 1000, timeoutMs = 300000 } = {}) {
+  const path = statusUrl.replace(/^\/api/, "");
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    const job = (await api.get(path)).data;
+    if (job.status === "done") return job.result;
+    if (job.status === "failed") throw new Error(job.error || "Job failed");
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+  throw new Error("Timed out waiting for job");
+}
+
+// Queue quiz generation for an article and wait for the quiz id
+export async function generateQuiz(articleId) {
+  const res = await api.post(`/quiz/${articleId}`);
+  const result = await waitForJob(res.data.status_url);
+  return result.quiz_id;
+}
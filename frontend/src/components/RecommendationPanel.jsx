@@ -1,6 +1,5 @@
 import React, { useEffect, useState } from "react";
-import { apiGet, apiPost } from "../api/api";
-import axios from "axios";
+import { apiGet, apiPost, generateQuiz } from "../api/api";
 
 export default function RecommendationPanel({ seedType = "topic", seedId, limit = 6 }) {
   const [items, setItems] = useState([]);
@@ -59,16 +58,15 @@ export default function RecommendationPanel({ seedType = "topic", seedId, limit
     setSummarizing(prev => ({ ...prev, [itemId]: false }));
   }
 
-  function generateQuiz(articleId) {
-    axios
-      .post(`http://localhost:8000/api/quiz/${articleId}`)
-      .then(res => {
-        const qid = res.data.quiz_id;
+  function startQuiz(articleId) {
+    generateQuiz(articleId)
+      .then(qid => {
         window.location.href = `/quiz/${qid}`;
       })
       .catch(() => alert("Quiz generation failed"));
   }
 
+
   async function handleCardClick(item) {
     // fire-and-forget: log click event
     try {
@@ -134,7 +132,7 @@ export default function RecommendationPanel({ seedType = "topic", seedId, limit
                   className="rec-btn quiz-btn"
                   onClick={(e) => {
                     e.stopPropagation();
-                    generateQuiz(it.id);
+                    startQuiz(it.id);
                   }}
                   title="Generate quiz"
                 >
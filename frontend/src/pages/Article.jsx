@@ -1,8 +1,7 @@
 // frontend/src/pages/Article.jsx
 import { useParams } from "react-router-dom";
 import { useEffect, useState } from "react";
-import { getArticle, summarizeArticle } from "../api/api";
-import axios from "axios";
+import { generateQuiz, getArticle, summarizeArticle, waitForJob } from "../api/api";
 
 export default function ArticlePage() {
   const { id } = useParams();
@@ -28,7 +27,8 @@ export default function ArticlePage() {
     setSummarizing(true);
     try {
       const res = await summarizeArticle(Number(id), useAbstractive);
-      // After summarization, fetch article again to show saved summary
+      // 202: the summary is written by a background job; refetch once it is done
+      await waitForJob(res.data.status_url);
       const fresh = await getArticle(id);
       setArticle(fresh.data);
     } catch (e) {
@@ -74,10 +74,8 @@ export default function ArticlePage() {
       <div style={{marginTop: "1rem"}}>
         <button
           onClick={() =>
-            axios
-              .post(`http://localhost:8000/api/quiz/${id}`)
-              .then(res => {
-                const qid = res.data.quiz_id;
+            generateQuiz(id)
+              .then(qid => {
                 window.location.href = `/quiz/${qid}`;
               })
               .catch(() => alert("Quiz generation failed"))
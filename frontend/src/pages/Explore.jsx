@@ -1,8 +1,7 @@
 import React, { useEffect, useState } from "react";
 import { useParams } from "react-router-dom";
-import { apiGet } from "../api/api";
+import { apiGet, generateQuiz } from "../api/api";
 import RecommendationPanel from "../components/RecommendationPanel";
-import axios from "axios";
 import "./Explore.css";
 
 export default function Explore() {
@@ -46,16 +45,15 @@ export default function Explore() {
     setSummarizing(prev => ({ ...prev, [articleIdx]: false }));
   }
 
-  function generateQuiz(articleId) {
-    axios
-      .post(`http://localhost:8000/api/quiz/${articleId}`)
-      .then(res => {
-        const qid = res.data.quiz_id;
+  function startQuiz(articleId) {
+    generateQuiz(articleId)
+      .then(qid => {
         window.location.href = `/quiz/${qid}`;
       })
       .catch(() => alert("Quiz generation failed"));
   }
 
+
   useEffect(() => {
     async function loadData() {
       try {
@@ -131,7 +129,7 @@ export default function Explore() {
               </button>
               <button 
                 className="quiz-btn"
-                onClick={() => generateQuiz(a.id || idx)}
+                onClick={() => startQuiz(a.id || idx)}
               >
                 🧠 Quiz
               </button>
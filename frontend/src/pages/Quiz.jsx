@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
-import axios from "axios";
+import { api } from "../api/api";
 import './Quiz.css';
 
 export default function QuizPage() {
@@ -14,7 +14,7 @@ export default function QuizPage() {
   const [showResults, setShowResults] = useState(false);
 
   useEffect(() => {
-    axios.get(`http://localhost:8001/api/quiz/${quiz_id}`)
+    api.get(`/quiz/${quiz_id}`)
       .then(res => setQuiz(res.data))
       .catch(() => alert("Error loading quiz"));
   }, [quiz_id]);